@@ -0,0 +1,84 @@
+import asyncio
+import random
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+from core.game_controller import GameController
+
+
+class AIMoveRunner:
+    """Plays AI moves off the event loop.
+
+    Searches run on a bounded thread pool, so a long search only occupies one
+    worker while the event loop keeps serving every other game. A search that
+    misses the ``timeout`` deadline is asked to stop (players exposing ``cancel``)
+    and a random legal move is played instead. The cosmetic ``delay`` is awaited
+    on the event loop, overlapping the search, and holds no worker.
+
+    A cancelled search keeps its thread until it notices the cancel, so the next
+    search of the same player waits for it, within its own deadline: two threads
+    never share a player's tables.
+    """
+
+    def __init__(self, max_workers=4, timeout=10.0, delay=0.0) -> None:
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="ai-move")
+        self.timeout = timeout
+        self.delay = delay
+        self.timeouts = 0
+        # Last search of each player, possibly still running after a timeout or cancel
+        self._searches = weakref.WeakKeyDictionary()
+
+    async def play(self, game: GameController):
+        """Search and play the AI move of ``game``; returns the move played, or None.
+
+        The caller holds the game lock. Cancelling the calling task cancels the search.
+        """
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        player = game.ai_player
+        try:
+            # The deadline also covers the wait for an abandoned search of the same player
+            move = await asyncio.wait_for(self._search(game), self.timeout)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            _cancel_search(player)
+            available_moves = game.get_available_moves()
+            move = random.choice(available_moves) if available_moves else None
+        except asyncio.CancelledError:
+            _cancel_search(player)
+            raise
+
+        remaining = self.delay - (loop.time() - started)
+        if remaining > 0:
+            await asyncio.sleep(remaining)
+        if move:
+            game.play_move(*move)
+        return move
+
+    async def _search(self, game: GameController):
+        """Run ``get_move`` in a worker once the previous search of the same player has returned."""
+        player = game.ai_player
+        previous = self._searches.get(player)
+        if previous is not None and not previous.done():
+            await asyncio.wrap_future(previous)
+        _resume_search(player)
+        future = self.executor.submit(player.get_move, game)
+        self._searches[player] = future
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _cancel_search(ai_player) -> None:
+    """Ask a player to abandon a search still running in a worker thread."""
+    cancel = getattr(ai_player, 'cancel', None)
+    if cancel is not None:
+        cancel()
+
+
+def _resume_search(ai_player) -> None:
+    """Clear an earlier cancel before starting a new search."""
+    resume = getattr(ai_player, 'resume', None)
+    if resume is not None:
+        resume()
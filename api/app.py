@@ -1,22 +1,57 @@
+import time
+
+_startup_started = time.perf_counter()
+
 import asyncio
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect
+import os
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Header, HTTPException, Response, WebSocket, WebSocketDisconnect
 from pydantic import BaseModel
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import json
-from typing import List, Dict, Any
+import logging
+import re
+from typing import List, Dict, Any, Optional
 import traceback
+import weakref
 
 # Assuming GameController, GameChecker9D, Board_9D are defined appropriately
-from core.ai_player import RandomAIPlayer
-from core.alpha_zero_player import AlphaZeroAIPlayer
+# AI players are created through the registry, which imports their backend on first use
+from api.ai_moves import AIMoveRunner
+from api.broadcast import BroadcastHub
+from api.cluster import ClusterNode
+from api.game_store import InMemoryGameStore, SQLiteGameStore
+from api.protocol import DELTA, encode, move_update, snapshot, state_version
+from core.exceptions import UnknownPlayerError, WorkerUnavailableError
 from core.game_controller import GameController
 from core.board_9D import Board_9D
 from core.game_checker_9d import GameChecker9D
-from core.min_max_player import MinimaxAIPlayer
+from core.player_registry import create_player
 from core.rule import StandardUltimateTicTacToeRule
+from core.transposition import TranspositionTable
+
+logger = logging.getLogger(__name__)
+
+# Set when the server runs as one of several worker processes (see api.cluster)
+cluster: ClusterNode = None
+
+
+@asynccontextmanager
+async def lifespan(app):
+    global cluster
+    if os.environ.get("CLUSTER_BROKER"):
+        cluster = ClusterNode(int(os.environ["CLUSTER_WORKER_ID"]), int(os.environ["CLUSTER_WORKERS"]),
+                              os.environ["CLUSTER_BROKER"], handle_cluster_request, handle_cluster_message)
+        await cluster.connect()
+    yield
+    if cluster is not None:
+        await cluster.close()
+        cluster = None
 
-app = FastAPI()
+
+app = FastAPI(lifespan=lifespan)
 
 # Set up CORS middleware
 app.add_middleware(
@@ -25,11 +60,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["ETag"],  # Let clients poll /get_board with If-None-Match
 )
 
-# Game storage - simple dictionary to hold game instances by game ID
-games: Dict[str, GameController] = {}
-clients: Dict[str, List[WebSocket]] = {}
+# WebSocket clients of each game on this worker, subscribed under one key per protocol (see subscription_key);
+# slow clients are disconnected after BROADCAST_MAX_LAG seconds
+hub = BroadcastHub(max_queue=int(os.environ.get("BROADCAST_QUEUE", "16")),
+                   max_lag=float(os.environ.get("BROADCAST_MAX_LAG", "5")))
+# One lock per game so that human and AI moves of a game never interleave; a lock lives as long as a
+# request holds it, so locks never outlive the games the store evicts
+game_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+# Pending AI move of each game, cancelled when its last client disconnects
+ai_tasks: Dict[str, asyncio.Task] = {}
 
 class Move(BaseModel):
     game_id: str
@@ -38,89 +80,385 @@ class Move(BaseModel):
 
 model_path = "ml/GoodUltimate2019-03-03 21_06_38+MCTS600+cpuct4.h5"
 
+# Transposition tables shared by the AI players of every game, so that a stored game only costs
+# its position and a few small tables instead of a search table of its own
+search_table = TranspositionTable(int(os.environ.get("AI_TABLE_ENTRIES", str(1 << 19))))
+endgame_table = TranspositionTable(int(os.environ.get("AI_ENDGAME_TABLE_ENTRIES", str(1 << 17))))
+
+# Constructor arguments of the AI players offered by the API
+AI_PLAYER_OPTIONS = {
+    'random': {},
+    'minimax': {'max_depth': 3, 'endgame_cells': 16, 'endgame_table': endgame_table},
+    'alpha_beta': {'time_budget': 1.0, 'transposition_table': search_table},
+    'alpha_zero': {'model_path': model_path, 'keep_tree': False},
+}
+DEFAULT_AI_PLAYER = 'alpha_beta'
+
+# AI searches run on a bounded pool; the delay before showing an AI move is cosmetic
+ai_moves = AIMoveRunner(
+    max_workers=int(os.environ.get("AI_MOVE_WORKERS", "4")),
+    timeout=float(os.environ.get("AI_MOVE_TIMEOUT", "10")),
+    delay=float(os.environ.get("AI_MOVE_DELAY", "2")),
+)
+
+
+def create_game(game_id: str, ai_player: str = None) -> GameController:
+    """Build a new game, against an AI player of the registered type ``ai_player`` if given."""
+    player = create_player(ai_player, "AI", 'O', **AI_PLAYER_OPTIONS[ai_player]) if ai_player else None
+    return GameController(game_id, Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), player)
+
+
+def is_game_in_use(game_id: str) -> bool:
+    """Whether a request holds or awaits the game's lock, its AI is moving or it has clients.
+
+    Such games are never evicted, since their handlers keep the controller across awaits and
+    a rebuilt copy would overwrite their moves. Handlers fetch the game under its lock.
+    """
+    return game_id in game_locks or game_id in ai_tasks or is_watched(game_id)
+
+
+# Game storage: games persist in SQLite when GAME_STORE_PATH is set, else they live in memory only.
+# Idle games are evicted after GAME_TTL seconds. A game kept in memory costs about 10 KB since the
+# search tables are shared and AlphaZero players drop their tree after each move, so MAX_GAMES bounds
+# the store to roughly 100 MB.
+if os.environ.get("GAME_STORE_PATH"):
+    games = SQLiteGameStore(create_game, os.environ["GAME_STORE_PATH"],
+                            ttl=float(os.environ.get("GAME_TTL", str(30 * 24 * 3600))), in_use=is_game_in_use)
+else:
+    games = InMemoryGameStore(create_game, max_games=int(os.environ.get("MAX_GAMES", "10000")),
+                              ttl=float(os.environ.get("GAME_TTL", str(6 * 3600))), in_use=is_game_in_use)
+# A single thread runs the calls of a blocking store, in order, so that file I/O and replays
+# never stall the event loop and two misses of the same game do not rebuild it twice
+store_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="game-store")
+
+
+async def run_store(function, *args):
+    """Call a method of ``games``, in the store thread if the store blocks."""
+    if not games.blocking:
+        return function(*args)
+    return await asyncio.get_running_loop().run_in_executor(store_io, function, *args)
+
+
+def get_game_lock(game_id: str) -> asyncio.Lock:
+    lock = game_locks.get(game_id)
+    if lock is None:
+        lock = game_locks[game_id] = asyncio.Lock()
+    return lock
+
+
+def is_ai_turn(game: GameController) -> bool:
+    return bool(game.ai_player) and game.current_player.symbol == game.ai_player.symbol and not game.game_over
+
+
+def game_channel(game_id: str) -> str:
+    return f"game:{game_id}"
+
+
+def remote_owner(game_id: str):
+    """Worker owning a game when it is not this one, else None."""
+    if cluster is None or cluster.owns(game_id):
+        return None
+    return cluster.owner(game_id)
+
+
+# WebSocket protocols: None for full game_state messages, DELTA for the compact one of api.protocol
+PROTOCOLS = (None, DELTA)
+
+
+def subscription_key(game_id: str, protocol: str = None) -> str:
+    return game_id if protocol is None else f"{game_id}?{protocol}"
+
+
+def is_watched(game_id: str) -> bool:
+    """Whether a game has WebSocket clients on this worker."""
+    return any(subscription_key(game_id, protocol) in hub for protocol in PROTOCOLS)
+
+
+def send_to_clients(game_id: str, text: str, replaceable=False, protocol: str = None):
+    """Queue a message for the clients of a game using ``protocol``, on this worker and, in a cluster, on the others.
+
+    A ``replaceable`` message (a full game state) may be superseded by the next one for slow clients.
+    """
+    key = subscription_key(game_id, protocol)
+    hub.publish(key, text, replaceable)
+    if cluster is not None:
+        cluster.publish(game_channel(game_id), {'key': key, 'text': text, 'replaceable': replaceable})
+
+
+def send_error(game_id: str, message: str):
+    text = json.dumps({"type": "error", "message": message})
+    for protocol in PROTOCOLS:
+        send_to_clients(game_id, text, protocol=protocol)
+
+
+def broadcast_state(game_id: str, game: GameController):
+    """Send the state after a move to the clients of every protocol, serialized once per protocol."""
+    version = state_version(game)
+    if cluster is not None or game_id in hub:
+        text = hub.state_message(game_id, version, lambda: game_state_message(game).decode())
+        send_to_clients(game_id, text, replaceable=True)
+    delta_key = subscription_key(game_id, DELTA)
+    if cluster is not None or delta_key in hub:
+        # Updates build on each other, so they are never replaced
+        send_to_clients(game_id, hub.state_message(delta_key, version, lambda: encode(move_update(game))),
+                        protocol=DELTA)
+
+
+# Entity tags of an If-None-Match list, capturing the opaque tag without the weak prefix
+_ENTITY_TAG = re.compile(r'(?:W/)?("[^"]*")')
+
+
+def state_etag(version: int, format: str) -> str:
+    """ETag of a game state: each format of the same version is a different representation."""
+    return f'"{version}-{format}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header matches ``etag``, compared weakly as RFC 9110 requires."""
+    if if_none_match is None:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    return etag.removeprefix('W/') in _ENTITY_TAG.findall(if_none_match)
+
+
+def json_response(content: bytes, headers=None) -> Response:
+    """Response for a body already encoded as JSON."""
+    return Response(content=content, media_type="application/json", headers=headers)
+
+
+def game_state_message(game: GameController) -> bytes:
+    """The game_state message of a game, around the JSON cached by the controller."""
+    return b'{"type":"game_state","state":' + game.get_state_json() + b'}'
+
+
+async def forward(worker: int, method: str, params: dict):
+    """Run a request on the worker owning the game and return its body, raising its HTTP errors.
+
+    An unreachable owner is reported as 503 Service Unavailable.
+    """
+    try:
+        response = await cluster.request(worker, method, params)
+    except WorkerUnavailableError as e:
+        raise HTTPException(status_code=503, detail=e.message)
+    if response['status'] != 200:
+        raise HTTPException(status_code=response['status'], detail=response['detail'])
+    return response['body']
+
+
+async def handle_cluster_request(method: str, params: dict):
+    """Serve a request forwarded by another worker for a game owned by this one."""
+    try:
+        if method == 'get_board':
+            version, content = await board_state(params['game_id'], params['format'])
+            body = [version, content.decode()]
+        elif method == 'make_move':
+            body = (await make_move(Move(**params))).body.decode()
+        elif method == 'ws_move':
+            body = await play_human_move(Move(**params))
+        elif method == 'resume_ai':
+            body = await resume_ai_turn(params['game_id'])
+        elif method == 'release':
+            body = await release_game(params['game_id'])
+        else:
+            raise HTTPException(status_code=400, detail=f"Unknown request {method}")
+    except HTTPException as e:
+        return {'status': e.status_code, 'detail': e.detail}
+    return {'status': 200, 'body': body}
+
+
+async def handle_cluster_message(channel: str, message: dict):
+    """Relay a message published by the owner of a game to the clients of this worker."""
+    hub.publish(message['key'], message['text'], message['replaceable'])
+
+
+async def play_ai_turn(game_id: str):
+    try:
+        async with get_game_lock(game_id):
+            game = await run_store(games.get, game_id)
+            if game is not None and is_ai_turn(game):
+                await ai_moves.play(game)
+                await run_store(games.save, game)
+                broadcast_state(game_id, game)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        print(traceback.format_exception(e))
+        send_error(game_id, str(e))
+    finally:
+        if ai_tasks.get(game_id) is asyncio.current_task():
+            del ai_tasks[game_id]
+
+
+async def resume_ai_turn(game_id: str):
+    """Start the AI move of a game if it is the AI's turn and no search is running."""
+    game = await run_store(games.get, game_id)
+    if game is not None and is_ai_turn(game) and game_id not in ai_tasks:
+        ai_tasks[game_id] = asyncio.create_task(play_ai_turn(game_id))
+
+
+async def release_game(game_id: str):
+    """Cancel the AI search of a game nobody watches anymore.
+
+    Workers without the game ask its owner to do so when their last client leaves.
+    """
+    if is_watched(game_id):
+        return
+    if cluster is None or cluster.owns(game_id):
+        if cluster is None or not await cluster.subscriber_count(game_channel(game_id)):
+            # Nobody is watching anymore, stop searching
+            task = ai_tasks.pop(game_id, None)
+            if task is not None:
+                task.cancel()
+
+
+async def play_human_move(move: Move):
+    """Play a move sent over a WebSocket, broadcast it and start the AI reply in the background."""
+    async with get_game_lock(move.game_id):
+        game: GameController = await run_store(games.get, move.game_id)
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+        try:
+            if is_ai_turn(game):
+                raise ValueError("Wait for the AI to play")
+            game.play_move(move.board_position, move.cell_position)
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        await run_store(games.save, game)
+        print(f"Sending game state for game: {move.game_id}")
+        broadcast_state(move.game_id, game)
+
+    # AI move (if applicable), searched in the background so the connection keeps receiving
+    if is_ai_turn(game):
+        ai_tasks[move.game_id] = asyncio.create_task(play_ai_turn(move.game_id))
+
+@app.get("/health")
+async def health():
+    return {"status": "ok", "startup_seconds": STARTUP_SECONDS}
+
 @app.get("/start_game/")
-async def start_game(ai: bool = False):
-    game_id = str(len(games) + 1)
-    board = Board_9D()
-    game_checker = GameChecker9D()
-    rule = StandardUltimateTicTacToeRule()
-    ai_player = MinimaxAIPlayer("AI", 'O', max_depth=3) if ai else None
-    game_controller = GameController(game_id, board, game_checker, rule, ai_player)
-    games[game_id] = game_controller
-    return {"type": "game_state", "state": game_controller.get_state()}
+async def start_game(ai: bool = False, ai_player: str = DEFAULT_AI_PLAYER):
+    if ai and ai_player not in AI_PLAYER_OPTIONS:
+        raise HTTPException(status_code=400, detail=UnknownPlayerError(ai_player).message)
+    await run_store(games.evict_idle)
+    # In a cluster, new games get an id owned by the worker creating them
+    game_id = cluster.new_game_id() if cluster is not None else None
+    game_controller = await run_store(games.new_game, ai_player if ai else None, game_id)
+    return json_response(game_state_message(game_controller))
 
 @app.get("/start_game_with_ai/")
-async def start_game_with_ai():
+async def start_game_with_ai(ai_player: str = DEFAULT_AI_PLAYER):
     print("Starting game with AI")
-    return await start_game(ai=True)
+    return await start_game(ai=True, ai_player=ai_player)
 
 
-@app.get("/get_board/{game_id}")
-async def get_board(game_id: str):
-    game: GameController = games.get(game_id)
+async def board_state(game_id: str, format: str):
+    """Return ``(version, JSON bytes)`` of a game's full state or, with format 'snapshot', of its snapshot."""
+    if format not in ("full", "snapshot"):
+        raise HTTPException(status_code=400, detail=f"Unknown format {format}")
+    game: GameController = await run_store(games.get, game_id)
     if not game:
         raise HTTPException(status_code=404, detail="Game not found")
+    return state_version(game), encode(snapshot(game)).encode() if format == "snapshot" else game.get_state_json()
+
+
+async def fetch_board(game_id: str, format: str):
+    owner = remote_owner(game_id)
+    if owner is not None:
+        version, content = await forward(owner, 'get_board', {'game_id': game_id, 'format': format})
+        return version, content.encode()
+    return await board_state(game_id, format)
 
-    return game.get_state()
+
+@app.get("/get_board/{game_id}")
+async def get_board(game_id: str, format: str = "full", if_none_match: Optional[str] = Header(None)):
+    # The number of moves played versions the state, so polling clients get a 304 until the next move
+    version, content = await fetch_board(game_id, format)
+    etag = state_etag(version, format)
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return json_response(content, headers={"ETag": etag})
 
 @app.post("/make_move/")
 async def make_move(move: Move):
-    game: GameController = games.get(move.game_id)
-    if not game:
-        raise HTTPException(status_code=404, detail="Game not found")
-
-    try:
-        game.play_move(move.board_position, move.cell_position)
-        state = game.get_state()
-        return state
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
+    owner = remote_owner(move.game_id)
+    if owner is not None:
+        return json_response((await forward(owner, 'make_move', move.model_dump())).encode())
+    async with get_game_lock(move.game_id):
+        game: GameController = await run_store(games.get, move.game_id)
+        if not game:
+            raise HTTPException(status_code=404, detail="Game not found")
+        try:
+            game.play_move(move.board_position, move.cell_position)
+            await run_store(games.save, game)
+            return json_response(game.get_state_json())
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=str(e))
 
 @app.websocket("/ws/{game_id}")
-async def websocket_endpoint(websocket: WebSocket, game_id: str):
+async def websocket_endpoint(websocket: WebSocket, game_id: str, protocol: Optional[str] = None):
+    if protocol not in PROTOCOLS:
+        await websocket.close(code=1008, reason=f"Unknown protocol {protocol}")
+        return
     await websocket.accept()
-    if game_id not in clients:
-        clients[game_id] = []
-    clients[game_id].append(websocket)
-
+    if not is_watched(game_id) and remote_owner(game_id) is not None:
+        # The owner of the game publishes its states
+        cluster.subscribe(game_channel(game_id))
+    # Move updates apply to the snapshot sent first: they are held back until it is fetched, and the
+    # client skips those the snapshot already includes
+    subscriber = hub.subscribe(subscription_key(game_id, protocol), websocket, paused=protocol == DELTA)
     try:
+        if protocol == DELTA:
+            try:
+                subscriber.resume((await fetch_board(game_id, "snapshot"))[1].decode())
+            except HTTPException as e:
+                subscriber.resume(json.dumps({"type": "error", "message": e.detail}))
+        # Resume an AI move cancelled when the previous clients left
+        try:
+            owner = remote_owner(game_id)
+            if owner is not None:
+                await forward(owner, 'resume_ai', {'game_id': game_id})
+            else:
+                await resume_ai_turn(game_id)
+        except HTTPException as e:
+            subscriber.send(json.dumps({"type": "error", "message": e.detail}))
+
         while True:
             data = await websocket.receive_text()
             message = json.loads(data)
             if message['type'] == 'make_move':
                 move = Move(**message['move'])
-                game: GameController = games.get(move.game_id)
-                if not game:
-                    await websocket.send_text(json.dumps({"type": "error", "message": "Game not found"}))
-                    continue
                 try:
-                    # User play move
-                    game.play_move(move.board_position, move.cell_position)
-                    state = game.get_state()
-                    print(f"Sending game state for game: {move.game_id}")
-                    response = json.dumps({"type": "game_state", "state": state.to_dict()})
-                    for client in clients[move.game_id]:
-                        await client.send_text(response)
-
-                    await asyncio.sleep(2)
-
-                    # AI move (if applicable)
-                    if game.ai_player and game.current_player.symbol == game.ai_player.symbol:
-                        game.play_ai_move()
-                        state = game.get_state()
-                        print(f"Type of next_board: {type(state.next_board)}")
-                        response = json.dumps({"type": "game_state", "state": state.to_dict()})
-                        for client in clients[move.game_id]:
-                            await client.send_text(response)
+                    owner = remote_owner(move.game_id)
+                    if owner is not None:
+                        await forward(owner, 'ws_move', move.model_dump())
+                    else:
+                        await play_human_move(move)
+                except HTTPException as e:
+                    subscriber.send(json.dumps({"type": "error", "message": e.detail}))
                 except Exception as e:
                     tb_str = traceback.format_exception(e)
                     print(tb_str)
-                    await websocket.send_text(json.dumps({"type": "error", "message": str(e)}))
+                    subscriber.send(json.dumps({"type": "error", "message": str(e)}))
     except WebSocketDisconnect:
-        clients[game_id].remove(websocket)
-        if not clients[game_id]:
-            del clients[game_id]
+        pass
+    finally:
+        # Also reached when the handler fails, so the subscriber and its writer never leak
+        hub.unsubscribe(subscription_key(game_id, protocol), subscriber)
+        owner = remote_owner(game_id)
+        if not is_watched(game_id) and owner is not None:
+            # Sent after the unsubscription, so the owner no longer counts this worker
+            cluster.unsubscribe(game_channel(game_id))
+            try:
+                await forward(owner, 'release', {'game_id': game_id})
+            except HTTPException:
+                pass
+        await release_game(game_id)
         print(f"Client {websocket.client} disconnected")
 
+# Time spent importing this module, i.e. the cold start cost of a worker
+STARTUP_SECONDS = time.perf_counter() - _startup_started
+logger.info("API module loaded in %.3fs", STARTUP_SECONDS)
+
 if __name__ == "__main__":
     uvicorn.run(app, host="127.0.0.1", port=8000)
@@ -0,0 +1,137 @@
+"""Fan-out of game messages to the WebSocket clients of each game.
+
+Every client gets its own bounded outbound queue drained by a writer task, so
+a slow or dead connection never delays the players or the other clients:
+
+- a message is serialized once and the same text is queued for every client;
+- a game state still waiting in a queue is replaced by a newer one, since
+  clients only need the latest state;
+- a client whose queue overflows, or whose send blocks for longer than
+  ``max_lag`` seconds, is disconnected;
+- a client subscribed ``paused`` queues messages without sending them until
+  ``resume``, which can put a first message such as a snapshot ahead of them.
+"""
+import asyncio
+from collections import deque
+
+# WebSocket close code "Try Again Later", sent to clients that cannot keep up
+LAGGING_CLOSE_CODE = 1013
+
+
+class Subscriber:
+    """Outbound queue and writer task of one WebSocket client."""
+
+    def __init__(self, websocket, max_queue: int, max_lag: float, on_drop, paused=False) -> None:
+        self.websocket = websocket
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.on_drop = on_drop
+        self.coalesced = 0
+        self.dropped = False
+        self.paused = paused
+        # [text, replaceable] in sending order
+        self._queue = deque()
+        self._ready = asyncio.Event()
+        self._task = asyncio.create_task(self._write())
+
+    def __len__(self) -> int:
+        return len(self._queue)
+
+    def send(self, text: str, replaceable=False) -> None:
+        """Queue a message without waiting; a replaceable message supersedes the last queued one."""
+        if self.dropped:
+            return
+        if replaceable and self._queue and self._queue[-1][1]:
+            self._queue[-1][0] = text
+            self.coalesced += 1
+            return
+        if len(self._queue) >= self.max_queue:
+            # Too far behind: the writer task disconnects the client
+            self.dropped = True
+            self._queue.clear()
+        else:
+            self._queue.append([text, replaceable])
+        self._ready.set()
+
+    def resume(self, first_text: str = None) -> None:
+        """Start sending the queued messages, after ``first_text`` if given."""
+        if first_text is not None and not self.dropped:
+            self._queue.appendleft([first_text, False])
+        self.paused = False
+        self._ready.set()
+
+    def stop(self) -> None:
+        self._task.cancel()
+
+    async def _write(self) -> None:
+        try:
+            while not self.dropped:
+                await self._ready.wait()
+                self._ready.clear()
+                while self._queue and not self.dropped and not self.paused:
+                    text, _ = self._queue.popleft()
+                    await asyncio.wait_for(self.websocket.send_text(text), self.max_lag)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # Send timed out or the connection is gone
+            self.dropped = True
+        self._queue.clear()
+        self.on_drop(self)
+        try:
+            await asyncio.wait_for(self.websocket.close(code=LAGGING_CLOSE_CODE), self.max_lag)
+        except Exception:
+            pass
+
+
+class BroadcastHub:
+    def __init__(self, max_queue=16, max_lag=5.0) -> None:
+        self.max_queue = max_queue
+        self.max_lag = max_lag
+        self.dropped = 0
+        self._subscribers = {}
+        # game_id -> (state version, serialized game_state message)
+        self._states = {}
+
+    def __contains__(self, game_id) -> bool:
+        return game_id in self._subscribers
+
+    def count(self, game_id: str) -> int:
+        return len(self._subscribers.get(game_id, ()))
+
+    def subscribe(self, game_id: str, websocket, paused=False) -> Subscriber:
+        subscriber = Subscriber(websocket, self.max_queue, self.max_lag,
+                                lambda subscriber: self._drop(game_id, subscriber), paused)
+        self._subscribers.setdefault(game_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, game_id: str, subscriber: Subscriber) -> None:
+        subscriber.stop()
+        self._remove(game_id, subscriber)
+
+    def publish(self, game_id: str, text: str, replaceable=False) -> None:
+        """Queue a message for every client of a game; never waits for a client."""
+        for subscriber in list(self._subscribers.get(game_id, ())):
+            subscriber.send(text, replaceable)
+
+    def state_message(self, game_id: str, version: int, encode) -> str:
+        """Serialized game state of a version, calling ``encode()`` once per version of a watched game."""
+        if game_id not in self._subscribers:
+            return encode()
+        cached = self._states.get(game_id)
+        if cached is None or cached[0] != version:
+            cached = (version, encode())
+            self._states[game_id] = cached
+        return cached[1]
+
+    def _drop(self, game_id: str, subscriber: Subscriber) -> None:
+        self.dropped += 1
+        self._remove(game_id, subscriber)
+
+    def _remove(self, game_id: str, subscriber: Subscriber) -> None:
+        subscribers = self._subscribers.get(game_id)
+        if subscribers is not None:
+            subscribers.discard(subscriber)
+            if not subscribers:
+                del self._subscribers[game_id]
+                self._states.pop(game_id, None)
@@ -0,0 +1,269 @@
+"""Multi-process mode of the API server.
+
+Each game is owned by one worker process, chosen by hashing its id, and only
+its owner holds the ``GameController``. Workers connect to a broker over a
+Unix socket and exchange newline-delimited JSON messages through it:
+
+- requests and responses addressed to a worker, used to forward HTTP requests
+  and WebSocket moves to the owner of a game;
+- publications on a channel per game, fanned out to every other worker with
+  clients subscribed to that game.
+
+Run the server with one worker per core::
+
+    python -m api.cluster --workers 8 --port 8000
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import socket
+import tempfile
+import threading
+import uuid
+import zlib
+
+from core.exceptions import WorkerUnavailableError
+
+MESSAGE_LIMIT = 1 << 20
+
+
+def owner_of(game_id: str, workers: int) -> int:
+    """Index of the worker owning a game; stable across processes, unlike ``hash``."""
+    return zlib.crc32(game_id.encode()) % workers
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode() + b'\n'
+
+
+class Broker:
+    """Routes requests and channel publications between the workers."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.workers = {}
+        self.channels = {}
+        self.server = None
+
+    async def start(self) -> None:
+        self.server = await asyncio.start_unix_server(self._handle, path=self.path, limit=MESSAGE_LIMIT)
+
+    async def close(self) -> None:
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _handle(self, reader, writer) -> None:
+        worker = None
+        try:
+            async for line in reader:
+                message = json.loads(line)
+                op = message['op']
+                if op == 'register':
+                    worker = message['worker']
+                    self.workers[worker] = writer
+                elif op == 'subscribe':
+                    self.channels.setdefault(message['channel'], set()).add(writer)
+                elif op == 'unsubscribe':
+                    self._unsubscribe(message['channel'], writer)
+                elif op == 'publish':
+                    data = _encode({'op': 'message', 'channel': message['channel'], 'data': message['data']})
+                    for subscriber in self.channels.get(message['channel'], ()):
+                        if subscriber is not writer:
+                            subscriber.write(data)
+                elif op == 'count':
+                    count = len(self.channels.get(message['channel'], set()) - {writer})
+                    writer.write(_encode({'op': 'response', 'id': message['id'], 'result': count}))
+                elif op in ('request', 'response'):
+                    target = self.workers.get(message['to'])
+                    if target is not None:
+                        target.write(_encode(dict(message, sender=worker)))
+                    elif op == 'request':
+                        error = WorkerUnavailableError(message['to']).message
+                        writer.write(_encode({'op': 'response', 'id': message['id'], 'error': error}))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if worker is not None and self.workers.get(worker) is writer:
+                del self.workers[worker]
+            for channel in list(self.channels):
+                self._unsubscribe(channel, writer)
+            writer.close()
+
+    def _unsubscribe(self, channel, writer) -> None:
+        subscribers = self.channels.get(channel)
+        if subscribers is not None:
+            subscribers.discard(writer)
+            if not subscribers:
+                del self.channels[channel]
+
+
+class ClusterNode:
+    """Connection of one worker process to the broker.
+
+    ``handle_request(method, params)`` is awaited for requests from other
+    workers and its result sent back; ``handle_message(channel, data)`` is
+    awaited for publications on the channels this worker subscribed to, in the
+    order they were published but apart from the reader, so that a slow handler
+    never delays requests and responses.
+    """
+
+    def __init__(self, worker_id: int, workers: int, broker_path: str, handle_request, handle_message,
+                 timeout=30.0) -> None:
+        self.worker_id = worker_id
+        self.workers = workers
+        self.broker_path = broker_path
+        self.handle_request = handle_request
+        self.handle_message = handle_message
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._pending = {}
+        self._writer = None
+        self._reader_task = None
+        self._messages = asyncio.Queue()
+        self._delivery_task = None
+
+    async def connect(self) -> None:
+        reader, self._writer = await asyncio.open_unix_connection(self.broker_path, limit=MESSAGE_LIMIT)
+        self._send({'op': 'register', 'worker': self.worker_id})
+        self._reader_task = asyncio.create_task(self._read(reader))
+        self._delivery_task = asyncio.create_task(self._deliver())
+
+    async def close(self) -> None:
+        for task in (self._reader_task, self._delivery_task):
+            if task is not None:
+                task.cancel()
+        if self._writer is not None:
+            self._writer.close()
+
+    def owner(self, game_id: str) -> int:
+        return owner_of(game_id, self.workers)
+
+    def owns(self, game_id: str) -> bool:
+        return self.owner(game_id) == self.worker_id
+
+    def new_game_id(self) -> str:
+        """A fresh game id owned by this worker, so new games never need forwarding."""
+        while True:
+            game_id = uuid.uuid4().hex
+            if self.owns(game_id):
+                return game_id
+
+    async def request(self, worker: int, method: str, params: dict):
+        """Call ``method`` on another worker and return its result."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send({'op': 'request', 'to': worker, 'id': request_id, 'method': method, 'params': params})
+            return await asyncio.wait_for(future, self.timeout)
+        except asyncio.TimeoutError:
+            raise WorkerUnavailableError(worker, f"Worker {worker} did not answer {method}")
+        finally:
+            self._pending.pop(request_id, None)
+
+    def publish(self, channel: str, data) -> None:
+        self._send({'op': 'publish', 'channel': channel, 'data': data})
+
+    def subscribe(self, channel: str) -> None:
+        self._send({'op': 'subscribe', 'channel': channel})
+
+    def unsubscribe(self, channel: str) -> None:
+        self._send({'op': 'unsubscribe', 'channel': channel})
+
+    async def subscriber_count(self, channel: str) -> int:
+        """Number of other workers subscribed to a channel."""
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        try:
+            self._send({'op': 'count', 'id': request_id, 'channel': channel})
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(request_id, None)
+
+    def _send(self, message: dict) -> None:
+        self._writer.write(_encode(message))
+
+    async def _read(self, reader) -> None:
+        async for line in reader:
+            message = json.loads(line)
+            op = message['op']
+            if op == 'response':
+                future = self._pending.get(message['id'])
+                if future is not None and not future.done():
+                    if 'error' in message:
+                        future.set_exception(WorkerUnavailableError(message.get('sender'), message['error']))
+                    else:
+                        future.set_result(message['result'])
+            elif op == 'request':
+                asyncio.create_task(self._serve(message))
+            elif op == 'message':
+                self._messages.put_nowait((message['channel'], message['data']))
+
+    async def _deliver(self) -> None:
+        while True:
+            channel, data = await self._messages.get()
+            await self.handle_message(channel, data)
+
+    async def _serve(self, message: dict) -> None:
+        response = {'op': 'response', 'to': message['sender'], 'id': message['id']}
+        try:
+            response['result'] = await self.handle_request(message['method'], message['params'])
+        except Exception as e:
+            response['error'] = str(e)
+        self._send(response)
+
+
+def _run_worker(worker_id, workers, broker_path, sock, host, port):
+    os.environ.update(CLUSTER_WORKER_ID=str(worker_id), CLUSTER_WORKERS=str(workers), CLUSTER_BROKER=broker_path)
+    import uvicorn
+
+    config = uvicorn.Config("api.app:app", host=host, port=port)
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def _run_broker(path, ready):
+    async def main():
+        broker = Broker(path)
+        await broker.start()
+        ready.set()
+        await broker.server.serve_forever()
+
+    asyncio.run(main())
+
+
+def serve(workers: int, host='127.0.0.1', port=8000, broker_path=None) -> None:
+    """Run the broker and ``workers`` API processes sharing one listening socket."""
+    broker_path = broker_path or os.path.join(tempfile.mkdtemp(prefix='uttt-'), 'broker.sock')
+    ready = threading.Event()
+    threading.Thread(target=_run_broker, args=(broker_path, ready), daemon=True).start()
+    ready.wait()
+
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.set_inheritable(True)
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_run_worker, args=(worker_id, workers, broker_path, sock, host, port))
+                 for worker_id in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the game server on several worker processes")
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--broker', help="path of the broker's Unix socket")
+    args = parser.parse_args(argv)
+    serve(args.workers, args.host, args.port, args.broker)
+
+
+if __name__ == '__main__':
+    main()
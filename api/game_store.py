@@ -0,0 +1,206 @@
+"""Storage of running games.
+
+A store creates games with collision-free ids and hands out their
+``GameController``. Games are created by a ``factory(game_id, ai_player)``
+callable, ``ai_player`` being the registered name of the AI opponent or None,
+so that a store can rebuild a game from its move list.
+
+- ``InMemoryGameStore`` keeps at most ``max_games`` controllers and forgets the
+  least recently used one beyond that, or any game idle for longer than ``ttl``.
+  Games for which ``in_use(game_id)`` is true are never forgotten, so the store
+  may exceed ``max_games`` while they are.
+- ``SQLiteGameStore`` saves every game as its AI player name and move list (one
+  byte per move) in a local SQLite file and rebuilds a game by replaying its
+  moves through ``GameController.replay``. Recently used games stay in memory.
+
+Stores with ``blocking`` set do file I/O in their calls, which async callers
+should run outside the event loop.
+"""
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from core.game_controller import GameController
+
+
+def new_game_id() -> str:
+    return uuid.uuid4().hex
+
+
+class GameStore:
+    blocking = False
+
+    def new_game(self, ai_player: str = None, game_id: str = None) -> GameController:
+        """Create, store and return a game against ``ai_player`` (None for two humans).
+
+        ``game_id`` defaults to a fresh random id.
+        """
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def get(self, game_id: str):
+        """Return the controller of a game, or None if it is unknown or was evicted."""
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def save(self, game: GameController) -> None:
+        """Record the moves played since the game was created or last saved."""
+
+    def delete(self, game_id: str) -> None:
+        raise NotImplementedError("This method should be overridden by subclasses.")
+
+    def evict_idle(self) -> int:
+        """Drop idle games; returns how many were dropped."""
+        return 0
+
+
+class InMemoryGameStore(GameStore):
+    def __init__(self, factory, max_games=10000, ttl=6 * 3600, clock=time.monotonic, in_use=None) -> None:
+        self.factory = factory
+        self.max_games = max_games
+        self.ttl = ttl
+        self.clock = clock
+        self.in_use = in_use
+        self.evictions = 0
+        # game_id -> [controller, ai_player name, last access], least recently used first
+        self._games = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._games)
+
+    def __contains__(self, game_id) -> bool:
+        return game_id in self._games
+
+    def new_game(self, ai_player: str = None, game_id: str = None) -> GameController:
+        game = self.factory(game_id or new_game_id(), ai_player)
+        self.put(game, ai_player)
+        return game
+
+    def put(self, game: GameController, ai_player: str = None) -> None:
+        with self._lock:
+            self._games[game.game_id] = [game, ai_player, self.clock()]
+            self._games.move_to_end(game.game_id)
+            self._evict()
+
+    def get(self, game_id: str):
+        with self._lock:
+            entry = self._games.get(game_id)
+            if entry is None:
+                return None
+            now = self.clock()
+            if self.ttl is not None and now - entry[2] > self.ttl and not self._is_in_use(game_id):
+                del self._games[game_id]
+                self.evictions += 1
+                return None
+            entry[2] = now
+            self._games.move_to_end(game_id)
+            return entry[0]
+
+    def delete(self, game_id: str) -> None:
+        with self._lock:
+            self._games.pop(game_id, None)
+
+    def evict_idle(self) -> int:
+        """Drop every game idle for longer than the TTL; returns how many were dropped."""
+        with self._lock:
+            return self._evict()
+
+    def _evict(self) -> int:
+        evicted = 0
+        now = self.clock()
+        deadline = now - self.ttl if self.ttl is not None else None
+        # Entries are ordered by last access, so idle games are at the front. Games in use count as
+        # accessed now and move to the back; each is skipped at most once.
+        skipped = 0
+        while self._games and skipped < len(self._games):
+            game_id, entry = next(iter(self._games.items()))
+            idle = deadline is not None and entry[2] < deadline
+            if not idle and len(self._games) <= self.max_games:
+                break
+            if self._is_in_use(game_id):
+                entry[2] = now
+                self._games.move_to_end(game_id)
+                skipped += 1
+                continue
+            self._games.popitem(last=False)
+            evicted += 1
+        self.evictions += evicted
+        return evicted
+
+    def _is_in_use(self, game_id) -> bool:
+        return self.in_use is not None and self.in_use(game_id)
+
+
+class SQLiteGameStore(GameStore):
+    blocking = True
+
+    def __init__(self, factory, path: str, cache_size=1000, cache_ttl=600, ttl=None, clock=time.time,
+                 in_use=None) -> None:
+        """Store games in the SQLite file ``path``.
+
+        ``cache_size`` and ``cache_ttl`` bound the controllers kept in memory,
+        except those of games for which ``in_use(game_id)`` is true;
+        ``ttl`` (seconds, None to keep games forever) deletes idle games from the
+        file on ``evict_idle``.
+        """
+        self.factory = factory
+        self.ttl = ttl
+        self.clock = clock
+        self.cache = InMemoryGameStore(factory, cache_size, cache_ttl, in_use=in_use)
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._connection:
+            self._connection.execute(
+                "CREATE TABLE IF NOT EXISTS games (id TEXT PRIMARY KEY, ai_player TEXT, moves BLOB NOT NULL, "
+                "updated REAL NOT NULL)")
+            self._connection.execute("CREATE INDEX IF NOT EXISTS games_updated ON games (updated)")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def new_game(self, ai_player: str = None, game_id: str = None) -> GameController:
+        game = self.factory(game_id or new_game_id(), ai_player)
+        with self._lock, self._connection:
+            self._connection.execute("INSERT INTO games VALUES (?, ?, ?, ?)",
+                                     (game.game_id, ai_player, b'', self.clock()))
+        self.cache.put(game, ai_player)
+        return game
+
+    def get(self, game_id: str):
+        game = self.cache.get(game_id)
+        if game is not None:
+            return game
+        with self._lock:
+            row = self._connection.execute("SELECT ai_player, moves FROM games WHERE id = ?", (game_id,)).fetchone()
+        if row is None:
+            return None
+        ai_player, moves = row
+        game = self.factory(game_id, ai_player)
+        game.replay(moves)
+        self.cache.put(game, ai_player)
+        return game
+
+    def save(self, game: GameController) -> None:
+        with self._lock, self._connection:
+            self._connection.execute("UPDATE games SET moves = ?, updated = ? WHERE id = ?",
+                                     (bytes(game.move_history), self.clock(), game.game_id))
+
+    def delete(self, game_id: str) -> None:
+        self.cache.delete(game_id)
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM games WHERE id = ?", (game_id,))
+
+    def evict_idle(self) -> int:
+        """Drop idle games from memory and, with a TTL, from the file; returns the rows deleted."""
+        self.cache.evict_idle()
+        if self.ttl is None:
+            return 0
+        with self._lock, self._connection:
+            cursor = self._connection.execute("DELETE FROM games WHERE updated < ?", (self.clock() - self.ttl,))
+            return cursor.rowcount
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
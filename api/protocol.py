@@ -0,0 +1,68 @@
+"""Compact game state protocol.
+
+Clients opting in (``/ws/{game_id}?protocol=delta``, ``/get_board/{game_id}?format=snapshot``)
+get a full snapshot once and then one small update per move instead of the
+nested ``boards`` lists of ``GameState.to_dict``::
+
+    {"type": "snapshot", "v": 12, "game_id": "...", "board": "X..O...", "won": "X...D....",
+     "player": "O", "active": 4, "status": null}
+    {"type": "move", "v": 13, "cell": 40, "sub": ".", "active": 4, "status": null}
+
+``v`` is the number of moves played, which also versions the state.
+``board`` holds the 81 cells in cell index order (``sub_board * 9 + cell``)
+as ``X``, ``O`` or ``.``, and ``won`` the 9 sub-boards as ``X``, ``O``, ``D``
+(draw) or ``.``. ``active`` is the sub-board to play in, -1 for any. A move
+update gives the played cell, the new status of its sub-board, the next
+active board and the game status; X plays the even versions.
+"""
+import json
+
+from core.bitboard import ANY_BOARD
+
+DELTA = 'delta'
+_CELL_CHARS = {'X': 'X', 'O': 'O', None: '.'}
+_RESULT_CHARS = {'X': 'X', 'O': 'O', 'draw': 'D', None: '.'}
+
+
+def state_version(game) -> int:
+    return len(game.move_history)
+
+
+def _active(game) -> int:
+    return game.next_board[0] * 3 + game.next_board[1] if game.next_board else ANY_BOARD
+
+
+def _result_char(game, sub_board: int) -> str:
+    return _RESULT_CHARS[game.board_results[sub_board // 3][sub_board % 3]]
+
+
+def snapshot(game) -> dict:
+    return {
+        "type": "snapshot",
+        "v": state_version(game),
+        "game_id": game.game_id,
+        "board": ''.join(_CELL_CHARS[cell] for cell in game.board.bitboard.to_symbols()),
+        "won": ''.join(_result_char(game, sub_board) for sub_board in range(9)),
+        "player": game.current_player.symbol,
+        "active": _active(game),
+        "status": game.game_over or None,
+    }
+
+
+def move_update(game) -> dict:
+    """Update for the last move played, or a snapshot if no move was played yet."""
+    if not game.move_history:
+        return snapshot(game)
+    cell = game.move_history[-1]
+    return {
+        "type": "move",
+        "v": state_version(game),
+        "cell": cell,
+        "sub": _result_char(game, cell // 9),
+        "active": _active(game),
+        "status": game.game_over or None,
+    }
+
+
+def encode(message: dict) -> str:
+    return json.dumps(message, separators=(',', ':'))
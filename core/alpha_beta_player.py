@@ -0,0 +1,208 @@
+import time
+
+from core.bitboard import PLAYER_INDEX, BitBoard, index_to_positions
+from core.evaluator import bitboard_to_array, evaluate_batch, evaluate_children
+from core.min_max_player import MinimaxAIPlayer
+from core.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+WIN_SCORE = 1000000
+SUB_BOARD_SCORE = 100
+CENTER_SUB_BOARD_BONUS = 50
+# Scores beyond this are wins or losses at a known distance from the root
+MATE_THRESHOLD = WIN_SCORE - 100
+
+
+class _SearchTimeout(Exception):
+    """Raised inside the search when the time budget of the move is spent."""
+
+
+def evaluate(bitboard: BitBoard, player: int) -> int:
+    """Score a non-terminal position from the point of view of ``player``."""
+    own, other = bitboard.won[player], bitboard.won[1 - player]
+    score = SUB_BOARD_SCORE * (bin(own).count('1') - bin(other).count('1'))
+    # The center sub-board takes part in four macro lines
+    score += CENTER_SUB_BOARD_BONUS * ((own >> 4 & 1) - (other >> 4 & 1))
+    return score
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """Store win/loss scores relative to the node instead of the root."""
+    if score >= MATE_THRESHOLD:
+        return score + ply
+    if score <= -MATE_THRESHOLD:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    if score >= MATE_THRESHOLD:
+        return score - ply
+    if score <= -MATE_THRESHOLD:
+        return score + ply
+    return score
+
+
+class AlphaBetaAIPlayer(MinimaxAIPlayer):
+    """Negamax alpha-beta search with iterative deepening under a per-move time budget.
+
+    Each iteration searches one ply deeper than the previous one, starting with
+    the best move found so far. When the budget runs out the unfinished iteration
+    is discarded and the best move of the deepest finished iteration is played.
+    Results are cached in a transposition table that is kept across moves; pass
+    the same table to several players to share it. With ``batch_evaluation`` the
+    NumPy evaluator of ``core.evaluator`` scores leaves, and all children of a
+    node one ply above the horizon are scored in a single batch.
+    """
+
+    def __init__(self, name, symbol, max_depth=20, time_budget=1.0, transposition_table: TranspositionTable = None,
+                 batch_evaluation=False, opening_book=None):
+        super().__init__(name, symbol, max_depth=max_depth, opening_book=opening_book)
+        self.time_budget = time_budget
+        self.batch_evaluation = batch_evaluation
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable()
+        self.killers = []
+        self.history = [[0] * 81, [0] * 81]
+        self.nodes = 0
+        self.last_depth = 0
+        self.last_score = 0
+        self._deadline = 0.0
+
+    def get_move(self, game_controller_instance):
+        book_move = self.book_move(game_controller_instance)
+        if book_move is not None:
+            return book_move
+        bitboard = game_controller_instance.position()
+        move = self.search(bitboard, PLAYER_INDEX[self.symbol])
+        if move is None:
+            return None
+        return index_to_positions(move)
+
+    def search(self, bitboard: BitBoard, player: int):
+        """Return the best cell index for ``player`` found within the time budget."""
+        moves = bitboard.legal_moves()
+        if not moves:
+            return None
+        self._deadline = time.perf_counter() + self.time_budget
+        # A timeout unwinds the search without unmaking moves, so work on a copy
+        bitboard = bitboard.copy()
+        self.nodes = 0
+        self.killers = [[None, None] for _ in range(82)]
+        # Keep the history of previous moves but let recent cut-offs dominate
+        self.history = [[score >> 2 for score in scores] for scores in self.history]
+        self.transposition_table.new_search()
+
+        moves = self.order_moves(bitboard, moves, player, 0)
+        best_move = moves[0]
+        self.last_depth = 0
+        self.last_score = 0
+        for depth in range(1, self.max_depth + 1):
+            if self.cancelled.is_set():
+                break
+            try:
+                score, move = self.search_root(bitboard, moves, player, depth)
+            except _SearchTimeout:
+                break
+            best_move, self.last_depth, self.last_score = move, depth, score
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= MATE_THRESHOLD:
+                break
+        return best_move
+
+    def search_root(self, bitboard, moves, player, depth):
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_move = moves[0]
+        for move in moves:
+            undo = bitboard.make_move(move, player)
+            score = -self.negamax(bitboard, depth - 1, -beta, -alpha, 1 - player, 1)
+            bitboard.unmake_move(undo)
+            if score > alpha:
+                alpha = score
+                best_move = move
+        return alpha, best_move
+
+    def negamax(self, bitboard, depth, alpha, beta, player, ply):
+        self.nodes += 1
+        if not self.nodes & 1023 and (time.perf_counter() > self._deadline or self.cancelled.is_set()):
+            raise _SearchTimeout()
+
+        if bitboard.winner is not None:
+            # Only the previous mover can have completed a line
+            return -(WIN_SCORE - ply)
+        moves = bitboard.legal_moves()
+        if not moves:
+            return 0
+        if depth <= 0:
+            return self.evaluate(bitboard, player)
+        if depth == 1 and self.batch_evaluation:
+            best_score = int(evaluate_children(bitboard, moves, player).max())
+            return WIN_SCORE - (ply + 1) if best_score >= MATE_THRESHOLD else best_score
+
+        key = bitboard.key(player)
+        entry = self.transposition_table.probe(key)
+        tt_move = None
+        if entry is not None:
+            entry_depth, entry_score, bound, tt_move = entry
+            if entry_depth >= depth:
+                score = score_from_table(entry_score, ply)
+                if bound == EXACT:
+                    return score
+                if bound == LOWER_BOUND and score >= beta:
+                    return score
+                if bound == UPPER_BOUND and score <= alpha:
+                    return score
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        best_move = None
+        for move in self.order_moves(bitboard, moves, player, ply, tt_move):
+            undo = bitboard.make_move(move, player)
+            score = -self.negamax(bitboard, depth - 1, -beta, -alpha, 1 - player, ply + 1)
+            bitboard.unmake_move(undo)
+            if score > best_score:
+                best_score = score
+                best_move = move
+                if score > alpha:
+                    alpha = score
+                    if alpha >= beta:
+                        self.record_cutoff(move, player, ply, depth)
+                        break
+
+        if best_score <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_score >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, depth, score_to_table(best_score, ply), bound, best_move)
+        return best_score
+
+    def evaluate(self, bitboard, player):
+        if self.batch_evaluation:
+            return int(evaluate_batch(bitboard_to_array(bitboard, player))[0])
+        return evaluate(bitboard, player)
+
+    def order_moves(self, bitboard, moves, player, ply, first_move=None):
+        """Order moves: ``first_move``, killers, moves into closed boards, then by history score."""
+        killers = self.killers[ply] if ply < len(self.killers) else (None, None)
+        closed = bitboard.closed()
+        history = self.history[player]
+
+        def priority(move):
+            if move == first_move:
+                return 4 << 32
+            if move == killers[0]:
+                return 3 << 32
+            if move == killers[1]:
+                return 2 << 32
+            sends_to_closed = closed >> (move % 9) & 1
+            return (sends_to_closed << 32) + history[move]
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def record_cutoff(self, move, player, ply, depth):
+        killers = self.killers[ply]
+        if killers[0] != move:
+            killers[1] = killers[0]
+            killers[0] = move
+        self.history[player][move] += depth * depth
@@ -0,0 +1,196 @@
+"""Compact bitboard representation of an Ultimate Tic-Tac-Toe position.
+
+Cells are numbered ``sub_board * 9 + cell`` where ``sub_board`` and ``cell`` are
+both row-major indices into a 3x3 grid, so the whole position fits in one 81-bit
+integer per player. Sub-board bookkeeping (won and full boards) is kept as 9-bit
+masks using the same row-major numbering.
+"""
+import random
+
+X = 0
+O = 1
+DRAW = 2
+SYMBOLS = ('X', 'O')
+PLAYER_INDEX = {'X': X, 'O': O}
+
+ANY_BOARD = -1
+SUB_BOARD_MASK = 0x1FF
+ALL_CELLS = (1 << 81) - 1
+
+# Rows, columns and diagonals of a 3x3 grid as 9-bit masks
+LINES = (
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+)
+
+
+def has_line(mask: int) -> bool:
+    """Check if a 9-bit mask contains a complete row, column or diagonal."""
+    return any(mask & line == line for line in LINES)
+
+
+# WINNING_MASKS[mask] is True when the 9-bit mask holds a complete line
+WINNING_MASKS = tuple(has_line(mask) for mask in range(512))
+
+
+# Zobrist keys for pieces, the active board (offset by one for ANY_BOARD) and side to move
+_zobrist_random = random.Random(0x9D)
+ZOBRIST_PIECES = tuple(tuple(_zobrist_random.getrandbits(64) for _ in range(81)) for _ in range(2))
+ZOBRIST_ACTIVE = tuple(_zobrist_random.getrandbits(64) for _ in range(10))
+ZOBRIST_SIDE = (0, _zobrist_random.getrandbits(64))
+
+
+def cell_index(board_position, cell_position) -> int:
+    """Convert ``(board_row, board_col), (cell_row, cell_col)`` to a cell index."""
+    return (board_position[0] * 3 + board_position[1]) * 9 + cell_position[0] * 3 + cell_position[1]
+
+
+def index_to_positions(index: int):
+    """Convert a cell index back to ``((board_row, board_col), (cell_row, cell_col))``."""
+    sub_board, cell = divmod(index, 9)
+    return divmod(sub_board, 3), divmod(cell, 3)
+
+
+def iter_bits(mask: int):
+    """Yield the indices of the set bits of a mask in ascending order."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitBoard:
+    """Mutable position with cheap ``make_move``/``unmake_move``.
+
+    ``pieces[player]`` is the 81-bit occupancy mask of a player, ``won[player]``
+    the 9-bit mask of the sub-boards that player has won, ``full`` the 9-bit mask
+    of sub-boards without empty cells and ``active`` the sub-board the next move
+    must be played in (``ANY_BOARD`` when the player may choose). ``winner`` is
+    the player holding a line of won sub-boards, or None. ``hash`` is the
+    Zobrist hash of the pieces, updated incrementally.
+    """
+
+    __slots__ = ('pieces', 'won', 'full', 'active', 'winner', 'hash')
+
+    def __init__(self) -> None:
+        self.pieces = [0, 0]
+        self.won = [0, 0]
+        self.full = 0
+        self.active = ANY_BOARD
+        self.winner = None
+        self.hash = 0
+
+    def copy(self) -> 'BitBoard':
+        other = BitBoard.__new__(BitBoard)
+        other.pieces = self.pieces[:]
+        other.won = self.won[:]
+        other.full = self.full
+        other.active = self.active
+        other.winner = self.winner
+        other.hash = self.hash
+        return other
+
+    def key(self, player: int) -> int:
+        """Zobrist key of the position with the active board and ``player`` to move."""
+        return self.hash ^ ZOBRIST_ACTIVE[self.active + 1] ^ ZOBRIST_SIDE[player]
+
+    def occupied(self) -> int:
+        """81-bit mask of all occupied cells."""
+        return self.pieces[X] | self.pieces[O]
+
+    def closed(self) -> int:
+        """9-bit mask of sub-boards that can no longer be played (won or full)."""
+        return self.won[X] | self.won[O] | self.full
+
+    def result(self):
+        """Return X or O for a won game, DRAW when no sub-board is left open, else None."""
+        if self.winner is not None:
+            return self.winner
+        if self.closed() == SUB_BOARD_MASK:
+            return DRAW
+        return None
+
+    def sub_board(self, sub_board: int, player: int) -> int:
+        """9-bit mask of the cells a player holds in one sub-board."""
+        return (self.pieces[player] >> (sub_board * 9)) & SUB_BOARD_MASK
+
+    def piece_at(self, index: int):
+        """Return the player index occupying a cell, or None if it is empty."""
+        if self.pieces[X] >> index & 1:
+            return X
+        if self.pieces[O] >> index & 1:
+            return O
+        return None
+
+    def make_move(self, index: int, player: int):
+        """Place a piece for ``player`` at ``index`` and return an undo record.
+
+        The cell is assumed to be empty; callers validate moves beforehand.
+        Only the touched sub-board and the macro board are re-examined, and the
+        active board is updated with the standard Ultimate Tic-Tac-Toe rule.
+        """
+        sub_board, cell = divmod(index, 9)
+        undo = (index, player, self.active, self.won[player], self.full, self.winner)
+        self.pieces[player] |= 1 << index
+        self.hash ^= ZOBRIST_PIECES[player][index]
+        shift = sub_board * 9
+        if WINNING_MASKS[(self.pieces[player] >> shift) & SUB_BOARD_MASK]:
+            self.won[player] |= 1 << sub_board
+            if self.winner is None and WINNING_MASKS[self.won[player]]:
+                self.winner = player
+        if ((self.pieces[X] | self.pieces[O]) >> shift) & SUB_BOARD_MASK == SUB_BOARD_MASK:
+            self.full |= 1 << sub_board
+        self.active = ANY_BOARD if self.closed() >> cell & 1 else cell
+        return undo
+
+    def unmake_move(self, undo) -> None:
+        """Revert a move using the record returned by ``make_move``."""
+        index, player, self.active, self.won[player], self.full, self.winner = undo
+        self.pieces[player] &= ~(1 << index)
+        self.hash ^= ZOBRIST_PIECES[player][index]
+
+    def set_sub_board(self, sub_board: int, x_mask: int, o_mask: int) -> None:
+        """Overwrite the content of one sub-board and refresh its bookkeeping."""
+        shift = sub_board * 9
+        clear = ~(SUB_BOARD_MASK << shift)
+        bit = 1 << sub_board
+        for player, mask in ((X, x_mask), (O, o_mask)):
+            changed = ((self.pieces[player] >> shift) & SUB_BOARD_MASK) ^ mask
+            for cell in iter_bits(changed):
+                self.hash ^= ZOBRIST_PIECES[player][shift + cell]
+            self.pieces[player] = (self.pieces[player] & clear) | (mask << shift)
+            if WINNING_MASKS[mask]:
+                self.won[player] |= bit
+            else:
+                self.won[player] &= ~bit
+        if x_mask | o_mask == SUB_BOARD_MASK:
+            self.full |= bit
+        else:
+            self.full &= ~bit
+        if WINNING_MASKS[self.won[X]]:
+            self.winner = X
+        elif WINNING_MASKS[self.won[O]]:
+            self.winner = O
+        else:
+            self.winner = None
+
+    def legal_moves(self) -> list:
+        """Cell indices that may be played under the standard rule."""
+        occupied = self.pieces[X] | self.pieces[O]
+        if self.active != ANY_BOARD:
+            sub_boards = (self.active,)
+        else:
+            open_boards = ~self.closed() & SUB_BOARD_MASK
+            sub_boards = iter_bits(open_boards)
+        moves = []
+        for sub_board in sub_boards:
+            shift = sub_board * 9
+            free = ~(occupied >> shift) & SUB_BOARD_MASK
+            moves.extend(shift + cell for cell in iter_bits(free))
+        return moves
+
+    def to_symbols(self) -> list:
+        """Flat list of 81 ``'X'``/``'O'``/None values in cell index order."""
+        x_pieces, o_pieces = self.pieces
+        return ['X' if x_pieces >> i & 1 else 'O' if o_pieces >> i & 1 else None for i in range(81)]
@@ -1,36 +1,206 @@
+from core.bitboard import ANY_BOARD, BitBoard, PLAYER_INDEX, SUB_BOARD_MASK, cell_index
 from core.exceptions import CellOccupiedError
+
+
+class _CellRow:
+    """One row of a Board; reads and writes go through to its BitBoard."""
+
+    __slots__ = ('_board', '_row')
+
+    def __init__(self, board: 'Board', row: int) -> None:
+        self._board = board
+        self._row = row
+
+    def _cells(self) -> list:
+        x_mask, o_mask = self._board.x_mask, self._board.o_mask
+        return ['X' if x_mask >> (self._row * 3 + c) & 1 else 'O' if o_mask >> (self._row * 3 + c) & 1 else None
+                for c in range(3)]
+
+    def __getitem__(self, col):
+        return self._cells()[col]
+
+    def __setitem__(self, col, piece) -> None:
+        self._board._set_cell(self._row * 3 + range(3)[col], piece)
+
+    def __len__(self) -> int:
+        return 3
+
+    def __iter__(self):
+        return iter(self._cells())
+
+    def __eq__(self, other) -> bool:
+        return self._cells() == list(other) if isinstance(other, (list, tuple, _CellRow)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(self._cells())
+
+
+class _CellGrid:
+    """The 3 rows of a Board, assignable cell by cell (``board.board[r][c] = 'X'``) or row by row."""
+
+    __slots__ = ('_board',)
+
+    def __init__(self, board: 'Board') -> None:
+        self._board = board
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [_CellRow(self._board, r) for r in range(3)[row]]
+        return _CellRow(self._board, range(3)[row])
+
+    def __setitem__(self, row, cells) -> None:
+        assert len(cells) == 3, "Row must have 3 cells"
+        for col, piece in enumerate(cells):
+            self._board._set_cell(range(3)[row] * 3 + col, piece)
+
+    def __len__(self) -> int:
+        return 3
+
+    def __iter__(self):
+        return (_CellRow(self._board, r) for r in range(3))
+
+    def __eq__(self, other) -> bool:
+        return [list(row) for row in self] == [list(row) for row in other] \
+            if isinstance(other, (list, tuple, _CellGrid)) else NotImplemented
+
+    def __repr__(self) -> str:
+        return repr([list(row) for row in self])
+
+
 class Board:
+    """3x3 board facade over one sub-board of a BitBoard.
+
+    A standalone Board owns its own BitBoard and uses sub-board 0. Once the Board
+    is placed into a Board_9D it becomes a view of the matching sub-board.
+    """
+
     def __init__(self, board=None) -> None:
+        self._bitboard = BitBoard()
+        self._index = 0
         if board is not None:
-            assert len(board) == 3 and all(len(row) == 3 for row in board), "Board must be 3x3"
-        self.board = [[None for _ in range(3)] for _ in range(3)] if board is None else board
+            self.board = board
+
+    @property
+    def board(self):
+        """3x3 grid of 'X'/'O'/None, viewing the BitBoard: ``board.board[r][c] = 'X'`` writes through."""
+        return _CellGrid(self)
+
+    @board.setter
+    def board(self, board):
+        assert len(board) == 3 and all(len(row) == 3 for row in board), "Board must be 3x3"
+        masks = [0, 0]
+        for r, row in enumerate(board):
+            for c, cell in enumerate(row):
+                if cell is not None:
+                    masks[PLAYER_INDEX[cell]] |= 1 << (r * 3 + c)
+        self._bitboard.set_sub_board(self._index, masks[0], masks[1])
+
+    def _set_cell(self, cell: int, piece) -> None:
+        """Put ``piece`` ('X', 'O' or None to clear) on cell ``cell`` (0-8) of this board."""
+        bit = 1 << cell
+        masks = [self.x_mask & ~bit, self.o_mask & ~bit]
+        if piece is not None:
+            masks[PLAYER_INDEX[piece]] |= bit
+        self._bitboard.set_sub_board(self._index, masks[0], masks[1])
+
+    @property
+    def x_mask(self) -> int:
+        """9-bit mask of the cells held by X."""
+        return self._bitboard.sub_board(self._index, 0)
+
+    @property
+    def o_mask(self) -> int:
+        """9-bit mask of the cells held by O."""
+        return self._bitboard.sub_board(self._index, 1)
+
+    @classmethod
+    def _view(cls, bitboard: BitBoard, index: int) -> 'Board':
+        """Create a Board reading and writing sub-board ``index`` of ``bitboard``."""
+        board = cls.__new__(cls)
+        board._bitboard = bitboard
+        board._index = index
+        return board
+
+    def _attach(self, bitboard: BitBoard, index: int) -> None:
+        """Copy this board into sub-board ``index`` of ``bitboard`` and become a view of it."""
+        bitboard.set_sub_board(index, self.x_mask, self.o_mask)
+        self._bitboard = bitboard
+        self._index = index
 
     def to_serializable(self):
         """Prepare the board for serialization."""
-        return [[cell for cell in row] for row in self.board]
+        return [list(row) for row in self.board]
 
     def place_piece(self, cell_position, piece):
         """Place a piece on the board."""
         row, col = cell_position
-        if self.board[row][col] is not None:
+        index = self._index * 9 + row * 3 + col
+        if self._bitboard.occupied() >> index & 1:
             raise CellOccupiedError()
-        self.board[row][col] = piece
+        self._bitboard.make_move(index, PLAYER_INDEX[piece])
 
     def is_full(self):
         """Check if the board is full."""
-        return all(cell is not None for row in self.board for cell in row)
+        return bool(self._bitboard.full >> self._index & 1)
 
     def get_available_moves(self):
         """Get a list of available moves on the board."""
-        return [(r, c) for r, row in enumerate(self.board) for c, cell in enumerate(row) if cell is None]
+        occupied = self.x_mask | self.o_mask
+        return [divmod(cell, 3) for cell in range(9) if not occupied >> cell & 1]
+
+
+class _BoardRow(list):
+    """Row of sub-boards that attaches any Board assigned into it to the parent BitBoard."""
+
+    def __init__(self, bitboard: BitBoard, row: int, boards) -> None:
+        super().__init__(boards)
+        self._bitboard = bitboard
+        self._row = row
+        for col, board in enumerate(self):
+            board._attach(bitboard, row * 3 + col)
+
+    def __setitem__(self, col, board):
+        board._attach(self._bitboard, self._row * 3 + col)
+        super().__setitem__(col, board)
+
 
 class Board_9D:
-    def __init__(self) -> None:
-        self.board = [[Board() for _ in range(3)] for _ in range(3)]
+    """9x9 board facade over a BitBoard, kept for GameController, rules and the API.
+
+    Moves placed through ``place_piece``/``push_move`` are recorded so that they can
+    be reverted with ``undo_move`` and replayed with ``redo_move``. Undoing restores
+    the pieces, the won and full sub-boards and the ``next_board`` constraint.
+    """
+
+    def __init__(self, bitboard: BitBoard = None) -> None:
+        self.bitboard = bitboard if bitboard is not None else BitBoard()
+        self._undo_stack = []
+        self._redo_stack = []
+        self._rows = [_BoardRow(self.bitboard, r, ()) for r in range(3)]
+        for r, row in enumerate(self._rows):
+            row.extend(Board._view(self.bitboard, r * 3 + c) for c in range(3))
+
+    @property
+    def board(self):
+        """3x3 grid of the sub-boards."""
+        return self._rows
+
+    @board.setter
+    def board(self, rows):
+        self._rows = [_BoardRow(self.bitboard, r, row) for r, row in enumerate(rows)]
+
+    def copy(self) -> 'Board_9D':
+        """Return an independent copy backed by a copy of the BitBoard."""
+        return Board_9D(self.bitboard.copy())
+
+    def __deepcopy__(self, memo):
+        return self.copy()
 
     def to_serializable(self):
         """Prepare the 9D board for serialization."""
-        return [[board.to_serializable() for board in row] for row in self.board]
+        cells = self.bitboard.to_symbols()
+        return [[[cells[(r * 3 + c) * 9 + cr * 3:(r * 3 + c) * 9 + cr * 3 + 3] for cr in range(3)]
+                 for c in range(3)] for r in range(3)]
 
     def place_piece(self, board_position, cell_position, piece):
         """Place a piece on the board.
@@ -38,14 +208,40 @@ class Board_9D:
         cell_position: The piece coordinates within the 3x3 board
         piece: The piece to place
         """
-        board_row, board_col = board_position
-        self.board[board_row][board_col].place_piece(cell_position, piece)
+        self.push_move(board_position, cell_position, piece)
+
+    @property
+    def next_board(self):
+        """Board the next move must be played in under the standard rule, or None."""
+        active = self.bitboard.active
+        return None if active == ANY_BOARD else divmod(active, 3)
+
+    def push_move(self, board_position, cell_position, piece):
+        """Place a piece and record it so that it can be undone. Clears the redo history."""
+        index = cell_index(board_position, cell_position)
+        if self.bitboard.occupied() >> index & 1:
+            raise CellOccupiedError()
+        self._undo_stack.append(self.bitboard.make_move(index, PLAYER_INDEX[piece]))
+        if self._redo_stack:
+            self._redo_stack.clear()
+
+    def undo_move(self):
+        """Revert the last recorded move."""
+        undo = self._undo_stack.pop()
+        self.bitboard.unmake_move(undo)
+        self._redo_stack.append(undo)
+
+    def redo_move(self):
+        """Replay the last undone move."""
+        index, player = self._redo_stack.pop()[:2]
+        self._undo_stack.append(self.bitboard.make_move(index, player))
 
     def get_available_moves(self):
         """Get a list of available moves on the 9D board."""
-        return [(r, c, cell_pos) for r, row in enumerate(self.board) for c, board in enumerate(row)
-                for cell_pos in board.get_available_moves()]
-    
+        occupied = self.bitboard.occupied()
+        return [(r, c, divmod(cell, 3)) for r in range(3) for c in range(3)
+                for cell in range(9) if not occupied >> ((r * 3 + c) * 9 + cell) & 1]
+
     def is_full(self):
         """Check if the 9D board is full."""
-        return all(board.is_full() for row in self.board for board in row)
+        return self.bitboard.full == SUB_BOARD_MASK
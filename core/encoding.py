@@ -0,0 +1,57 @@
+"""Vectorized encoding of positions into neural network inputs and legal-action masks.
+
+Actions are cell indices (``sub_board * 9 + cell``, see ``core.bitboard``). The
+network input is the 9x9 grid as seen on screen: 1 for the pieces of the player
+to move, -1 for the opponent, 0.1 for empty cells that may be played and 0 for
+the other empty cells. Won sub-boards are filled with the winner's value.
+"""
+import numpy as np
+
+from core.bitboard import ANY_BOARD
+
+VALID_MOVE_VALUE = 0.1
+
+# GRID_TO_CELL[row * 9 + col] is the cell index shown at that position of the 9x9 grid
+GRID_TO_CELL = np.array([(row // 3 * 3 + col // 3) * 9 + row % 3 * 3 + col % 3
+                         for row in range(9) for col in range(9)])
+# CELL_TO_GRID[cell index] is the flat position of that cell in the 9x9 grid
+CELL_TO_GRID = np.argsort(GRID_TO_CELL)
+
+_SUB_BOARD_BITS = np.arange(9)
+
+
+def _mask_bits(masks, width: int) -> np.ndarray:
+    """Unpack a sequence of integer masks into an ``N x width`` boolean array."""
+    nbytes = (width + 7) // 8
+    raw = np.frombuffer(b''.join(mask.to_bytes(nbytes, 'little') for mask in masks), dtype=np.uint8)
+    return np.unpackbits(raw.reshape(-1, nbytes), axis=1, bitorder='little')[:, :width].astype(bool)
+
+
+def encode_positions(positions):
+    """Encode ``(bitboard, player)`` positions into network inputs and legal masks.
+
+    Returns an ``N x 9 x 9`` float32 array of inputs and an ``N x 81`` boolean
+    array of legal actions, both from the point of view of ``player``.
+    """
+    own = _mask_bits([bitboard.pieces[player] for bitboard, player in positions], 81)
+    other = _mask_bits([bitboard.pieces[1 - player] for bitboard, player in positions], 81)
+    own_won = _mask_bits([bitboard.won[player] for bitboard, player in positions], 9)
+    other_won = _mask_bits([bitboard.won[1 - player] for bitboard, player in positions], 9)
+    full = _mask_bits([bitboard.full for bitboard, _ in positions], 9)
+    active = np.array([bitboard.active for bitboard, _ in positions])
+
+    open_boards = ~(own_won | other_won | full)
+    allowed = np.where((active == ANY_BOARD)[:, None], open_boards, _SUB_BOARD_BITS == active[:, None])
+    legal = ~(own | other) & np.repeat(allowed, 9, axis=1)
+
+    values = own.astype(np.float32) - other
+    values = np.where(np.repeat(own_won, 9, axis=1), 1.0, values)
+    values = np.where(np.repeat(other_won, 9, axis=1), -1.0, values)
+    values = values + VALID_MOVE_VALUE * legal
+    return values[:, GRID_TO_CELL].reshape(-1, 9, 9).astype(np.float32), legal
+
+
+def encode_position(bitboard, player: int):
+    """Encode a single position, returning a 9x9 input and an 81-entry legal mask."""
+    inputs, legal = encode_positions([(bitboard, player)])
+    return inputs[0], legal[0]
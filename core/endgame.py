@@ -0,0 +1,119 @@
+"""Exact solver for positions close to the end of the game.
+
+Positions are solved with a negamax alpha-beta search over the values WIN, DRAW
+and LOSS for the player to move, with its own transposition table. The search
+gives up once it has visited ``max_nodes`` nodes, so the cost of a call stays
+bounded and callers fall back to a heuristic search.
+"""
+from core.bitboard import SUB_BOARD_MASK, iter_bits
+from core.transposition import EXACT, LOWER_BOUND, UPPER_BOUND, TranspositionTable
+
+WIN = 1
+DRAW = 0
+LOSS = -1
+RESULT_NAMES = {WIN: 'win', DRAW: 'draw', LOSS: 'loss'}
+
+
+class _NodeLimit(Exception):
+    """Raised inside the solver when the node budget is exhausted."""
+
+
+def playable_cells(bitboard) -> int:
+    """Number of empty cells left in sub-boards that are neither won nor full."""
+    occupied = bitboard.occupied()
+    return sum(bin(~(occupied >> (sub_board * 9)) & SUB_BOARD_MASK).count('1')
+               for sub_board in iter_bits(~bitboard.closed() & SUB_BOARD_MASK))
+
+
+class EndgameSolver:
+    def __init__(self, max_nodes=50000, transposition_table: TranspositionTable = None) -> None:
+        self.max_nodes = max_nodes
+        self.transposition_table = transposition_table if transposition_table is not None else TranspositionTable(1 << 16)
+        self.nodes = 0
+
+    def solve(self, bitboard, player: int):
+        """Return ``(result, move)`` for ``player`` to move, or None if the node cap was reached.
+
+        ``result`` is WIN, DRAW or LOSS with perfect play from both sides and
+        ``move`` a cell index achieving it.
+        """
+        moves = bitboard.legal_moves()
+        if bitboard.winner is not None or not moves:
+            return None
+        bitboard = bitboard.copy()
+        self.nodes = 0
+        self.transposition_table.new_search()
+        try:
+            return self._search_root(bitboard, moves, player)
+        except _NodeLimit:
+            return None
+
+    def _search_root(self, bitboard, moves, player):
+        best_result, best_move = LOSS - 1, moves[0]
+        alpha = LOSS
+        for move in self._order(bitboard, moves, player):
+            undo = bitboard.make_move(move, player)
+            result = -self._negamax(bitboard, 1 - player, -WIN, -alpha)
+            bitboard.unmake_move(undo)
+            if result > best_result:
+                best_result, best_move = result, move
+                alpha = max(alpha, result)
+                if result == WIN:
+                    break
+        return best_result, best_move
+
+    def _negamax(self, bitboard, player, alpha, beta):
+        self.nodes += 1
+        if self.nodes > self.max_nodes:
+            raise _NodeLimit()
+        if bitboard.winner is not None:
+            # The previous move completed a macro line
+            return LOSS
+        moves = bitboard.legal_moves()
+        if not moves:
+            return DRAW
+
+        key = bitboard.key(player)
+        entry = self.transposition_table.probe(key)
+        tt_move = None
+        if entry is not None:
+            _, value, bound, tt_move = entry
+            if bound == EXACT or (bound == LOWER_BOUND and value >= beta) or (bound == UPPER_BOUND and value <= alpha):
+                return value
+
+        original_alpha = alpha
+        best_value, best_move = LOSS - 1, None
+        for move in self._order(bitboard, moves, player, tt_move):
+            undo = bitboard.make_move(move, player)
+            value = -self._negamax(bitboard, 1 - player, -beta, -alpha)
+            bitboard.unmake_move(undo)
+            if value > best_value:
+                best_value, best_move = value, move
+                alpha = max(alpha, value)
+                if alpha >= beta:
+                    break
+
+        if best_value <= original_alpha:
+            bound = UPPER_BOUND
+        elif best_value >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT
+        self.transposition_table.store(key, 0, best_value, bound, best_move)
+        return best_value
+
+    @staticmethod
+    def _order(bitboard, moves, player, first_move=None):
+        """Try the table move first, then moves that win their sub-board."""
+        won_before = bitboard.won[player]
+        winning, others = [], []
+        for move in moves:
+            if move == first_move:
+                continue
+            undo = bitboard.make_move(move, player)
+            (winning if bitboard.won[player] != won_before else others).append(move)
+            bitboard.unmake_move(undo)
+        ordered = winning + others
+        if first_move is not None and first_move in moves:
+            ordered.insert(0, first_move)
+        return ordered
@@ -0,0 +1,97 @@
+"""Vectorized heuristic evaluation of batches of positions.
+
+Positions are given as an ``N x 81`` array in cell index order (see
+``core.bitboard``) holding 1 for the pieces of the player the score is computed
+for, -1 for the opponent and 0 for empty cells. Every line of every sub-board and
+of the macro board is precomputed as index arrays so a batch is scored with a few
+gathers and reductions.
+"""
+import numpy as np
+
+from core.bitboard import LINES
+
+WIN_SCORE = 1000000
+SUB_BOARD_SCORE = 100
+SUB_BOARD_LINE_SCORE = 25
+MACRO_TWO_SCORE = 200
+MACRO_ONE_SCORE = 30
+THREAT_SCORE = 10
+
+# LINE_CELLS[line] are the three cells (0-8) of one row, column or diagonal of a 3x3 grid
+LINE_CELLS = np.array([[cell for cell in range(9) if line >> cell & 1] for line in LINES])
+# SUB_BOARD_LINE_INDEX[sub_board, line] are the three cell indices (0-80) of a sub-board line
+SUB_BOARD_LINE_INDEX = np.arange(9)[:, None, None] * 9 + LINE_CELLS[None, :, :]
+# Number of lines through each cell of a 3x3 grid: 4 for the center, 3 for corners, 2 for edges
+LINES_THROUGH = np.bincount(LINE_CELLS.ravel(), minlength=9)
+CELL_WEIGHTS = np.tile(LINES_THROUGH - 1, 9)
+
+
+def bitboard_to_array(bitboard, player: int) -> np.ndarray:
+    """Encode a BitBoard as an 81-cell int8 array from the point of view of ``player``."""
+    cells = np.zeros(81, dtype=np.int8)
+    own, other = bitboard.pieces[player], bitboard.pieces[1 - player]
+    cells[_unpack(own)] = 1
+    cells[_unpack(other)] = -1
+    return cells
+
+
+def _unpack(mask: int) -> np.ndarray:
+    bits = np.unpackbits(np.frombuffer(mask.to_bytes(11, 'little'), dtype=np.uint8), bitorder='little')
+    return bits[:81].astype(bool)
+
+
+def evaluate_batch(cells: np.ndarray) -> np.ndarray:
+    """Score an ``N x 81`` batch of positions for the player holding the +1 pieces.
+
+    The score combines won sub-boards weighted by the macro lines through them,
+    open two-in-a-row threats and center/corner control in the sub-boards still in
+    play, and the potential of each macro line that the opponent has not blocked.
+    A position whose macro board is won scores +/-WIN_SCORE.
+    """
+    cells = np.asarray(cells, dtype=np.int8).reshape(-1, 81)
+    lines = cells[:, SUB_BOARD_LINE_INDEX]  # N x 9 x 8 x 3
+    own_count = (lines == 1).sum(axis=3)
+    other_count = (lines == -1).sum(axis=3)
+    own_line = (own_count == 3).any(axis=2)  # N x 9
+    other_line = (other_count == 3).any(axis=2)
+    # A sub-board with lines for both players cannot arise in play, count it as drawn
+    own_won = own_line & ~other_line
+    other_won = other_line & ~own_line
+    full = (cells.reshape(-1, 9, 9) != 0).all(axis=2) | (own_line & other_line)
+    open_boards = ~(own_won | other_won | full)
+
+    won_weights = SUB_BOARD_SCORE + SUB_BOARD_LINE_SCORE * LINES_THROUGH
+    score = (own_won * won_weights).sum(axis=1) - (other_won * won_weights).sum(axis=1)
+
+    own_threats = ((own_count == 2) & (other_count == 0)).sum(axis=2)
+    other_threats = ((other_count == 2) & (own_count == 0)).sum(axis=2)
+    score += THREAT_SCORE * ((own_threats - other_threats) * open_boards).sum(axis=1)
+
+    control = (cells * CELL_WEIGHTS).reshape(-1, 9, 9).sum(axis=2)
+    score += (control * open_boards).sum(axis=1)
+
+    # A macro line keeps its potential while it holds no sub-board of the opponent or a drawn one
+    own_macro = own_won[:, LINE_CELLS]  # N x 8 x 3
+    other_macro = other_won[:, LINE_CELLS]
+    drawn_macro = (full & ~own_won & ~other_won)[:, LINE_CELLS]
+    own_in_line = own_macro.sum(axis=2)
+    other_in_line = other_macro.sum(axis=2)
+    drawn_in_line = drawn_macro.any(axis=2)
+    own_alive = (other_in_line == 0) & ~drawn_in_line
+    other_alive = (own_in_line == 0) & ~drawn_in_line
+    score += (MACRO_TWO_SCORE * ((own_in_line == 2) & own_alive)).sum(axis=1)
+    score += (MACRO_ONE_SCORE * ((own_in_line == 1) & own_alive)).sum(axis=1)
+    score -= (MACRO_TWO_SCORE * ((other_in_line == 2) & other_alive)).sum(axis=1)
+    score -= (MACRO_ONE_SCORE * ((other_in_line == 1) & other_alive)).sum(axis=1)
+
+    own_macro_won = (own_in_line == 3).any(axis=1)
+    other_macro_won = (other_in_line == 3).any(axis=1)
+    score = np.where(own_macro_won & ~other_macro_won, WIN_SCORE, score)
+    return np.where(other_macro_won & ~own_macro_won, -WIN_SCORE, score)
+
+
+def evaluate_children(bitboard, moves, player: int) -> np.ndarray:
+    """Score the positions after each of ``moves`` by ``player`` in a single batch call."""
+    children = np.tile(bitboard_to_array(bitboard, player), (len(moves), 1))
+    children[np.arange(len(moves)), moves] = 1
+    return evaluate_batch(children)
@@ -18,4 +18,20 @@ class AlreadyWinBoardException(Exception):
 
     def __init__(self, message="This board has already been won"):
         self.message = message
-        super().__init__(self.message)
\ No newline at end of file
+        super().__init__(self.message)
+
+class UnknownPlayerError(Exception):
+    """Exception raised when an AI player type is not registered."""
+
+    def __init__(self, name, message=None):
+        self.name = name
+        self.message = message if message is not None else f"Unknown player type: {name}"
+        super().__init__(self.message)
+
+class WorkerUnavailableError(Exception):
+    """Exception raised when a request cannot reach the worker process owning a game."""
+
+    def __init__(self, worker, message=None):
+        self.worker = worker
+        self.message = message if message is not None else f"Worker {worker} is unavailable"
+        super().__init__(self.message)
@@ -1,37 +1,34 @@
+from core.bitboard import SUB_BOARD_MASK, WINNING_MASKS
 from core.board_9D import Board
 
 class GameChecker:
     @staticmethod
-    def check_winner(board_instance: Board) -> str:
-        # Fetch board state
-        board = board_instance.to_serializable()
-
-        # Check rows, columns, and diagonals for a winner
-        lines = board  # Rows
-        lines += [[board[r][c] for r in range(3)] for c in range(3)]  # Columns
-        lines += [[board[i][i] for i in range(3)]]  # Main diagonal
-        lines += [[board[i][2-i] for i in range(3)]]  # Secondary diagonal
+    def check_masks(x_mask: int, o_mask: int) -> str:
+        """Return 'X', 'O', 'draw' or None for a 3x3 grid given as two 9-bit masks."""
+        if WINNING_MASKS[x_mask]:
+            return 'X'
+        if WINNING_MASKS[o_mask]:
+            return 'O'
+        if x_mask | o_mask == SUB_BOARD_MASK:
+            return 'draw'
+        return None
 
-        for line in lines:
-            if line[0] is not None and all(cell == line[0] for cell in line):
-                return line[0]  # Return 'X' or 'O' as winner
+    @staticmethod
+    def check_winner(board_instance: Board) -> str:
+        # Table lookup on the 9-bit masks of each player
+        if WINNING_MASKS[board_instance.x_mask]:
+            return 'X'
+        if WINNING_MASKS[board_instance.o_mask]:
+            return 'O'
         return None
 
     @staticmethod
     def is_draw(board_instance: Board) -> bool:
-        # Fetch board state
-        board = board_instance.to_serializable()
-
         # Check if the board is full and no winner
-        if all(cell is not None for row in board for cell in row):
+        if board_instance.x_mask | board_instance.o_mask == SUB_BOARD_MASK:
             return GameChecker.check_winner(board_instance) is None
         return False
 
     @staticmethod
     def check_win_or_draw(board_instance: Board) -> str:
-        winner = GameChecker.check_winner(board_instance)
-        if winner:
-            return winner
-        elif GameChecker.is_draw(board_instance):
-            return 'draw'
-        return None
\ No newline at end of file
+        return GameChecker.check_masks(board_instance.x_mask, board_instance.o_mask)
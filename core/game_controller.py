@@ -1,12 +1,16 @@
-from dataclasses import asdict, dataclass
+import json
+import logging
+from dataclasses import dataclass
 from typing import Any, List, Set, Tuple
 
 from core.ai_player import AIPlayer, Player
+from core.bitboard import ANY_BOARD, BitBoard, cell_index, index_to_positions
 from core.board_9D import Board_9D
 from core.game_checker_9d import GameChecker9D, GameChecker
 from core.rule import StandardUltimateTicTacToeRule, MoveRuleStrategy
 from core.exceptions import AlreadyWinBoardException, MoveRuleException
 
+logger = logging.getLogger(__name__)
 
 
 @dataclass
@@ -27,12 +31,15 @@ class GameState:
         self.won_board = won_board if won_board is not None else {'X': [], 'O': []}
 
     def to_dict(self):
-        # Custom handling for non-serializable fields if necessary
-        result = asdict(self)
-        if self.next_board is not None:
-            result['next_board'] = list(self.next_board)
-        result['won_board'] = {key: [list(pos) for pos in value] for key, value in self.won_board.items()}
-        return result
+        # Built field by field: asdict would deep-copy the nested boards
+        return {
+            'game_id': self.game_id,
+            'boards': self.boards,
+            'current_player': self.current_player,
+            'next_board': list(self.next_board) if self.next_board is not None else None,
+            'game_over': self.game_over,
+            'won_board': {key: [list(pos) for pos in value] for key, value in self.won_board.items()},
+        }
 
 
 class GameController:
@@ -49,28 +56,53 @@ class GameController:
         self.next_board = None
         self.won_board = {'X': [], 'O': []}
         self.ai_player = ai_player
+        # Status cached per move: 'X'/'O'/'draw'/None for each sub-board and the macro board
+        self.board_results = [[GameChecker.check_win_or_draw(self.board.board[r][c]) for c in range(3)] for r in range(3)]
+        self.game_over = self.game_checker.check_winner_9d(self.board)
+        self._available_moves = None
+        # Cell indices of the moves played, enough to rebuild the game by replaying them
+        self.move_history = []
+        # (GameState, JSON bytes) of the current position, built on demand and dropped by play_move
+        self._snapshot = None
 
     def switch_player(self):
         self.current_player = self.players['O'] if self.current_player == self.players['X'] else self.players['X']
 
     def play_move(self, board_position, cell_position):
+        board_row, board_col = board_position
         if self.next_board and list(board_position) != list(self.next_board):
-            print("board_position", board_position)
-            print("next_board", self.next_board)
+            logger.debug("Move on board %s while the next board is %s", board_position, self.next_board)
             raise MoveRuleException()
-        elif GameChecker.check_winner(self.board.board[board_position[0]][board_position[1]]):
+        elif self.board_results[board_row][board_col] in ('X', 'O'):
             raise AlreadyWinBoardException()
 
-        print(f"Player {self.current_player.name} ({self.current_player.symbol}) plays at {board_position} {cell_position}")
+        logger.debug("Player %s (%s) plays at %s %s", self.current_player.name, self.current_player.symbol,
+                     board_position, cell_position)
+        return self._apply_move(board_position, cell_position)
+
+    def replay(self, moves) -> None:
+        """Play the cell indices of moves already validated, e.g. a saved ``move_history``, without logging."""
+        for move in moves:
+            self._apply_move(*index_to_positions(move))
+
+    def _apply_move(self, board_position, cell_position):
+        board_row, board_col = board_position
         self.board.place_piece(board_position, cell_position, self.current_player.symbol)
+        self.move_history.append(cell_index(board_position, cell_position))
 
-        if GameChecker.check_winner(self.board.board[board_position[0]][board_position[1]]):
+        # Only the sub-board that received the piece can change its status
+        result = GameChecker.check_win_or_draw(self.board.board[board_row][board_col])
+        self.board_results[board_row][board_col] = result
+        if result == self.current_player.symbol:
             self.won_board[self.current_player.symbol].append(tuple(board_position))
+        self.game_over = self.game_checker.check_winner_9d(self.board)
 
         self.next_board = self.rule.next_board(board_position, cell_position, self.board)
+        self._available_moves = None
+        self._snapshot = None
         self.switch_player()
 
-        return self.check_game_over()
+        return self.game_over
 
     def play_ai_move(self):
         ai_move = self.ai_player.get_move(self)
@@ -79,21 +111,45 @@ class GameController:
             self.play_move(board_position, cell_position)
 
     def check_game_over(self) -> str:
-        return self.game_checker.check_winner_9d(self.board)
+        return self.game_over
+
+    def position(self) -> BitBoard:
+        """Copy of the game's BitBoard with the active board set from ``next_board``, for searches."""
+        bitboard = self.board.bitboard.copy()
+        bitboard.active = self.next_board[0] * 3 + self.next_board[1] if self.next_board else ANY_BOARD
+        return bitboard
 
     def get_state(self) -> GameState:
-        return GameState(
-            game_id=self.game_id,
-            boards=self.board.to_serializable(),
-            current_player=self.current_player.symbol,
-            next_board=self.next_board,
-            game_over=self.check_game_over(),
-            won_board=self.won_board
-        )
+        """State of the current position, shared by every caller until the next move; do not modify it."""
+        return self._get_snapshot()[0]
+
+    def get_state_json(self) -> bytes:
+        """``get_state().to_dict()`` encoded as JSON, cached until the next move."""
+        return self._get_snapshot()[1]
+
+    def _get_snapshot(self):
+        if self._snapshot is None:
+            state = GameState(
+                game_id=self.game_id,
+                boards=self.board.to_serializable(),
+                current_player=self.current_player.symbol,
+                next_board=self.next_board,
+                game_over=self.game_over,
+                won_board={symbol: list(boards) for symbol, boards in self.won_board.items()}
+            )
+            self._snapshot = (state, json.dumps(state.to_dict(), separators=(',', ':')).encode())
+        return self._snapshot
 
     def get_available_moves(self) -> list[Tuple[int, int]]:
-        if self.next_board:
-            available_moves =  self.board.board[self.next_board[0]][self.next_board[1]].get_available_moves()
-            zipped_moves = [[[self.next_board[0], self.next_board[1]], [move[0], move[1]]] for move in available_moves]
-            return zipped_moves
-        return self.board.get_available_moves()
\ No newline at end of file
+        """Legal moves as [[board_row, board_col], [cell_row, cell_col]].
+
+        The moves are cached as tuples until the next move; every call returns fresh lists.
+        """
+        if self._available_moves is None:
+            if self.next_board:
+                board_positions = [tuple(self.next_board)]
+            else:
+                board_positions = [(r, c) for r in range(3) for c in range(3) if self.board_results[r][c] is None]
+            self._available_moves = tuple((board_position, tuple(move)) for board_position in board_positions
+                                          for move in self.board.board[board_position[0]][board_position[1]].get_available_moves())
+        return [[list(board_position), list(cell_position)] for board_position, cell_position in self._available_moves]
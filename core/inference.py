@@ -0,0 +1,227 @@
+"""Process-wide model registry and cross-game inference batching.
+
+Each model file is loaded once per process for inference only (no optimizer) and
+wrapped in an ``InferenceService``. The service runs a background thread that
+merges the positions submitted by every game into micro-batches: a batch is sent
+to the model when it reaches ``max_batch_size`` positions or when the oldest
+request has waited ``max_wait`` seconds. Callers receive futures.
+
+Results are also kept in an ``EvaluationCache`` shared by every game, keyed by the
+canonical form of the input under the 8 board symmetries.
+"""
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+
+from core.symmetry import ACTION_PERMUTATIONS, INVERSE_ACTION_PERMUTATIONS, canonical_keys
+
+INPUT_SHAPE = (9, 9)
+DEFAULT_CACHE_SIZE = 1 << 16
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def load_keras_model(model_path):
+    """Load a Keras model for inference and return its batch predict function."""
+    from keras.models import load_model
+
+    model = load_model(model_path, compile=False)
+
+    def predict(inputs):
+        policies, values = model.predict_on_batch(inputs)[:2]
+        return np.asarray(policies), np.asarray(values)
+
+    return predict
+
+
+def load_npz_model(model_path):
+    """Load a network exported to the NumPy format of ``core.numpy_net``."""
+    from core.numpy_net import load_numpy_model
+
+    return load_numpy_model(model_path)
+
+
+# Model loaders by file suffix, each returning a predict(inputs) -> (policies, values) function
+MODEL_LOADERS = {
+    '.h5': load_keras_model,
+    '.keras': load_keras_model,
+    '.npz': load_npz_model,
+}
+
+
+class EvaluationCache:
+    """Thread-safe LRU cache of ``(policy, value)`` results keyed by canonical position.
+
+    Policies are stored in the orientation of the canonical position and permuted
+    back to the orientation of each lookup.
+    """
+
+    def __init__(self, capacity=DEFAULT_CACHE_SIZE) -> None:
+        self.capacity = capacity
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def lookup(self, keys, transforms):
+        """Return the cached ``(policy, value)`` of each position, or None when missing."""
+        results = []
+        with self._lock:
+            for key, transform in zip(keys, transforms):
+                entry = self._entries.get(key)
+                if entry is None:
+                    self.misses += 1
+                    results.append(None)
+                    continue
+                self.hits += 1
+                self._entries.move_to_end(key)
+                policy, value = entry
+                results.append((policy[INVERSE_ACTION_PERMUTATIONS[transform]], value))
+        return results
+
+    def store(self, keys, transforms, policies, values) -> None:
+        with self._lock:
+            for key, transform, policy, value in zip(keys, transforms, policies, values):
+                self._entries[key] = (policy[ACTION_PERMUTATIONS[transform]], value)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.capacity:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+class InferenceService:
+    """Batches inference requests from many threads into few model calls."""
+
+    def __init__(self, predict, max_batch_size=64, max_wait=0.002, cache_size=0) -> None:
+        self.predict = predict
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.cache = EvaluationCache(cache_size) if cache_size else None
+        self.batches = 0
+        self.positions = 0
+        self._requests = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="inference-batcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, inputs) -> Future:
+        """Queue an ``N x 9 x 9`` array of inputs; the future yields ``(policies, values)``."""
+        if self._closed:
+            raise RuntimeError("The inference service is closed")
+        future = Future()
+        self._requests.put((np.asarray(inputs, dtype=np.float32).reshape((-1,) + INPUT_SHAPE), future))
+        return future
+
+    def evaluate(self, inputs):
+        """Blocking helper around ``submit`` that answers from the cache when it can."""
+        if self.cache is None:
+            return self.submit(inputs).result()
+        inputs = np.asarray(inputs, dtype=np.float32).reshape((-1,) + INPUT_SHAPE)
+        keys, transforms = canonical_keys(inputs)
+        cached = self.cache.lookup(keys, transforms)
+        missing = [index for index, result in enumerate(cached) if result is None]
+        policies = np.empty((len(inputs), 81), dtype=np.float32)
+        values = np.empty(len(inputs), dtype=np.float32)
+        if missing:
+            new_policies, new_values = self.submit(inputs[missing]).result()
+            policies[missing] = new_policies
+            values[missing] = new_values
+            self.cache.store([keys[index] for index in missing], [transforms[index] for index in missing],
+                             policies[missing], values[missing])
+        for index, result in enumerate(cached):
+            if result is not None:
+                policies[index], values[index] = result
+        return policies, values
+
+    def warm_up(self) -> None:
+        """Run one prediction so that lazy initialization happens before the first game."""
+        self.submit(np.zeros((1,) + INPUT_SHAPE, dtype=np.float32)).result()
+
+    def close(self) -> None:
+        self._closed = True
+        self._requests.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        while True:
+            request = self._requests.get()
+            if request is None:
+                return
+            batch = [request]
+            size = len(request[0])
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    request = self._requests.get(timeout=remaining) if remaining > 0 else self._requests.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    self._requests.put(None)
+                    break
+                batch.append(request)
+                size += len(request[0])
+            self._predict_batch(batch)
+
+    def _predict_batch(self, batch) -> None:
+        batch = [(inputs, future) for inputs, future in batch if future.set_running_or_notify_cancel()]
+        if not batch:
+            return
+        try:
+            policies, values = self.predict(np.concatenate([inputs for inputs, _ in batch]))
+        except Exception as error:
+            for _, future in batch:
+                future.set_exception(error)
+            return
+        self.batches += 1
+        self.positions += len(policies)
+        policies = np.asarray(policies).reshape(len(policies), -1)
+        values = np.asarray(values).reshape(len(values))
+        start = 0
+        for inputs, future in batch:
+            end = start + len(inputs)
+            future.set_result((policies[start:end], values[start:end]))
+            start = end
+
+
+def get_inference_service(model_path: str, max_batch_size=64, max_wait=0.002,
+                          cache_size=DEFAULT_CACHE_SIZE) -> InferenceService:
+    """Return the process-wide service for ``model_path``, loading and warming the model once.
+
+    The service and its evaluation cache are shared by every game of the process.
+    """
+    with _services_lock:
+        service = _services.get(model_path)
+        if service is None:
+            suffix = model_path[model_path.rfind('.'):]
+            if suffix not in MODEL_LOADERS:
+                raise ValueError(f"No model loader for {model_path}")
+            service = InferenceService(MODEL_LOADERS[suffix](model_path), max_batch_size, max_wait, cache_size)
+            service.warm_up()
+            _services[model_path] = service
+        return service
+
+
+def shutdown_inference_services() -> None:
+    with _services_lock:
+        for service in _services.values():
+            service.close()
+        _services.clear()
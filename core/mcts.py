@@ -0,0 +1,184 @@
+import math
+
+import numpy as np
+
+from core.bitboard import BitBoard
+
+
+class PUCTSearch:
+    """AlphaZero-style Monte-Carlo tree search with batched leaf evaluation.
+
+    ``evaluate`` receives a list of ``(bitboard, player)`` positions and returns
+    ``(policies, values)``: an ``N x 81`` array of move priors and ``N`` values in
+    [-1, 1], both from the point of view of the player to move. Simulations
+    descend the tree with PUCT, applying a virtual loss to every edge they cross
+    so that the next simulations of the same batch explore other lines. Up to
+    ``batch_size`` leaves are then evaluated in a single call. Once the optional
+    ``stop`` event is set, searches end after their current batch.
+
+    Statistics are stored per position key (Zobrist key with the active board and
+    side to move): ``Ns[s]`` visits, and 81-entry arrays ``Nsa[s]``, ``W[s]``,
+    ``Q[s]`` and ``P[s]``. They survive between calls, so the subtree of the move
+    actually played is reused on the next move; every position that can no longer
+    be reached from the new root is dropped, so the tree stays about the size of
+    one search.
+    """
+
+    def __init__(self, evaluate, cpuct=2.0, simulations=400, batch_size=32, virtual_loss=1.0,
+                 dirichlet_alpha=None, dirichlet_weight=0.25, stop=None):
+        self.evaluate = evaluate
+        self.cpuct = cpuct
+        self.simulations = simulations
+        self.batch_size = batch_size
+        self.virtual_loss = virtual_loss
+        self.dirichlet_alpha = dirichlet_alpha
+        self.dirichlet_weight = dirichlet_weight
+        self.stop = stop
+        self.evaluations = 0
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the whole tree, e.g. when a new game starts."""
+        self.Ns = {}
+        self.Nsa = {}
+        self.W = {}
+        self.Q = {}
+        self.P = {}
+        self.terminal = {}
+        # (root key, priors mixed with Dirichlet noise) of the current search; P keeps the network priors
+        self.noisy_root = None
+
+    def get_action_probs(self, bitboard: BitBoard, player: int, temperature: float = 1.0) -> np.ndarray:
+        """Run the simulations from a position and return the 81-entry visit distribution.
+
+        With ``temperature`` 0 all the probability goes to the most visited move.
+        """
+        root = bitboard.key(player)
+        self.prune(bitboard, player)
+        if root not in self.P:
+            self._expand([(root, bitboard, player)])
+        self.noisy_root = self._add_noise(root) if self.dirichlet_alpha is not None else None
+
+        done = 0
+        while done < self.simulations and not (self.stop is not None and self.stop.is_set()):
+            pending = {}
+            for _ in range(min(self.batch_size, self.simulations - done)):
+                path, leaf, leaf_board, leaf_player = self._select(bitboard, player, root)
+                done += 1
+                value = self._terminal_value(leaf, leaf_board)
+                if value is not None:
+                    self._backup(path, value)
+                elif leaf in pending:
+                    # Another simulation of this batch already reached this leaf
+                    pending[leaf][3].append(path)
+                else:
+                    pending[leaf] = (leaf, leaf_board, leaf_player, [path])
+            if pending:
+                values = self._expand([entry[:3] for entry in pending.values()])
+                for (leaf, leaf_board, leaf_player, paths), value in zip(pending.values(), values):
+                    for path in paths:
+                        self._backup(path, value)
+
+        counts = self.Nsa[root]
+        if not counts.any():
+            # Stopped before the first simulation: fall back to the priors
+            counts = self.P[root]
+        if temperature == 0:
+            probs = np.zeros(81)
+            best = np.flatnonzero(counts == counts.max())
+            probs[best] = 1.0 / len(best)
+            return probs
+        counts = counts ** (1.0 / temperature)
+        return counts / counts.sum()
+
+    def prune(self, bitboard: BitBoard, player: int) -> None:
+        """Drop the statistics of every position not reachable from this one through visited moves."""
+        reachable = set()
+        stack = [(bitboard, player)]
+        while stack:
+            board, to_move = stack.pop()
+            state = board.key(to_move)
+            if state in reachable:
+                continue
+            reachable.add(state)
+            if state not in self.Nsa:
+                continue
+            for action in np.flatnonzero(self.Nsa[state]):
+                child = board.copy()
+                child.make_move(int(action), to_move)
+                stack.append((child, 1 - to_move))
+        for table in (self.Ns, self.Nsa, self.W, self.Q, self.P, self.terminal):
+            for state in [state for state in table if state not in reachable]:
+                del table[state]
+
+    def _select(self, bitboard, player, root):
+        """Descend from the root to a leaf, applying a virtual loss along the way."""
+        board = bitboard.copy()
+        state = root
+        path = []
+        while state in self.P and self._terminal_value(state, board) is None:
+            action = self._best_action(state)
+            path.append((state, action))
+            self.Ns[state] += self.virtual_loss
+            self.Nsa[state][action] += self.virtual_loss
+            self.W[state][action] -= self.virtual_loss
+            if self.Nsa[state][action]:
+                self.Q[state][action] = self.W[state][action] / self.Nsa[state][action]
+            board.make_move(action, player)
+            player = 1 - player
+            state = board.key(player)
+        return path, state, board, player
+
+    def _best_action(self, state) -> int:
+        prior = self.noisy_root[1] if self.noisy_root is not None and self.noisy_root[0] == state else self.P[state]
+        scores = self.Q[state] + self.cpuct * prior * math.sqrt(self.Ns[state] + 1) / (1 + self.Nsa[state])
+        scores[prior <= 0] = -np.inf
+        return int(np.argmax(scores))
+
+    def _terminal_value(self, state, board):
+        """Value for the player to move if the game is over, else None."""
+        if state not in self.terminal:
+            if board.winner is not None:
+                # The previous move completed a macro line
+                self.terminal[state] = -1.0
+            elif not board.legal_moves():
+                self.terminal[state] = 0.0
+            else:
+                self.terminal[state] = None
+        return self.terminal[state]
+
+    def _expand(self, leaves):
+        """Evaluate leaves in one batch, store their priors and return their values."""
+        policies, values = self.evaluate([(board, player) for _, board, player in leaves])
+        self.evaluations += 1
+        for (state, board, _), policy in zip(leaves, policies):
+            legal = np.zeros(81, dtype=bool)
+            legal[board.legal_moves()] = True
+            prior = np.where(legal, policy, 0.0)
+            total = prior.sum()
+            # Keep a tiny prior on every legal move so that none is excluded by the mask
+            prior = prior / total if total > 0 else legal / legal.sum()
+            self.P[state] = np.where(legal, np.maximum(prior, 1e-8), 0.0)
+            self.Ns[state] = 0
+            self.Nsa[state] = np.zeros(81)
+            self.W[state] = np.zeros(81)
+            self.Q[state] = np.zeros(81)
+        return [float(value) for value in np.ravel(values)]
+
+    def _add_noise(self, state):
+        """Return ``(state, priors)`` with fresh noise mixed into a copy of the stored priors."""
+        prior = self.P[state].copy()
+        legal = prior > 0
+        noise = np.random.dirichlet([self.dirichlet_alpha] * int(legal.sum()))
+        prior[legal] = (1 - self.dirichlet_weight) * prior[legal] + self.dirichlet_weight * noise
+        return state, prior
+
+    def _backup(self, path, value: float) -> None:
+        """Propagate a leaf value up the path and remove the virtual loss."""
+        for state, action in reversed(path):
+            # The value is for the player to move at the child, flip it for the parent
+            value = -value
+            self.Ns[state] += 1 - self.virtual_loss
+            self.Nsa[state][action] += 1 - self.virtual_loss
+            self.W[state][action] += value + self.virtual_loss
+            self.Q[state][action] = self.W[state][action] / self.Nsa[state][action]
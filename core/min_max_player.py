@@ -1,26 +1,91 @@
-import copy
+import threading
 
 from core.ai_player import AIPlayer
+from core.bitboard import PLAYER_INDEX, SUB_BOARD_MASK, index_to_positions, iter_bits
+from core.endgame import RESULT_NAMES, EndgameSolver, playable_cells
 from core.game_checker import GameChecker
 from core.game_checker_9d import GameChecker9D
+from core.opening_book import load_opening_book
 
 
 class MinimaxAIPlayer(AIPlayer):
-    def __init__(self, name, symbol, max_depth=5):
+    def __init__(self, name, symbol, max_depth=5, opening_book=None, endgame_cells=None, endgame_moves=None,
+                 endgame_max_nodes=50000, endgame_table=None):
         super().__init__(name, symbol)
         self.max_depth = max_depth
+        # Path of a book file (or an OpeningBook) consulted before searching
+        self.opening_book = load_opening_book(opening_book)
+        # The exact solver takes over once playable cells or legal moves drop to these thresholds (None: never)
+        self.endgame_cells = endgame_cells
+        self.endgame_moves = endgame_moves
+        self.endgame_max_nodes = endgame_max_nodes
+        # Transposition table of the solver, its own unless one is given to share between players
+        self.endgame_table = endgame_table
+        # Created on the first solved position
+        self.endgame_solver = None
+        self.last_result = None
+        # Set by cancel() and only cleared by resume(), so a cancel arriving before the search starts is not lost
+        self.cancelled = threading.Event()
+
+    def cancel(self) -> None:
+        """Stop the running or next search at its next check; it returns the best move found so far.
+
+        Searches stay cancelled until ``resume`` is called.
+        """
+        self.cancelled.set()
+
+    def resume(self) -> None:
+        """Allow searching again after ``cancel``; call it once the cancelled search has returned."""
+        self.cancelled.clear()
+
+    def book_move(self, game_controller_instance):
+        """Return the opening book move for this position, or None to search."""
+        if self.opening_book is None:
+            return None
+        return self.opening_book.move_for(game_controller_instance, self.symbol)
+
+    def solve_endgame(self, game_controller_instance):
+        """Return ``(move, result)`` proven by the endgame solver, or None if it does not apply.
+
+        ``result`` is 'win', 'draw' or 'loss' for this player with perfect play.
+        """
+        bitboard = game_controller_instance.position()
+        cells = self.endgame_cells is not None and playable_cells(bitboard) <= self.endgame_cells
+        moves = self.endgame_moves is not None and len(bitboard.legal_moves()) <= self.endgame_moves
+        if not (cells or moves):
+            return None
+        if self.endgame_solver is None:
+            self.endgame_solver = EndgameSolver(self.endgame_max_nodes, self.endgame_table)
+        solution = self.endgame_solver.solve(bitboard, PLAYER_INDEX[self.symbol])
+        if solution is None:
+            return None
+        result, move = solution
+        return index_to_positions(move), RESULT_NAMES[result]
 
     def get_move(self, game_controller_instance):
+        self.last_result = None
+        book_move = self.book_move(game_controller_instance)
+        if book_move is not None:
+            return book_move
+        solution = self.solve_endgame(game_controller_instance)
+        if solution is not None:
+            move, self.last_result = solution
+            return move
+
         best_score = float('-inf')
         best_move = None
         player_symbol = self.symbol
         opponent_symbol = 'O' if player_symbol == 'X' else 'X'
         
-        for move in generate_possible_moves(game_controller_instance.board, game_controller_instance.next_board):
-            board_copy = copy.deepcopy(game_controller_instance.board)
-            board_copy.place_piece(move[0], move[1], player_symbol)
-            next_sub_board = move[1] if not GameChecker.check_winner(board_copy.board[move[0][0]][move[0][1]]) else None
-            move_score = minimax(board_copy, 0, False, player_symbol, opponent_symbol, next_sub_board, self.max_depth)
+        # Moves are applied and undone on a single private copy of the board
+        board_9d = game_controller_instance.board.copy()
+        for move in generate_possible_moves(board_9d, game_controller_instance.next_board):
+            if best_move is not None and self.cancelled.is_set():
+                break
+            board_9d.push_move(move[0], move[1], player_symbol)
+            next_sub_board = move[1] if not GameChecker.check_winner(board_9d.board[move[0][0]][move[0][1]]) else None
+            move_score = minimax(board_9d, 0, False, player_symbol, opponent_symbol, next_sub_board, self.max_depth)
+            board_9d.undo_move()
             
             if move_score > best_score:
                 best_score = move_score
@@ -32,40 +97,31 @@ def evaluate_board(board_9d, player_symbol):
     opponent_symbol = 'O' if player_symbol == 'X' else 'X'
     
     # Check if the game is won by either player
-    if GameChecker9D.check_winner_9d(board_9d) == player_symbol:
+    winner = GameChecker9D.check_winner_9d(board_9d)
+    if winner == player_symbol:
         return 1
-    elif GameChecker9D.check_winner_9d(board_9d) == opponent_symbol:
+    elif winner == opponent_symbol:
         return -1
 
-    # Evaluate the state of each sub-board
-    score = 0
-    for r in range(3):
-        for c in range(3):
-            sub_board = board_9d.board[r][c]
-            if GameChecker.check_winner(sub_board) == player_symbol:
-                score += 1
-            elif GameChecker.check_winner(sub_board) == opponent_symbol:
-                score -= 1
-
-    return score
+    # Score the sub-boards won by each player
+    won = board_9d.bitboard.won
+    return bin(won[PLAYER_INDEX[player_symbol]]).count('1') - bin(won[PLAYER_INDEX[opponent_symbol]]).count('1')
 
 def generate_possible_moves(board_9d, next_board):
-    moves = []
+    bitboard = board_9d.bitboard
+    occupied = bitboard.occupied()
+    won = bitboard.won[0] | bitboard.won[1]
     if next_board:
-        r, c = next_board
-        if GameChecker.check_winner(board_9d.board[r][c]) is None:  # Check if the sub-board is not already won
-            for cr in range(3):
-                for cc in range(3):
-                    if board_9d.board[r][c].board[cr][cc] is None:
-                        moves.append(((r, c), (cr, cc)))
+        sub_boards = [next_board[0] * 3 + next_board[1]]
     else:
-        for r in range(3):
-            for c in range(3):
-                if GameChecker.check_winner(board_9d.board[r][c]) is None:  # Check if the sub-board is not already won
-                    for cr in range(3):
-                        for cc in range(3):
-                            if board_9d.board[r][c].board[cr][cc] is None:
-                                moves.append(((r, c), (cr, cc)))
+        sub_boards = range(9)
+    moves = []
+    for sub_board in sub_boards:
+        if won >> sub_board & 1:  # Check if the sub-board is not already won
+            continue
+        free = ~(occupied >> (sub_board * 9)) & SUB_BOARD_MASK
+        board_position = divmod(sub_board, 3)
+        moves.extend((board_position, divmod(cell, 3)) for cell in iter_bits(free))
     return moves
 
 def minimax(board_9d, depth, is_maximizing, player_symbol, opponent_symbol, next_board, max_depth):
@@ -79,16 +135,16 @@ def minimax(board_9d, depth, is_maximizing, player_symbol, opponent_symbol, next
     if is_maximizing:
         best_score = float('-inf')
         for move in generate_possible_moves(board_9d, next_board):
-            board_copy = copy.deepcopy(board_9d)
-            board_copy.place_piece(move[0], move[1], player_symbol)
-            next_sub_board = move[1] if not GameChecker.check_winner(board_copy.board[move[0][0]][move[0][1]]) else None
-            best_score = max(best_score, minimax(board_copy, depth + 1, False, player_symbol, opponent_symbol, next_sub_board, max_depth))
+            board_9d.push_move(move[0], move[1], player_symbol)
+            next_sub_board = move[1] if not GameChecker.check_winner(board_9d.board[move[0][0]][move[0][1]]) else None
+            best_score = max(best_score, minimax(board_9d, depth + 1, False, player_symbol, opponent_symbol, next_sub_board, max_depth))
+            board_9d.undo_move()
         return best_score
     else:
         best_score = float('inf')
         for move in generate_possible_moves(board_9d, next_board):
-            board_copy = copy.deepcopy(board_9d)
-            board_copy.place_piece(move[0], move[1], opponent_symbol)
-            next_sub_board = move[1] if not GameChecker.check_winner(board_copy.board[move[0][0]][move[0][1]]) else None
-            best_score = min(best_score, minimax(board_copy, depth + 1, True, player_symbol, opponent_symbol, next_sub_board, max_depth))
-        return best_score
\ No newline at end of file
+            board_9d.push_move(move[0], move[1], opponent_symbol)
+            next_sub_board = move[1] if not GameChecker.check_winner(board_9d.board[move[0][0]][move[0][1]]) else None
+            best_score = min(best_score, minimax(board_9d, depth + 1, True, player_symbol, opponent_symbol, next_sub_board, max_depth))
+            board_9d.undo_move()
+        return best_score
@@ -0,0 +1,235 @@
+"""NumPy-only inference for the policy/value network.
+
+A network is stored in a single ``.npz`` file holding an ``architecture`` JSON
+string and one weight/bias pair per layer. The architecture is a trunk followed
+by a policy head and a value head::
+
+    {"input": "grid" | "planes",
+     "trunk": [{"type": "conv2d", "activation": "relu"}, {"type": "flatten", "order": "chw"},
+               {"type": "dense", "activation": "relu"}],
+     "policy": [{"type": "dense", "activation": "softmax"}],
+     "value": [{"type": "dense", "activation": "tanh"}]}
+
+``"grid"`` feeds the 9x9 encoding of ``core.encoding`` as one channel, ``"planes"``
+splits it into a plane of own pieces and a plane of opponent pieces. Convolutions
+use "same" padding and are stored as ``(out, in, kh, kw)``, dense layers as
+``(in, out)``. Weights may be stored as float32, float16 or int8 with one float32
+scale per output unit; they are expanded to float32 when the file is loaded.
+
+Usage::
+
+    python -m core.numpy_net export model.h5 model.npz --dtype float16
+"""
+import argparse
+import json
+
+import numpy as np
+
+WEIGHT_DTYPES = ('float32', 'float16', 'int8')
+
+
+def _activate(x, activation):
+    if activation in (None, 'linear'):
+        return x
+    if activation == 'relu':
+        return np.maximum(x, 0)
+    if activation == 'tanh':
+        return np.tanh(x)
+    if activation == 'sigmoid':
+        return 1 / (1 + np.exp(-x))
+    if activation == 'softmax':
+        x = np.exp(x - x.max(axis=-1, keepdims=True))
+        return x / x.sum(axis=-1, keepdims=True)
+    raise ValueError(f"Unsupported activation: {activation}")
+
+
+def conv2d(x, weight, bias):
+    """'Same' 2D convolution of an ``N x C x H x W`` batch via im2col and one matmul."""
+    out_channels, in_channels, kernel_h, kernel_w = weight.shape
+    n, _, height, width = x.shape
+    pad_h, pad_w = kernel_h // 2, kernel_w // 2
+    padded = np.pad(x, ((0, 0), (0, 0), (pad_h, pad_h), (pad_w, pad_w)))
+    # N x C x H x W x kh x kw -> N x H x W x (C * kh * kw)
+    patches = np.lib.stride_tricks.sliding_window_view(padded, (kernel_h, kernel_w), axis=(2, 3))
+    columns = patches.transpose(0, 2, 3, 1, 4, 5).reshape(n, height * width, in_channels * kernel_h * kernel_w)
+    out = columns @ weight.reshape(out_channels, -1).T + bias
+    return out.transpose(0, 2, 1).reshape(n, out_channels, height, width)
+
+
+class NumpyPolicyValueNet:
+    """Forward pass of a network exported with ``save_network``."""
+
+    def __init__(self, architecture: dict, weights: dict) -> None:
+        self.architecture = architecture
+        self.weights = weights
+
+    @classmethod
+    def load(cls, path: str) -> 'NumpyPolicyValueNet':
+        with np.load(path) as data:
+            architecture = json.loads(str(data['architecture']))
+            weights = {}
+            for key in data.files:
+                if key == 'architecture' or key.endswith('.scale'):
+                    continue
+                array = data[key].astype(np.float32)
+                if f'{key}.scale' in data.files:
+                    array = array * _scale_shape(data[f'{key}.scale'], array.ndim)
+                weights[key] = array
+        return cls(architecture, weights)
+
+    def _run_layers(self, x, section):
+        for index, layer in enumerate(self.architecture[section]):
+            name = f'{section}.{index}'
+            if layer['type'] == 'conv2d':
+                x = conv2d(x, self.weights[f'{name}.weight'], self.weights[f'{name}.bias'])
+                x = _activate(x, layer.get('activation'))
+            elif layer['type'] == 'dense':
+                x = _activate(x @ self.weights[f'{name}.weight'] + self.weights[f'{name}.bias'], layer.get('activation'))
+            elif layer['type'] == 'flatten':
+                if layer.get('order', 'chw') == 'hwc':
+                    x = x.transpose(0, 2, 3, 1)
+                x = x.reshape(len(x), -1)
+            else:
+                raise ValueError(f"Unsupported layer type: {layer['type']}")
+        return x
+
+    def predict(self, inputs):
+        """Return ``(policies, values)`` for an ``N x 9 x 9`` batch of encoded positions."""
+        x = np.asarray(inputs, dtype=np.float32).reshape(-1, 9, 9)
+        if self.architecture.get('input', 'grid') == 'planes':
+            x = np.stack([x > 0.5, x < -0.5], axis=1).astype(np.float32)
+        else:
+            x = x[:, None]
+        features = self._run_layers(x, 'trunk')
+        policies = self._run_layers(features, 'policy')
+        values = self._run_layers(features, 'value')
+        return policies, values.reshape(len(values))
+
+
+def _scale_shape(scale, ndim):
+    """Broadcast per-output scales: axis 0 of a convolution, the last axis of a dense layer."""
+    return scale.reshape((-1,) + (1,) * (ndim - 1)) if ndim == 4 else scale
+
+
+def _quantize(key, array, dtype):
+    """Return the arrays to store for one weight in the requested dtype."""
+    if dtype == 'int8' and key.endswith('.weight'):
+        axes = tuple(range(1, array.ndim)) if array.ndim == 4 else tuple(range(array.ndim - 1))
+        scale = np.abs(array).max(axis=axes) / 127
+        scale[scale == 0] = 1
+        quantized = np.round(array / _scale_shape(scale, array.ndim)).astype(np.int8)
+        return {key: quantized, f'{key}.scale': scale.astype(np.float32)}
+    if dtype == 'float16':
+        return {key: array.astype(np.float16)}
+    return {key: array.astype(np.float32)}
+
+
+def save_network(path: str, architecture: dict, weights: dict, dtype='float32') -> None:
+    """Write an architecture and its weights to a ``.npz`` file."""
+    if dtype not in WEIGHT_DTYPES:
+        raise ValueError(f"dtype must be one of {WEIGHT_DTYPES}")
+    arrays = {'architecture': np.array(json.dumps(architecture))}
+    for key, array in weights.items():
+        arrays.update(_quantize(key, np.asarray(array, dtype=np.float32), dtype))
+    np.savez_compressed(path, **arrays)
+
+
+def export_torch_state_dict(state_dict, path: str, dtype='float32') -> None:
+    """Export the weights of ``TicTacToeNet`` (ml/model_training.ipynb) to ``.npz``."""
+    def array(name):
+        return state_dict[name].detach().cpu().numpy()
+
+    architecture = {
+        'input': 'planes',
+        'trunk': [{'type': 'conv2d', 'activation': 'relu'}] * 3
+                 + [{'type': 'flatten', 'order': 'chw'}, {'type': 'dense', 'activation': 'relu'}],
+        'policy': [{'type': 'dense', 'activation': 'softmax'}],
+        'value': [{'type': 'dense', 'activation': 'tanh'}],
+    }
+    weights = {}
+    for index, name in enumerate(('conv1', 'conv2', 'conv3')):
+        weights[f'trunk.{index}.weight'] = array(f'{name}.weight')
+        weights[f'trunk.{index}.bias'] = array(f'{name}.bias')
+    weights['trunk.4.weight'] = array('fc1.weight').T
+    weights['trunk.4.bias'] = array('fc1.bias')
+    for section, name in (('policy', 'fc_policy'), ('value', 'fc_value')):
+        weights[f'{section}.0.weight'] = array(f'{name}.weight').T
+        weights[f'{section}.0.bias'] = array(f'{name}.bias')
+    save_network(path, architecture, weights, dtype)
+
+
+def _keras_layer_spec(layer):
+    """Return ``(spec, weight, bias)`` for a supported Keras layer, or None to skip it."""
+    kind = type(layer).__name__
+    activation = getattr(getattr(layer, 'activation', None), '__name__', None)
+    if kind == 'Conv2D':
+        kernel, bias = layer.get_weights()
+        return {'type': 'conv2d', 'activation': activation}, kernel.transpose(3, 2, 0, 1), bias
+    if kind == 'Dense':
+        kernel, bias = layer.get_weights()
+        return {'type': 'dense', 'activation': activation}, kernel, bias
+    if kind == 'Flatten':
+        return {'type': 'flatten', 'order': 'hwc'}, None, None
+    if kind in ('InputLayer', 'Reshape', 'Dropout'):
+        return None
+    raise ValueError(f"Unsupported Keras layer: {kind}")
+
+
+def export_keras_model(model, path: str, dtype='float32') -> None:
+    """Export a two-headed Keras model (policy output first, value output second) to ``.npz``.
+
+    Layers shared by both outputs form the trunk, the remaining layers of each
+    output path form the heads. The model input is the 9x9 grid of one channel.
+    """
+    import keras
+
+    paths = [keras.Model(model.inputs, output).layers for output in model.outputs[:2]]
+    shared = [layer for layer in paths[0] if layer in paths[1]]
+    sections = {
+        'trunk': shared,
+        'policy': [layer for layer in paths[0] if layer not in shared],
+        'value': [layer for layer in paths[1] if layer not in shared],
+    }
+    architecture = {'input': 'grid'}
+    weights = {}
+    for section, layers in sections.items():
+        architecture[section] = []
+        for layer in layers:
+            spec = _keras_layer_spec(layer)
+            if spec is None:
+                continue
+            layer_spec, weight, bias = spec
+            name = f'{section}.{len(architecture[section])}'
+            architecture[section].append(layer_spec)
+            if weight is not None:
+                weights[f'{name}.weight'] = weight
+                weights[f'{name}.bias'] = bias
+    save_network(path, architecture, weights, dtype)
+
+
+def load_numpy_model(model_path):
+    """Model loader for ``core.inference``: returns the batch predict function."""
+    return NumpyPolicyValueNet.load(model_path).predict
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a policy/value network to the NumPy .npz format")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    export = subparsers.add_parser('export', help="convert a Keras .h5 model or a TicTacToeNet .pt state dict")
+    export.add_argument('source')
+    export.add_argument('destination')
+    export.add_argument('--dtype', choices=WEIGHT_DTYPES, default='float32')
+    args = parser.parse_args(argv)
+
+    if args.source.endswith('.pt') or args.source.endswith('.pth'):
+        import torch
+
+        export_torch_state_dict(torch.load(args.source, map_location='cpu'), args.destination, args.dtype)
+    else:
+        from keras.models import load_model
+
+        export_keras_model(load_model(args.source, compile=False), args.destination, args.dtype)
+
+
+if __name__ == '__main__':
+    main()
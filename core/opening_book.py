@@ -0,0 +1,205 @@
+"""Opening book: best replies precomputed offline and read through ``mmap``.
+
+Positions are reduced by the 8 board symmetries (see ``core.symmetry``) and
+identified by a 64-bit key of their canonical form. The book file holds the
+keys sorted, a bucket index on the top ``BUCKET_BITS`` bits of the key and the
+move (in the canonical orientation) for each key::
+
+    header   magic, version, bucket bits, entry count, max ply
+    buckets  (2 ** BUCKET_BITS + 1) uint32 offsets into the sorted keys
+    keys     count uint64
+    moves    count uint8
+
+A lookup reads one bucket and binary searches it, so every process serving
+games shares the page-cached file instead of holding a copy.
+
+Build a book with::
+
+    python -m core.opening_book build book.bin --player alpha_beta --max-ply 2
+"""
+import argparse
+import hashlib
+import mmap
+import struct
+import threading
+
+import numpy as np
+
+from core.bitboard import ANY_BOARD, PLAYER_INDEX, SYMBOLS, X, BitBoard, cell_index, index_to_positions, iter_bits
+from core.symmetry import ACTION_PERMUTATIONS, INVERSE_ACTION_PERMUTATIONS, SUB_BOARD_PERMUTATIONS, SYMMETRIES
+
+MAGIC = b'UTTTBOOK'
+VERSION = 1
+BUCKET_BITS = 16
+HEADER = struct.Struct('<8sHHII')
+
+# Where each symmetry sends a cell and a sub-board
+_CELL_IMAGES = INVERSE_ACTION_PERMUTATIONS.tolist()
+_SUB_BOARD_IMAGES = np.argsort(SUB_BOARD_PERMUTATIONS, axis=1).tolist()
+
+_books = {}
+_books_lock = threading.Lock()
+
+
+def _transform_mask(mask: int, images) -> int:
+    transformed = 0
+    for cell in iter_bits(mask):
+        transformed |= 1 << images[cell]
+    return transformed
+
+
+def canonical_position(bitboard, player: int):
+    """Return the 64-bit key of a position under the 8 symmetries and the symmetry reaching it."""
+    best = None
+    for symmetry in range(SYMMETRIES):
+        images = _CELL_IMAGES[symmetry]
+        active = bitboard.active if bitboard.active == ANY_BOARD else _SUB_BOARD_IMAGES[symmetry][bitboard.active]
+        form = (_transform_mask(bitboard.pieces[0], images), _transform_mask(bitboard.pieces[1], images), active)
+        if best is None or form < best[0]:
+            best = (form, symmetry)
+    (x_pieces, o_pieces, active), symmetry = best
+    data = x_pieces.to_bytes(11, 'little') + o_pieces.to_bytes(11, 'little') + bytes((active % 256, player))
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), 'little'), symmetry
+
+
+class OpeningBook:
+    """Read-only view of a book file."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as file:
+            self._mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, bucket_bits, count, self.max_ply = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not an opening book")
+        offset = HEADER.size
+        buckets = (1 << bucket_bits) + 1
+        self.bucket_shift = 64 - bucket_bits
+        self.buckets = np.frombuffer(self._mmap, dtype='<u4', count=buckets, offset=offset)
+        offset += buckets * 4
+        self.keys = np.frombuffer(self._mmap, dtype='<u8', count=count, offset=offset)
+        self.moves = np.frombuffer(self._mmap, dtype=np.uint8, count=count, offset=offset + count * 8)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def lookup(self, bitboard, player: int):
+        """Return the book move (cell index) for a position, or None if it is not in the book."""
+        if bin(bitboard.occupied()).count('1') > self.max_ply:
+            return None
+        key, symmetry = canonical_position(bitboard, player)
+        bucket = key >> self.bucket_shift
+        start, end = int(self.buckets[bucket]), int(self.buckets[bucket + 1])
+        index = start + int(np.searchsorted(self.keys[start:end], np.uint64(key)))
+        if index == end or int(self.keys[index]) != key:
+            return None
+        move = int(ACTION_PERMUTATIONS[symmetry][self.moves[index]])
+        # Guard against a key collision handing out an illegal move
+        return move if move in bitboard.legal_moves() else None
+
+    def move_for(self, game_controller_instance, symbol: str):
+        """Book move for ``symbol`` in a game as ``(board_position, cell_position)``, or None."""
+        move = self.lookup(game_controller_instance.position(), PLAYER_INDEX[symbol])
+        return None if move is None else index_to_positions(move)
+
+
+def load_opening_book(book):
+    """Return the process-wide ``OpeningBook`` for a path (an OpeningBook or None is returned as is)."""
+    if book is None or isinstance(book, OpeningBook):
+        return book
+    with _books_lock:
+        if book not in _books:
+            _books[book] = OpeningBook(book)
+        return _books[book]
+
+
+def write_opening_book(path: str, entries: dict, max_ply: int) -> None:
+    """Write ``{key: canonical move}`` entries to a book file."""
+    keys = np.array(sorted(entries), dtype='<u8')
+    moves = np.array([entries[key] for key in keys.tolist()], dtype=np.uint8)
+    buckets = np.searchsorted(keys >> np.uint64(64 - BUCKET_BITS), np.arange((1 << BUCKET_BITS) + 1, dtype=np.uint64)).astype('<u4')
+    with open(path, 'wb') as file:
+        file.write(HEADER.pack(MAGIC, VERSION, BUCKET_BITS, len(keys), max_ply))
+        file.write(buckets.tobytes())
+        file.write(keys.tobytes())
+        file.write(moves.tobytes())
+
+
+def opening_positions(max_ply: int):
+    """Yield one ``(bitboard, player)`` per symmetry class of position reachable in at most ``max_ply`` plies."""
+    frontier = [(BitBoard(), X)]
+    seen = {canonical_position(*frontier[0])[0]}
+    for ply in range(max_ply + 1):
+        next_frontier = []
+        for bitboard, player in frontier:
+            if bitboard.result() is not None:
+                continue
+            yield bitboard, player
+            if ply == max_ply:
+                continue
+            for move in bitboard.legal_moves():
+                child = bitboard.copy()
+                child.make_move(move, player)
+                key = canonical_position(child, 1 - player)[0]
+                if key not in seen:
+                    seen.add(key)
+                    next_frontier.append((child, 1 - player))
+        frontier = next_frontier
+
+
+def _book_entry(task):
+    """Search one position with a fresh AI player and return its book entry."""
+    from core.board_9D import Board_9D
+    from core.game_checker_9d import GameChecker9D
+    from core.game_controller import GameController
+    from core.player_registry import create_player
+    from core.rule import StandardUltimateTicTacToeRule
+
+    bitboard, player, player_name, options = task
+    symbol = SYMBOLS[player]
+    ai_player = create_player(player_name, "book", symbol, **options)
+    controller = GameController("book", Board_9D(bitboard.copy()), GameChecker9D(), StandardUltimateTicTacToeRule())
+    controller.current_player = controller.players[symbol]
+    controller.next_board = None if bitboard.active == ANY_BOARD else divmod(bitboard.active, 3)
+    move = cell_index(*ai_player.get_move(controller))
+    key, symmetry = canonical_position(bitboard, player)
+    return key, _CELL_IMAGES[symmetry][move]
+
+
+def build_opening_book(path: str, max_ply=2, player_name='alpha_beta', player_options=None, workers=1,
+                       log=print) -> int:
+    """Search every opening position up to ``max_ply`` with an AI player and write the book.
+
+    Returns the number of entries.
+    """
+    tasks = [(bitboard, player, player_name, player_options or {}) for bitboard, player in opening_positions(max_ply)]
+    log(f"Searching {len(tasks)} positions with {player_name}")
+    if workers > 1:
+        import multiprocessing
+
+        with multiprocessing.Pool(workers) as pool:
+            entries = dict(pool.imap_unordered(_book_entry, tasks))
+    else:
+        entries = dict(map(_book_entry, tasks))
+    write_opening_book(path, entries, max_ply)
+    return len(entries)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build an opening book with one of the AI players")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build = subparsers.add_parser('build')
+    build.add_argument('path')
+    build.add_argument('--max-ply', type=int, default=2)
+    build.add_argument('--player', default='alpha_beta', help="registered AI player name")
+    build.add_argument('--time-budget', type=float, default=5.0, help="seconds per position for alpha_beta")
+    build.add_argument('--workers', type=int, default=1)
+    args = parser.parse_args(argv)
+
+    options = {'time_budget': args.time_budget} if args.player in ('alpha_beta', 'parallel_alpha_beta') else {}
+    count = build_opening_book(args.path, args.max_ply, args.player, options, args.workers)
+    print(f"Wrote {count} positions to {args.path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,179 @@
+import itertools
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+from core.alpha_beta_player import WIN_SCORE, AlphaBetaAIPlayer, _SearchTimeout
+from core.transposition import TranspositionTable
+
+# Number of searches that can share one pool at the same time, one bound slot each
+MAX_CONCURRENT_SEARCHES = 64
+WORKER_TABLE_ENTRIES = 1 << 17
+CANCEL_POLL_SECONDS = 0.05
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# State of a pool worker process, set by _init_worker
+_worker_bounds = None
+_worker_owners = None
+_worker_searcher = None
+
+
+class SearchPool:
+    """Process pool with shared root bounds, reused by every search of the same size."""
+
+    def __init__(self, workers: int) -> None:
+        self.workers = workers
+        self.bounds = multiprocessing.Array('q', MAX_CONCURRENT_SEARCHES)
+        # Id of the search owning each slot, so late results of a timed out search are ignored
+        self.owners = multiprocessing.Array('q', MAX_CONCURRENT_SEARCHES, lock=False)
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                            initargs=(self.bounds, self.owners, WORKER_TABLE_ENTRIES))
+        self._search_ids = itertools.count(1)
+        self._free_slots = list(range(MAX_CONCURRENT_SEARCHES))
+        self._lock = threading.Lock()
+
+    def acquire_slot(self):
+        """Reserve a bound slot and return ``(slot, search_id)``, or None if all are in use."""
+        with self._lock:
+            if not self._free_slots:
+                return None
+            slot, search_id = self._free_slots.pop(), next(self._search_ids)
+        with self.bounds.get_lock():
+            self.owners[slot] = search_id
+        return slot, search_id
+
+    def release_slot(self, slot: int) -> None:
+        with self._lock:
+            self._free_slots.append(slot)
+
+    def shutdown(self) -> None:
+        self.executor.shutdown(cancel_futures=True)
+
+
+def get_pool(workers: int) -> SearchPool:
+    """Return the shared pool with ``workers`` processes, starting it on first use."""
+    with _pools_lock:
+        pool = _pools.get(workers)
+        if pool is None:
+            pool = _pools[workers] = SearchPool(workers)
+        return pool
+
+
+def shutdown_pools() -> None:
+    with _pools_lock:
+        for pool in _pools.values():
+            pool.shutdown()
+        _pools.clear()
+
+
+def _init_worker(bounds, owners, table_entries):
+    global _worker_bounds, _worker_owners, _worker_searcher
+    _worker_bounds = bounds
+    _worker_owners = owners
+    # The worker table persists across tasks, so later iterations reuse earlier results
+    _worker_searcher = AlphaBetaAIPlayer("worker", 'X', transposition_table=TranspositionTable(table_entries))
+
+
+def _search_move(bitboard, move, player, depth, slot, search_id, deadline):
+    """Search one root move in a worker and publish its score as the new shared alpha.
+
+    Returns ``(move, score, nodes, alpha)`` with the alpha the move was searched
+    against: a score above it is exact, otherwise it is only an upper bound.
+    """
+    searcher = _worker_searcher
+    searcher._deadline = time.perf_counter() + (deadline - time.time())
+    searcher.nodes = 0
+    searcher.killers = [[None, None] for _ in range(82)]
+    alpha = _worker_bounds[slot]
+    bitboard.make_move(move, player)
+    try:
+        score = -searcher.negamax(bitboard, depth - 1, -WIN_SCORE - 1, -alpha, 1 - player, 1)
+    except _SearchTimeout:
+        return move, None, searcher.nodes, alpha
+    with _worker_bounds.get_lock():
+        if _worker_owners[slot] == search_id and score > _worker_bounds[slot]:
+            _worker_bounds[slot] = score
+    return move, score, searcher.nodes, alpha
+
+
+class ParallelAlphaBetaAIPlayer(AlphaBetaAIPlayer):
+    """AlphaBetaAIPlayer that splits the root moves of every iteration across processes.
+
+    The first root move is searched locally to establish a bound (young brothers
+    wait), then the remaining moves are searched in a shared process pool. Workers
+    read the best root score found so far from shared memory and publish any
+    improvement, so later moves are searched with a tighter window.
+    """
+
+    def __init__(self, name, symbol, max_depth=20, time_budget=1.0, workers=None, transposition_table=None,
+                 opening_book=None):
+        super().__init__(name, symbol, max_depth=max_depth, time_budget=time_budget,
+                         transposition_table=transposition_table, opening_book=opening_book)
+        self.workers = workers or multiprocessing.cpu_count()
+        self._pool = None
+        self._slot = None
+        self._search_id = None
+
+    def search(self, bitboard, player):
+        self._pool = get_pool(self.workers)
+        reservation = self._pool.acquire_slot()
+        if reservation is not None:
+            self._slot, self._search_id = reservation
+        try:
+            return super().search(bitboard, player)
+        finally:
+            if self._slot is not None:
+                self._pool.release_slot(self._slot)
+            self._slot = None
+
+    def search_root(self, bitboard, moves, player, depth):
+        if self._slot is None or len(moves) == 1:
+            # Every bound slot of the pool is in use, search serially
+            return super().search_root(bitboard, moves, player, depth)
+
+        best_move = moves[0]
+        alpha = self._search_exact(bitboard, best_move, player, depth)
+        self._pool.bounds[self._slot] = alpha
+
+        remaining = self._deadline - time.perf_counter()
+        deadline = time.time() + remaining
+        futures = [self._pool.executor.submit(_search_move, bitboard, move, player, depth,
+                                               self._slot, self._search_id, deadline)
+                   for move in moves[1:]]
+        not_done = futures
+        give_up = time.perf_counter() + max(remaining, 0) + 0.1
+        # Wait in short slices so that a cancel does not wait for the workers' deadline
+        while not_done and time.perf_counter() < give_up and not self.cancelled.is_set():
+            _, not_done = wait(not_done, timeout=min(CANCEL_POLL_SECONDS, max(give_up - time.perf_counter(), 0)))
+        if not_done:
+            for future in not_done:
+                future.cancel()
+            raise _SearchTimeout()
+
+        for future in futures:
+            move, score, nodes, searched_alpha = future.result()
+            self.nodes += nodes
+            if score is None:
+                raise _SearchTimeout()
+            if score <= alpha:
+                continue
+            if score <= searched_alpha:
+                # Failed low against a bound published by another move: only an upper bound,
+                # which may still exceed alpha as results are read in submission order
+                score = self._search_exact(bitboard, move, player, depth)
+                if score <= alpha:
+                    continue
+            alpha = score
+            best_move = move
+        return alpha, best_move
+
+    def _search_exact(self, bitboard, move, player, depth):
+        """Score of one root move searched locally with a full window."""
+        undo = bitboard.make_move(move, player)
+        try:
+            return -self.negamax(bitboard, depth - 1, -WIN_SCORE - 1, WIN_SCORE + 1, 1 - player, 1)
+        finally:
+            bitboard.unmake_move(undo)
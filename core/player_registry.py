@@ -0,0 +1,52 @@
+"""Registry of AI player types resolved lazily by name.
+
+Factories are registered as ``"module:attribute"`` strings and only imported when a
+player of that type is first created, so heavy backends such as Keras are never
+loaded by processes that do not use them.
+"""
+import importlib
+import threading
+
+from core.exceptions import UnknownPlayerError
+
+_factories = {
+    'random': 'core.ai_player:RandomAIPlayer',
+    'minimax': 'core.min_max_player:MinimaxAIPlayer',
+    'alpha_beta': 'core.alpha_beta_player:AlphaBetaAIPlayer',
+    'parallel_alpha_beta': 'core.parallel_search:ParallelAlphaBetaAIPlayer',
+    'alpha_zero': 'core.alpha_zero_player:AlphaZeroAIPlayer',
+}
+_resolved = {}
+_lock = threading.Lock()
+
+
+def register_player(name: str, factory) -> None:
+    """Register a player factory, given as a callable or a ``"module:attribute"`` string."""
+    with _lock:
+        _factories[name] = factory
+        _resolved.pop(name, None)
+
+
+def available_players() -> list:
+    return sorted(_factories)
+
+
+def get_player_factory(name: str):
+    """Return the factory registered under ``name``, importing its module on first use."""
+    factory = _resolved.get(name)
+    if factory is not None:
+        return factory
+    with _lock:
+        if name not in _factories:
+            raise UnknownPlayerError(name)
+        factory = _factories[name]
+        if isinstance(factory, str):
+            module_name, attribute = factory.split(':')
+            factory = getattr(importlib.import_module(module_name), attribute)
+        _resolved[name] = factory
+        return factory
+
+
+def create_player(name: str, *args, **kwargs):
+    """Create a player of the registered type ``name``."""
+    return get_player_factory(name)(*args, **kwargs)
@@ -0,0 +1,46 @@
+"""The 8 symmetries of the board (rotations and reflections of the 9x9 grid).
+
+Rotating or reflecting the whole grid moves sub-boards and the cells inside them
+together, so the game is unchanged. Each symmetry is given as permutations:
+
+- ``GRID_PERMUTATIONS[t]`` for flat 9x9 grids (network inputs):
+  ``transformed = grid.reshape(81)[GRID_PERMUTATIONS[t]]``.
+- ``ACTION_PERMUTATIONS[t]`` for anything indexed by action (policies, legal masks):
+  ``transformed = policy[ACTION_PERMUTATIONS[t]]``, and ``INVERSE_ACTION_PERMUTATIONS[t]``
+  maps it back.
+- ``SUB_BOARD_PERMUTATIONS[t]`` for the 9 sub-boards (won masks, active board).
+"""
+import numpy as np
+
+from core.encoding import CELL_TO_GRID, GRID_TO_CELL
+
+SYMMETRIES = 8
+
+
+def _grid_permutations(size: int) -> np.ndarray:
+    index = np.arange(size * size).reshape(size, size)
+    rotations = [np.rot90(index, k) for k in range(4)]
+    return np.array([grid.ravel() for grid in rotations + [np.fliplr(grid) for grid in rotations]])
+
+
+GRID_PERMUTATIONS = _grid_permutations(9)
+ACTION_PERMUTATIONS = GRID_TO_CELL[GRID_PERMUTATIONS[:, CELL_TO_GRID]]
+INVERSE_ACTION_PERMUTATIONS = np.argsort(ACTION_PERMUTATIONS, axis=1)
+SUB_BOARD_PERMUTATIONS = _grid_permutations(3)
+
+
+def canonical_keys(inputs):
+    """Return a canonical key and the symmetry reaching it for each ``9 x 9`` network input.
+
+    Symmetric positions get the same key: the smallest byte string among the 8
+    transformed grids. Inputs only hold -1, 0, ``VALID_MOVE_VALUE`` and 1, so they
+    are stored exactly as int8 tenths.
+    """
+    codes = np.round(np.asarray(inputs, dtype=np.float32).reshape(-1, 81) * 10).astype(np.int8)
+    variants = codes[:, GRID_PERMUTATIONS]  # N x 8 x 81
+    keys, transforms = [], []
+    for position in variants:
+        key, transform = min((variant.tobytes(), t) for t, variant in enumerate(position))
+        keys.append(key)
+        transforms.append(transform)
+    return keys, transforms
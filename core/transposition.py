@@ -0,0 +1,74 @@
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+
+class TranspositionTable:
+    """Fixed-size table of search results keyed by 64-bit Zobrist keys.
+
+    Each slot holds one ``(key, depth, score, bound, best_move, generation)``
+    entry. On a slot conflict the new entry replaces the old one if the old one
+    was stored during an earlier search (``new_search`` starts a generation) or
+    if the new one was searched at least as deep. A table can be kept on the
+    player and shared across the moves of a game, or shared by the players of
+    many games since keys include the side to move. The slots are only
+    allocated by the first ``store``, so an unused table costs almost nothing.
+    """
+
+    def __init__(self, max_entries: int = 1 << 18) -> None:
+        self.max_entries = max_entries
+        self.entries = None
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        self.replacements = 0
+
+    def new_search(self) -> None:
+        """Mark existing entries as aged so that they are replaced first."""
+        self.generation += 1
+
+    def clear(self) -> None:
+        self.entries = None
+        self.generation = 0
+
+    def probe(self, key: int):
+        """Return ``(depth, score, bound, best_move)`` for ``key``, or None."""
+        entry = self.entries[key % self.max_entries] if self.entries is not None else None
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry[0] != key:
+            self.collisions += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[1:5]
+
+    def store(self, key: int, depth: int, score: int, bound: int, best_move) -> None:
+        if self.entries is None:
+            self.entries = [None] * self.max_entries
+        slot = key % self.max_entries
+        entry = self.entries[slot]
+        if entry is not None:
+            if entry[0] != key and entry[5] == self.generation and entry[1] > depth:
+                return
+            if entry[0] != key:
+                self.replacements += 1
+        self.entries[slot] = (key, depth, score, bound, best_move, self.generation)
+        self.stores += 1
+
+    def stats(self) -> dict:
+        """Counters for sizing the table, plus the number of filled slots."""
+        probes = self.hits + self.misses
+        return {
+            'max_entries': self.max_entries,
+            'filled': sum(entry is not None for entry in self.entries or ()),
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'replacements': self.replacements,
+            'hit_rate': self.hits / probes if probes else 0.0,
+        }
@@ -0,0 +1,117 @@
+"""Array-backed engine advancing many games at once.
+
+The state of N games is held in NumPy arrays using the cell index order of
+``core.bitboard``: ``pieces`` (N x 2 x 81), ``won`` (N x 2 x 9), ``full``
+(N x 9), ``active`` (N, ``ANY_BOARD`` when the player may choose), ``player``
+(N, side to move) and ``winner`` (N, ``NO_WINNER`` while the game is running,
+then X, O or DRAW). The rules are those of ``StandardUltimateTicTacToeRule`` and
+``GameChecker9D``: the next move goes to the sub-board matching the cell just
+played unless it is won or full, and the game is won by three sub-boards in a
+line. A game without legal moves left is a draw.
+"""
+import numpy as np
+
+from core.bitboard import ANY_BOARD, DRAW, O, X, BitBoard
+from core.evaluator import LINE_CELLS, SUB_BOARD_LINE_INDEX
+
+NO_WINNER = -1
+
+
+class VectorizedGames:
+    def __init__(self, games: int) -> None:
+        self.pieces = np.zeros((games, 2, 81), dtype=bool)
+        self.won = np.zeros((games, 2, 9), dtype=bool)
+        self.full = np.zeros((games, 9), dtype=bool)
+        self.active = np.full(games, ANY_BOARD, dtype=np.int8)
+        self.player = np.full(games, X, dtype=np.int8)
+        self.winner = np.full(games, NO_WINNER, dtype=np.int8)
+        self.moves_played = np.zeros(games, dtype=np.int16)
+
+    def __len__(self) -> int:
+        return len(self.player)
+
+    @classmethod
+    def from_bitboards(cls, bitboards, players) -> 'VectorizedGames':
+        """Load ``BitBoard`` positions with the player to move in each."""
+        games = cls(len(bitboards))
+        for game, (bitboard, player) in enumerate(zip(bitboards, players)):
+            for side in (X, O):
+                games.pieces[game, side] = [bitboard.pieces[side] >> cell & 1 for cell in range(81)]
+                games.won[game, side] = [bitboard.won[side] >> sub_board & 1 for sub_board in range(9)]
+            games.full[game] = [bitboard.full >> sub_board & 1 for sub_board in range(9)]
+            games.active[game] = bitboard.active
+            games.player[game] = player
+            games.moves_played[game] = bin(bitboard.occupied()).count('1')
+        games.winner[:] = [NO_WINNER if bitboard.winner is None else bitboard.winner for bitboard in bitboards]
+        games.winner[(games.winner == NO_WINNER) & ~games.legal_masks().any(axis=1)] = DRAW
+        return games
+
+    def to_bitboard(self, game: int) -> BitBoard:
+        bitboard = BitBoard()
+        for sub_board in range(9):
+            x_mask, o_mask = (int(np.dot(self.pieces[game, side, sub_board * 9:sub_board * 9 + 9], 1 << np.arange(9)))
+                              for side in (X, O))
+            bitboard.set_sub_board(sub_board, x_mask, o_mask)
+        bitboard.active = int(self.active[game])
+        return bitboard
+
+    def is_terminal(self) -> np.ndarray:
+        return self.winner != NO_WINNER
+
+    def legal_masks(self) -> np.ndarray:
+        """N x 81 boolean mask of the legal moves of each game, all False once it is over."""
+        open_boards = ~(self.won.any(axis=1) | self.full)
+        allowed = np.where((self.active == ANY_BOARD)[:, None], open_boards,
+                           np.arange(9) == self.active[:, None])
+        legal = ~self.pieces.any(axis=1) & np.repeat(allowed, 9, axis=1)
+        legal[self.winner != NO_WINNER] = False
+        return legal
+
+    def apply_moves(self, moves, games=None) -> None:
+        """Play ``moves[i]`` in game ``games[i]`` (every game by default) for its player to move.
+
+        Moves are assumed legal; callers pick them from ``legal_masks``.
+        """
+        games = np.arange(len(self)) if games is None else np.asarray(games)
+        moves = np.asarray(moves)
+        players = self.player[games]
+        sub_boards, cells = np.divmod(moves, 9)
+        self.pieces[games, players, moves] = True
+        self.moves_played[games] += 1
+
+        # Only the touched sub-board and the macro board need to be checked
+        lines = self.pieces[games[:, None, None], players[:, None, None], SUB_BOARD_LINE_INDEX[sub_boards]]
+        self.won[games, players, sub_boards] |= lines.all(axis=2).any(axis=1)
+        board_cells = sub_boards[:, None] * 9 + np.arange(9)
+        occupied = self.pieces[games[:, None], X, board_cells] | self.pieces[games[:, None], O, board_cells]
+        self.full[games, sub_boards] = occupied.all(axis=1)
+        macro = self.won[games, players][:, LINE_CELLS].all(axis=2).any(axis=1)
+        self.winner[games[macro]] = players[macro]
+
+        closed = self.won[games].any(axis=1) | self.full[games]
+        self.active[games] = np.where(closed[np.arange(len(games)), cells], ANY_BOARD, cells)
+        self.player[games] = 1 - players
+
+        # A running game without a legal move is a draw
+        running = games[self.winner[games] == NO_WINNER]
+        if len(running):
+            stuck = running[~self.legal_masks()[running].any(axis=1)]
+            self.winner[stuck] = DRAW
+
+    def random_moves(self, rng) -> np.ndarray:
+        """Pick a uniformly random legal move in every running game (-1 for finished ones)."""
+        legal = self.legal_masks()
+        scores = np.where(legal, rng.random(legal.shape), -1.0)
+        return np.where(legal.any(axis=1), scores.argmax(axis=1), -1)
+
+    def random_playout(self, rng=None) -> np.ndarray:
+        """Play every game to the end with uniformly random legal moves, like ``RandomAIPlayer``.
+
+        Returns the winner of each game: X, O or DRAW.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        while True:
+            running = np.flatnonzero(self.winner == NO_WINNER)
+            if not len(running):
+                return self.winner.copy()
+            self.apply_moves(self.random_moves(rng)[running], running)
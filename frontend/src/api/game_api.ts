@@ -1,5 +1,7 @@
 import { get, writable } from 'svelte/store';
 import { isWebSocketConnected, gameState } from './store';
+import { applyUpdate, fromSnapshot, toGameState } from './protocol';
+import type { IProtocolState } from './protocol';
 
 export interface IGameState {
   gameStarted: boolean;
@@ -9,13 +11,23 @@ export interface IGameState {
   next_board?: Array<number>;
   game_over?: string | null;
   won_board?: { [key: string]: Array<Array<number>> }; // New attribute
+  version?: number; // Number of moves played
 }
 
 let socket: WebSocket | null = null;
 let isSocketConnected = false;
+// Position received over the compact protocol
+let protocolState: IProtocolState | null = null;
+
+function showProtocolState(state: IProtocolState, updateGameStateCallback: (newState: any) => void) {
+  protocolState = state;
+  gameState.update(current => ({ ...current, ...toGameState(state) }));
+  updateGameStateCallback(get(gameState));
+}
 
 export function connectWebSocket(gameId: string, updateGameStateCallback: (newState: any) => void) {
-  socket = new WebSocket(`ws://127.0.0.1:8000/ws/${gameId}`);
+  protocolState = null;
+  socket = new WebSocket(`ws://127.0.0.1:8000/ws/${gameId}?protocol=delta`);
 
   socket.onopen = () => {
     console.log('WebSocket connection established');
@@ -25,7 +37,19 @@ export function connectWebSocket(gameId: string, updateGameStateCallback: (newSt
 
   socket.onmessage = (event) => {
     const data = JSON.parse(event.data);
-    if (data.type === 'game_state') {
+    if (data.type === 'snapshot') {
+      showProtocolState(fromSnapshot(data), updateGameStateCallback);
+    } else if (data.type === 'move') {
+      // Updates received before the first snapshot are already part of it
+      if (protocolState) {
+        const state = applyUpdate(protocolState, data);
+        if (state === null) {
+          getBoard(gameId, updateGameStateCallback);
+        } else if (state !== protocolState) {
+          showProtocolState(state, updateGameStateCallback);
+        }
+      }
+    } else if (data.type === 'game_state') {
       gameState.update(state => ({ ...state, ...data.state, game_id: gameId }));
       updateGameStateCallback(get(gameState));
     } else if (data.type === 'error') {
@@ -94,15 +118,21 @@ export async function startGame(updateGameStateCallback: (newState: any) => void
 
 export async function getBoard(gameId: string, updateGameStateCallback: (newState: any) => void): Promise<void> {
   try {
-    const response = await fetch(`http://127.0.0.1:8000/get_board/${gameId}`);
-    const data = await response.json();
-    gameState.update(state => ({
-      ...state,
-      boards: data.boards,
-      won_board: data.won_board,  // Include won_board in the state
-      game_id: gameId
-    }));
-    updateGameStateCallback(get(gameState));
+    // The ETag is the number of moves played and the format, so the board is only sent again once a move was played
+    const headers: HeadersInit = protocolState && protocolState.game_id === gameId
+      ? { 'If-None-Match': `"${protocolState.v}-snapshot"` } : {};
+    const response = await fetch(`http://127.0.0.1:8000/get_board/${gameId}?format=snapshot`, { headers });
+    if (response.status === 304) {
+      return;
+    }
+    if (!response.ok) {
+      throw new Error((await response.json()).detail);
+    }
+    const state = fromSnapshot(await response.json());
+    // Move updates received meanwhile may already be ahead of this snapshot
+    if (!protocolState || protocolState.game_id !== gameId || state.v > protocolState.v) {
+      showProtocolState(state, updateGameStateCallback);
+    }
   } catch (error: any) {
     handleError(error.message);
   }
@@ -0,0 +1,95 @@
+// Decoder of the compact game state protocol (see api/protocol.py).
+// A snapshot carries the whole position, then each move update only the move and what it changed.
+import type { IGameState } from './game_api';
+
+export interface ISnapshot {
+  type: 'snapshot';
+  v: number;
+  game_id: string;
+  board: string; // 81 cells in cell index order (sub_board * 9 + cell): 'X', 'O' or '.'
+  won: string; // 9 sub-boards: 'X', 'O', 'D' (draw) or '.'
+  player: string;
+  active: number; // sub-board to play in, -1 for any
+  status: string | null;
+}
+
+export interface IMoveUpdate {
+  type: 'move';
+  v: number;
+  cell: number;
+  sub: string; // new status of the sub-board of the move
+  active: number;
+  status: string | null;
+}
+
+// Protocol state of a game: the position as received, before conversion to IGameState
+export interface IProtocolState {
+  v: number;
+  game_id: string;
+  board: string[];
+  won: string[];
+  player: string;
+  active: number;
+  status: string | null;
+}
+
+export function fromSnapshot(snapshot: ISnapshot): IProtocolState {
+  return {
+    v: snapshot.v,
+    game_id: snapshot.game_id,
+    board: snapshot.board.split(''),
+    won: snapshot.won.split(''),
+    player: snapshot.player,
+    active: snapshot.active,
+    status: snapshot.status,
+  };
+}
+
+// Returns the state after the update, the same state for an update it already includes,
+// or null when updates were missed and a new snapshot is needed.
+export function applyUpdate(state: IProtocolState, update: IMoveUpdate): IProtocolState | null {
+  if (update.v <= state.v) {
+    return state;
+  }
+  if (update.v !== state.v + 1) {
+    return null;
+  }
+  const board = state.board.slice();
+  // X plays the even versions
+  board[update.cell] = state.v % 2 === 0 ? 'X' : 'O';
+  const won = state.won.slice();
+  won[Math.floor(update.cell / 9)] = update.sub;
+  return {
+    ...state,
+    v: update.v,
+    board,
+    won,
+    player: update.v % 2 === 0 ? 'X' : 'O',
+    active: update.active,
+    status: update.status,
+  };
+}
+
+export function toGameState(state: IProtocolState): Partial<IGameState> {
+  const cell = (boardRow: number, boardCol: number, cellRow: number, cellCol: number) => {
+    const symbol = state.board[(boardRow * 3 + boardCol) * 9 + cellRow * 3 + cellCol];
+    return symbol === '.' ? null : symbol;
+  };
+  const range = [0, 1, 2];
+  const wonBoard: { [key: string]: Array<Array<number>> } = { X: [], O: [] };
+  state.won.forEach((result, subBoard) => {
+    if (result === 'X' || result === 'O') {
+      wonBoard[result].push([Math.floor(subBoard / 3), subBoard % 3]);
+    }
+  });
+  return {
+    game_id: state.game_id,
+    version: state.v,
+    boards: range.map(boardRow => range.map(boardCol =>
+      range.map(cellRow => range.map(cellCol => cell(boardRow, boardCol, cellRow, cellCol))))),
+    current_player: state.player,
+    next_board: state.active === -1 ? undefined : [Math.floor(state.active / 3), state.active % 3],
+    game_over: state.status,
+    won_board: wonBoard,
+  };
+}
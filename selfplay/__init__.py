@@ -0,0 +1,3 @@
+from selfplay.game_state import GameState
+from selfplay.pipeline import load_shards, play_game, run_self_play
+from selfplay.replay_buffer import ReplayBuffer
@@ -0,0 +1,27 @@
+"""Command line entry point: ``python -m selfplay OUTPUT_DIR --games 1000 --model model.npz``."""
+import argparse
+
+from selfplay.pipeline import run_self_play
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate self-play training data")
+    parser.add_argument('output_dir')
+    parser.add_argument('--games', type=int, required=True, help="total number of games the directory should hold")
+    parser.add_argument('--model', help="model file (.npz, .h5, .keras); uniform priors when omitted")
+    parser.add_argument('--workers', type=int, help="worker processes, one per CPU by default")
+    parser.add_argument('--simulations', type=int, default=200)
+    parser.add_argument('--games-per-shard', type=int, default=25)
+    parser.add_argument('--temperature-moves', type=int, default=10)
+    parser.add_argument('--seed', type=int)
+    args = parser.parse_args(argv)
+
+    stats = run_self_play(args.output_dir, args.games, model_path=args.model, workers=args.workers,
+                          simulations=args.simulations, games_per_shard=args.games_per_shard,
+                          temperature_moves=args.temperature_moves, seed=args.seed)
+    print(f"{stats['games']} games, {stats['samples']} samples in {stats['seconds']:.1f}s "
+          f"({stats['games_per_second']:.2f} games/s, {stats['samples_per_second']:.1f} samples/s)")
+
+
+if __name__ == '__main__':
+    main()
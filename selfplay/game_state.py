@@ -0,0 +1,47 @@
+import numpy as np
+
+from core.bitboard import DRAW, X, BitBoard
+from core.encoding import encode_position
+
+
+class GameState:
+    """Immutable game position for self-play: a BitBoard and the player to move.
+
+    Actions are cell indices (``sub_board * 9 + cell``), the same as the network
+    policy indices.
+    """
+
+    def __init__(self, bitboard=None, player=X, last_move=None) -> None:
+        self.bitboard = bitboard if bitboard is not None else BitBoard()
+        self.player = player
+        self.last_move = last_move
+
+    def get_legal_actions(self) -> list:
+        return [] if self.is_terminal() else self.bitboard.legal_moves()
+
+    def take_action(self, action: int) -> 'GameState':
+        """Return the position after the player to move plays ``action``."""
+        bitboard = self.bitboard.copy()
+        bitboard.make_move(action, self.player)
+        return GameState(bitboard, 1 - self.player, action)
+
+    def is_terminal(self) -> bool:
+        return self.bitboard.result() is not None
+
+    def winner(self):
+        """X or O for a won game, DRAW for a drawn one, None while it is in progress."""
+        return self.bitboard.result()
+
+    def reward(self) -> float:
+        """Outcome for the player to move: 1 if they have won, -1 if the opponent has, 0 otherwise.
+
+        After a winning move the player to move is the loser, so a finished game gives -1 or 0.
+        """
+        result = self.bitboard.result()
+        if result is None or result == DRAW:
+            return 0.0
+        return 1.0 if result == self.player else -1.0
+
+    def to_tensor(self) -> np.ndarray:
+        """The 9x9 network input from the point of view of the player to move."""
+        return encode_position(self.bitboard, self.player)[0]
@@ -0,0 +1,217 @@
+"""Multi-process self-play data generation.
+
+Worker processes play games with ``PUCTSearch`` against themselves and write
+``(state, policy, outcome)`` samples to shard files in the output directory:
+``shard-w<worker>-<index>.npz`` holding ``states`` (N x 9 x 9), ``policies``
+(N x 81), ``outcomes`` (N, for the player to move) and ``games``. Shards are
+written atomically, so a stopped run is resumed by running it again: games
+already stored in shards are not replayed.
+
+Every worker loads the same model snapshot, a copy of the model taken when the
+run starts, so that training can overwrite the model file meanwhile.
+"""
+import glob
+import multiprocessing
+import os
+import queue
+import re
+import shutil
+import time
+import traceback
+
+import numpy as np
+
+from core.bitboard import DRAW
+from core.encoding import encode_positions
+from core.mcts import PUCTSearch
+from selfplay.game_state import GameState
+
+SHARD_PATTERN = re.compile(r'shard-w(\d+)-(\d+)\.npz$')
+SNAPSHOT_NAME = 'model-snapshot'
+# How often the parent checks that silent workers are still alive
+PROGRESS_POLL_SECONDS = 5.0
+
+
+def uniform_evaluate(positions):
+    """Evaluation without a model: uniform priors and a value of 0."""
+    return np.full((len(positions), 81), 1 / 81), np.zeros(len(positions))
+
+
+def model_evaluator(model_path):
+    """Return an MCTS evaluate function backed by the process-wide inference service."""
+    from core.inference import get_inference_service
+
+    service = get_inference_service(model_path, max_wait=0.0)
+
+    def evaluate(positions):
+        inputs, _ = encode_positions(positions)
+        return service.evaluate(inputs)
+
+    return evaluate
+
+
+def play_game(search: PUCTSearch, rng, temperature_moves=10):
+    """Play one game and return its ``(states, policies, outcomes)`` arrays.
+
+    Moves are sampled from the visit distribution for the first
+    ``temperature_moves`` plies and chosen greedily afterwards.
+    """
+    search.reset()
+    state = GameState()
+    positions, policies, players = [], [], []
+    while not state.is_terminal():
+        probs = search.get_action_probs(state.bitboard, state.player)
+        positions.append((state.bitboard, state.player))
+        policies.append(probs)
+        players.append(state.player)
+        if len(players) <= temperature_moves:
+            action = int(rng.choice(81, p=probs))
+        else:
+            action = int(np.argmax(probs))
+        state = state.take_action(action)
+
+    winner = state.winner()
+    players = np.array(players)
+    outcomes = np.zeros(len(players), dtype=np.float32) if winner == DRAW else np.where(players == winner, 1.0, -1.0)
+    states, _ = encode_positions(positions)
+    return states, np.array(policies, dtype=np.float32), outcomes.astype(np.float32)
+
+
+def existing_shards(output_dir: str) -> dict:
+    """Map ``(worker, index)`` to the path of every complete shard in a directory."""
+    shards = {}
+    for path in glob.glob(os.path.join(output_dir, 'shard-w*.npz')):
+        match = SHARD_PATTERN.search(path)
+        if match:
+            shards[int(match.group(1)), int(match.group(2))] = path
+    return shards
+
+
+def count_games(paths) -> int:
+    total = 0
+    for path in paths:
+        with np.load(path) as shard:
+            total += int(shard['games'])
+    return total
+
+
+def load_shards(output_dir: str):
+    """Concatenate every shard of a directory into ``(states, policies, outcomes)``."""
+    arrays = ([], [], [])
+    for _, path in sorted(existing_shards(output_dir).items()):
+        with np.load(path) as shard:
+            for array, name in zip(arrays, ('states', 'policies', 'outcomes')):
+                array.append(shard[name])
+    if not arrays[0]:
+        return np.zeros((0, 9, 9), np.float32), np.zeros((0, 81), np.float32), np.zeros(0, np.float32)
+    return tuple(np.concatenate(array) for array in arrays)
+
+
+def _write_shard(output_dir, worker, index, games, samples) -> None:
+    path = os.path.join(output_dir, f'shard-w{worker:02d}-{index:05d}.npz')
+    temporary = path + '.tmp'
+    states, policies, outcomes = (np.concatenate(arrays) for arrays in zip(*samples))
+    with open(temporary, 'wb') as file:
+        np.savez_compressed(file, states=states, policies=policies, outcomes=outcomes, games=games)
+    os.replace(temporary, path)
+
+
+def _worker(worker, games, first_index, output_dir, snapshot_path, settings, progress):
+    try:
+        seed = settings['seed']
+        rng = np.random.default_rng(None if seed is None else [seed, worker, first_index])
+        if seed is not None:
+            # PUCTSearch draws its Dirichlet noise from the global generator
+            np.random.seed([seed, worker, first_index])
+        evaluate = model_evaluator(snapshot_path) if snapshot_path else uniform_evaluate
+        search = PUCTSearch(evaluate, cpuct=settings['cpuct'], simulations=settings['simulations'],
+                            batch_size=settings['batch_size'], dirichlet_alpha=settings['dirichlet_alpha'])
+        index = first_index
+        played = 0
+        while played < games:
+            shard_games = min(settings['games_per_shard'], games - played)
+            samples = [play_game(search, rng, settings['temperature_moves']) for _ in range(shard_games)]
+            _write_shard(output_dir, worker, index, shard_games, samples)
+            played += shard_games
+            index += 1
+            progress.put(('shard', worker, shard_games, sum(len(states) for states, _, _ in samples)))
+        progress.put(('done', worker, 0, 0))
+    except Exception:
+        progress.put(('error', worker, traceback.format_exc(), 0))
+
+
+def run_self_play(output_dir: str, games: int, model_path=None, workers=None, simulations=200,
+                  games_per_shard=25, temperature_moves=10, cpuct=2.0, batch_size=16,
+                  dirichlet_alpha=0.3, seed=None, log=print) -> dict:
+    """Generate self-play games until ``output_dir`` holds ``games`` of them.
+
+    Returns the statistics of this run: games, samples, seconds, games and
+    samples per second.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    snapshot_path = None
+    if model_path:
+        snapshot_path = os.path.join(output_dir, SNAPSHOT_NAME + os.path.splitext(model_path)[1])
+        if not os.path.exists(snapshot_path):
+            shutil.copyfile(model_path, snapshot_path)
+
+    shards = existing_shards(output_dir)
+    remaining = games - count_games(shards.values())
+    stats = {'games': 0, 'samples': 0, 'seconds': 0.0, 'games_per_second': 0.0, 'samples_per_second': 0.0}
+    if remaining <= 0:
+        log(f"{output_dir} already holds {games} games")
+        return stats
+
+    workers = max(1, min(workers or os.cpu_count() or 1, remaining))
+    settings = {'simulations': simulations, 'games_per_shard': games_per_shard,
+                'temperature_moves': temperature_moves, 'cpuct': cpuct, 'batch_size': batch_size,
+                'dirichlet_alpha': dirichlet_alpha, 'seed': seed}
+    progress = multiprocessing.Queue()
+    processes = []
+    for worker in range(workers):
+        worker_games = remaining // workers + (worker < remaining % workers)
+        # Continue the shard numbering of this worker id from previous runs
+        first_index = 1 + max((index for owner, index in shards if owner == worker), default=-1)
+        process = multiprocessing.Process(
+            target=_worker, args=(worker, worker_games, first_index, output_dir, snapshot_path, settings, progress),
+            daemon=True)
+        process.start()
+        processes.append(process)
+
+    started = time.perf_counter()
+    running = set(range(workers))
+    errors = []
+    exited = set()
+    while running:
+        try:
+            kind, worker, value, samples = progress.get(timeout=PROGRESS_POLL_SECONDS)
+        except queue.Empty:
+            # A worker killed without reporting (e.g. out of memory) would otherwise be waited for forever.
+            # Its last message may still be in flight when it is first seen dead, so wait one more poll.
+            dead = [worker for worker in running if worker in exited]
+            exited = {worker for worker in running if not processes[worker].is_alive()}
+            if dead:
+                for process in processes:
+                    process.terminate()
+                raise RuntimeError("Self-play workers exited without reporting: " + ", ".join(
+                    f"worker {worker} (exit code {processes[worker].exitcode})" for worker in dead))
+            continue
+        if kind == 'shard':
+            stats['games'] += value
+            stats['samples'] += samples
+            elapsed = time.perf_counter() - started
+            log(f"{stats['games']}/{remaining} games, {stats['games'] / elapsed:.2f} games/s, "
+                f"{stats['samples'] / elapsed:.1f} samples/s")
+        else:
+            running.discard(worker)
+            if kind == 'error':
+                errors.append(f"worker {worker}:\n{value}")
+    for process in processes:
+        process.join()
+    if errors:
+        raise RuntimeError("Self-play workers failed\n" + "\n".join(errors))
+
+    stats['seconds'] = time.perf_counter() - started
+    stats['games_per_second'] = stats['games'] / stats['seconds']
+    stats['samples_per_second'] = stats['samples'] / stats['seconds']
+    return stats
@@ -0,0 +1,116 @@
+"""Replay buffer of training samples kept in memory-mapped ``.npy`` files.
+
+The directory holds ``states.npy`` (capacity x 9 x 9), ``policies.npy``
+(capacity x 81), ``values.npy`` and ``generations.npy`` (capacity) plus a small
+``meta.json`` with the write cursor. Samples are written as a ring, and samples
+older than the last ``window`` generations are no longer drawn, so the buffer
+always trains on recent self-play without ever holding the data in RAM.
+"""
+import json
+import os
+
+import numpy as np
+
+from core.symmetry import ACTION_PERMUTATIONS, GRID_PERMUTATIONS
+
+ARRAYS = {
+    'states': ((9, 9), np.float32),
+    'policies': ((81,), np.float32),
+    'values': ((), np.float32),
+    'generations': ((), np.int32),
+}
+EMPTY_GENERATION = -1
+
+
+class ReplayBuffer:
+    def __init__(self, directory: str, capacity=1_000_000, window=None) -> None:
+        """Open the buffer stored in ``directory``, creating it with ``capacity`` samples if missing.
+
+        ``window`` is the number of most recent generations that may be sampled,
+        all of them when None.
+        """
+        self.directory = directory
+        self.window = window
+        meta_path = os.path.join(directory, 'meta.json')
+        if os.path.exists(meta_path):
+            with open(meta_path) as file:
+                meta = json.load(file)
+            self.capacity, self.cursor, self.size = meta['capacity'], meta['cursor'], meta['size']
+            mode = 'r+'
+        else:
+            os.makedirs(directory, exist_ok=True)
+            self.capacity, self.cursor, self.size = capacity, 0, 0
+            mode = 'w+'
+        for name, (shape, dtype) in ARRAYS.items():
+            path = os.path.join(directory, f'{name}.npy')
+            array = np.lib.format.open_memmap(path, mode=mode, dtype=dtype, shape=(self.capacity,) + shape)
+            setattr(self, name, array)
+        if mode == 'w+':
+            self.generations[:] = EMPTY_GENERATION
+            self.flush()
+        self._refresh()
+
+    def __len__(self) -> int:
+        return len(self._valid)
+
+    @property
+    def latest_generation(self) -> int:
+        return int(self.generations.max()) if self.size else EMPTY_GENERATION
+
+    def add(self, states, policies, values, generation: int) -> None:
+        """Append samples of one generation, overwriting the oldest samples when full."""
+        count = len(values)
+        if count > self.capacity:
+            states, policies, values = states[-self.capacity:], policies[-self.capacity:], values[-self.capacity:]
+            count = self.capacity
+        positions = (self.cursor + np.arange(count)) % self.capacity
+        self.states[positions] = np.asarray(states, dtype=np.float32).reshape(count, 9, 9)
+        self.policies[positions] = policies
+        self.values[positions] = values
+        self.generations[positions] = generation
+        self.cursor = int((self.cursor + count) % self.capacity)
+        self.size = min(self.size + count, self.capacity)
+        self.flush()
+        self._refresh()
+
+    def add_shards(self, shard_dir: str, generation: int) -> None:
+        """Add every self-play shard of a directory (see ``selfplay.pipeline``)."""
+        from selfplay.pipeline import load_shards
+
+        states, policies, outcomes = load_shards(shard_dir)
+        self.add(states, policies, outcomes, generation)
+
+    def sample(self, batch_size: int, rng=None, augment=True):
+        """Draw a batch of ``(states, policies, values)`` from the sampling window.
+
+        Each array is gathered from the memory maps in one indexing operation.
+        With ``augment`` every sample is transformed by a random one of the 8
+        board symmetries, its policy permuted the same way.
+        """
+        if not len(self._valid):
+            raise ValueError("The replay buffer is empty")
+        rng = rng if rng is not None else np.random.default_rng()
+        indices = np.sort(rng.choice(self._valid, size=batch_size))
+        states = self.states[indices]
+        policies = self.policies[indices]
+        values = self.values[indices]
+        if augment:
+            symmetries = rng.integers(len(GRID_PERMUTATIONS), size=batch_size)
+            rows = np.arange(batch_size)[:, None]
+            states = states.reshape(batch_size, 81)[rows, GRID_PERMUTATIONS[symmetries]].reshape(batch_size, 9, 9)
+            policies = policies[rows, ACTION_PERMUTATIONS[symmetries]]
+        return states, policies, values
+
+    def flush(self) -> None:
+        for name in ARRAYS:
+            getattr(self, name).flush()
+        with open(os.path.join(self.directory, 'meta.json'), 'w') as file:
+            json.dump({'capacity': self.capacity, 'cursor': self.cursor, 'size': self.size}, file)
+
+    def _refresh(self) -> None:
+        """Recompute the indices that may be sampled."""
+        generations = self.generations[:self.size]
+        valid = generations != EMPTY_GENERATION
+        if self.window is not None:
+            valid &= generations > self.latest_generation - self.window
+        self._valid = np.flatnonzero(valid)
@@ -0,0 +1,146 @@
+import asyncio
+import threading
+import time
+import unittest
+from api.ai_moves import AIMoveRunner
+from core.ai_player import AIPlayer
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.rule import StandardUltimateTicTacToeRule
+
+
+class SlowAIPlayer(AIPlayer):
+    """Blocks its worker thread for ``seconds`` unless cancelled, then plays the first available move."""
+
+    def __init__(self, seconds):
+        super().__init__("slow", 'O')
+        self.seconds = seconds
+        self.cancelled = False
+
+    def get_move(self, game_controller_instance):
+        deadline = time.perf_counter() + self.seconds
+        while time.perf_counter() < deadline and not self.cancelled:
+            time.sleep(0.005)
+        return game_controller_instance.get_available_moves()[0]
+
+    def cancel(self):
+        self.cancelled = True
+
+    def resume(self):
+        self.cancelled = False
+
+
+class StubbornAIPlayer(AIPlayer):
+    """Ignores cancels and records how many of its searches run at the same time."""
+
+    def __init__(self, seconds):
+        super().__init__("stubborn", 'O')
+        self.seconds = seconds
+        self.running = 0
+        self.most_running = 0
+        self.lock = threading.Lock()
+
+    def get_move(self, game_controller_instance):
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.seconds)
+        with self.lock:
+            self.running -= 1
+        return game_controller_instance.get_available_moves()[0]
+
+
+def new_game(ai_player):
+    game = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), ai_player)
+    game.current_player = game.players['O']
+    return game
+
+
+class TestAIMoveRunner(unittest.TestCase):
+    def test_event_loop_keeps_running_during_a_search(self):
+        """Test that other coroutines are not delayed by a slow search."""
+        runner = AIMoveRunner(max_workers=2, timeout=5)
+        game = new_game(SlowAIPlayer(0.3))
+
+        async def scenario():
+            ticks = []
+
+            async def ticker():
+                while True:
+                    ticks.append(time.perf_counter())
+                    await asyncio.sleep(0.01)
+
+            task = asyncio.create_task(ticker())
+            move = await runner.play(game)
+            task.cancel()
+            return move, max(later - earlier for earlier, later in zip(ticks, ticks[1:]))
+
+        move, longest_gap = asyncio.run(scenario())
+        runner.shutdown()
+        self.assertEqual(move, [[0, 0], [0, 0]])
+        self.assertEqual(game.current_player.symbol, 'X')
+        self.assertLess(longest_gap, 0.15)
+
+    def test_deadline_plays_a_fallback_move(self):
+        runner = AIMoveRunner(max_workers=1, timeout=0.05)
+        player = SlowAIPlayer(5)
+        game = new_game(player)
+        move = asyncio.run(runner.play(game))
+        runner.shutdown()
+        self.assertIsNotNone(move)
+        self.assertTrue(player.cancelled)
+        self.assertEqual(runner.timeouts, 1)
+
+    def test_cancellation_stops_the_search(self):
+        runner = AIMoveRunner(max_workers=1, timeout=5, delay=0)
+        player = SlowAIPlayer(5)
+        game = new_game(player)
+
+        async def scenario():
+            task = asyncio.create_task(runner.play(game))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        runner.shutdown()
+        self.assertTrue(player.cancelled)
+        self.assertEqual(game.current_player.symbol, 'O', "No move is played once cancelled")
+
+    def test_searches_of_a_player_never_overlap(self):
+        """Test that a new search waits for the timed out search of the same player, within its deadline."""
+        runner = AIMoveRunner(max_workers=2, timeout=0.05, delay=0)
+        player = StubbornAIPlayer(0.2)
+        first, second = new_game(player), new_game(player)
+
+        async def scenario():
+            await runner.play(first)
+            started = time.perf_counter()
+            move = await runner.play(second)
+            return move, time.perf_counter() - started
+
+        move, elapsed = asyncio.run(scenario())
+        runner.shutdown()
+        self.assertIsNotNone(move)
+        self.assertEqual(runner.timeouts, 2)
+        self.assertEqual(player.most_running, 1)
+        self.assertLess(elapsed, 0.12, "Waiting for the abandoned search counts against the deadline")
+
+    def test_next_search_is_resumed_after_a_cancel(self):
+        runner = AIMoveRunner(max_workers=1, timeout=0.05, delay=0)
+        player = SlowAIPlayer(0.2)
+        asyncio.run(runner.play(new_game(player)))
+        self.assertTrue(player.cancelled)
+
+        runner.timeout = 5
+        started = time.perf_counter()
+        asyncio.run(runner.play(new_game(player)))
+        runner.shutdown()
+        self.assertGreaterEqual(time.perf_counter() - started, 0.2, "The new search ran to completion")
+        self.assertEqual(runner.timeouts, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,219 @@
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from fastapi.testclient import TestClient
+import api.app as app_module
+from api.app import STARTUP_SECONDS, app
+from api.game_store import InMemoryGameStore, SQLiteGameStore
+from core.exceptions import WorkerUnavailableError
+
+HEAVY_MODULES = ('keras', 'tensorflow', 'torch', 'numpy')
+
+
+class TestApiStartup(unittest.TestCase):
+    def test_import_does_not_load_ml_backends(self):
+        """Test that importing the API in a fresh interpreter loads no ML framework."""
+        code = "import sys, api.app; print('loaded:' + ','.join(m for m in %r if m in sys.modules))" % (HEAVY_MODULES,)
+        output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+        self.assertEqual(output.splitlines()[-1], "loaded:")
+
+    def test_health_reports_startup_time(self):
+        client = TestClient(app)
+        response = client.get("/health")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["startup_seconds"], STARTUP_SECONDS)
+
+    def test_unknown_ai_player(self):
+        client = TestClient(app)
+        response = client.get("/start_game/", params={"ai": True, "ai_player": "nope"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_ai_player_is_ignored_without_ai(self):
+        client = TestClient(app)
+        response = client.get("/start_game/", params={"ai_player": "nope"})
+        self.assertEqual(response.status_code, 200)
+
+    def test_start_game_with_random_ai(self):
+        client = TestClient(app)
+        response = client.get("/start_game_with_ai/", params={"ai_player": "random"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["state"]["current_player"], "X")
+
+    def test_ai_players_share_their_search_tables(self):
+        """Test that stored games do not each hold a transposition table."""
+        first = app_module.create_game("first", 'alpha_beta')
+        second = app_module.create_game("second", 'alpha_beta')
+        self.assertIs(first.ai_player.transposition_table, second.ai_player.transposition_table)
+        minimax = app_module.create_game("third", 'minimax')
+        minimax.ai_player.solve_endgame(minimax)
+        self.assertIsNone(minimax.ai_player.endgame_solver, "The solver is only built for endgames")
+        self.assertIs(minimax.ai_player.endgame_table, app_module.endgame_table)
+
+
+class TestGetBoard(unittest.TestCase):
+    def test_unchanged_board_is_not_sent_again(self):
+        client = TestClient(app)
+        game_id = client.get("/start_game/").json()["state"]["game_id"]
+        response = client.get(f"/get_board/{game_id}")
+        etag = response.headers["ETag"]
+        self.assertEqual(response.json()["game_id"], game_id)
+        self.assertEqual(client.get(f"/get_board/{game_id}", headers={"If-None-Match": etag}).status_code, 304)
+
+        client.post("/make_move/", json={"game_id": game_id, "board_position": [1, 1], "cell_position": [0, 0]})
+        response = client.get(f"/get_board/{game_id}", params={"format": "snapshot"},
+                              headers={"If-None-Match": etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers["ETag"], etag)
+        self.assertEqual((response.json()["v"], response.json()["board"][36]), (1, "X"))
+
+    def test_formats_of_the_same_version_have_different_etags(self):
+        client = TestClient(app)
+        game_id = client.get("/start_game/").json()["state"]["game_id"]
+        full = client.get(f"/get_board/{game_id}").headers["ETag"]
+        response = client.get(f"/get_board/{game_id}", params={"format": "snapshot"}, headers={"If-None-Match": full})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["type"], "snapshot")
+        self.assertNotEqual(response.headers["ETag"], full)
+
+    def test_if_none_match_is_compared_weakly_in_lists(self):
+        client = TestClient(app)
+        game_id = client.get("/start_game/").json()["state"]["game_id"]
+        etag = client.get(f"/get_board/{game_id}").headers["ETag"]
+        for header in (f'W/{etag}', f'"other", W/"x,y", {etag}', f'"other",{etag}', '*'):
+            with self.subTest(header=header):
+                response = client.get(f"/get_board/{game_id}", headers={"If-None-Match": header})
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.headers["ETag"], etag)
+        for header in ('"other"', f'W/"x,{etag[1:-1]}"', etag[1:-1]):
+            with self.subTest(header=header):
+                self.assertEqual(client.get(f"/get_board/{game_id}", headers={"If-None-Match": header}).status_code, 200)
+
+
+class TestBlockingStore(unittest.TestCase):
+    def test_store_calls_run_in_the_store_thread(self):
+        """Test that a SQLite store is never called from the event loop thread."""
+        threads = set()
+
+        class RecordingStore(SQLiteGameStore):
+            def get(self, game_id):
+                threads.add(threading.current_thread().name)
+                return super().get(game_id)
+
+            def save(self, game):
+                threads.add(threading.current_thread().name)
+                super().save(game)
+
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        store = RecordingStore(app_module.create_game, os.path.join(directory.name, 'games.sqlite'))
+        self.addCleanup(store.close)
+        with mock.patch.object(app_module, 'games', store):
+            client = TestClient(app)
+            game_id = client.get("/start_game/").json()["state"]["game_id"]
+            move = {"game_id": game_id, "board_position": [1, 1], "cell_position": [0, 0]}
+            self.assertEqual(client.post("/make_move/", json=move).status_code, 200)
+            self.assertEqual(client.get(f"/get_board/{game_id}").status_code, 200)
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith("game-store") for name in threads), threads)
+
+
+class TestGameLocks(unittest.TestCase):
+    def test_locks_do_not_outlive_evicted_games(self):
+        store = InMemoryGameStore(app_module.create_game, max_games=5)
+        with mock.patch.object(app_module, 'games', store):
+            client = TestClient(app)
+            for _ in range(50):
+                game_id = client.get("/start_game/").json()["state"]["game_id"]
+                move = {"game_id": game_id, "board_position": [1, 1], "cell_position": [0, 0]}
+                self.assertEqual(client.post("/make_move/", json=move).status_code, 200)
+        gc.collect()
+        self.assertEqual(len(store), 5)
+        self.assertLessEqual(len(app_module.game_locks), 5)
+
+
+class UnreachableOwnerCluster:
+    """Cluster of a worker whose games are all owned by a worker that never answers."""
+
+    def __init__(self):
+        self.channels = set()
+        self.requests = []
+
+    def owns(self, game_id):
+        return False
+
+    def owner(self, game_id):
+        return 1
+
+    def subscribe(self, channel):
+        self.channels.add(channel)
+
+    def unsubscribe(self, channel):
+        self.channels.discard(channel)
+
+    async def request(self, worker, method, params):
+        self.requests.append(method)
+        raise WorkerUnavailableError(worker)
+
+
+class TestUnreachableOwner(unittest.TestCase):
+    def setUp(self):
+        self.cluster = UnreachableOwnerCluster()
+        patcher = mock.patch.object(app_module, 'cluster', self.cluster)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_forwarded_requests_fail_with_503(self):
+        client = TestClient(app)
+        self.assertEqual(client.get("/get_board/abc").status_code, 503)
+        move = {"game_id": "abc", "board_position": [1, 1], "cell_position": [0, 0]}
+        self.assertEqual(client.post("/make_move/", json=move).status_code, 503)
+
+    def test_websocket_is_cleaned_up_when_the_owner_is_down(self):
+        client = TestClient(app)
+        with client.websocket_connect("/ws/abc") as websocket:
+            self.assertEqual(websocket.receive_json()["type"], "error")
+        self.assertNotIn("abc", app_module.hub)
+        self.assertEqual(self.cluster.channels, set())
+        self.assertEqual(self.cluster.requests, ['resume_ai', 'release'], "The owner is told the game is unwatched")
+
+
+class TestWebSocketMoves(unittest.TestCase):
+    def setUp(self):
+        self.delay = app_module.ai_moves.delay
+        app_module.ai_moves.delay = 0
+
+    def tearDown(self):
+        app_module.ai_moves.delay = self.delay
+
+    def test_ai_answers_over_the_websocket(self):
+        client = TestClient(app)
+        game_id = client.get("/start_game_with_ai/", params={"ai_player": "random"}).json()["state"]["game_id"]
+        with client.websocket_connect(f"/ws/{game_id}") as websocket:
+            websocket.send_text(json.dumps({"type": "make_move", "move": {
+                "game_id": game_id, "board_position": [1, 1], "cell_position": [0, 0]}}))
+            human = json.loads(websocket.receive_text())
+            ai = json.loads(websocket.receive_text())
+        self.assertEqual((human["type"], human["state"]["current_player"]), ("game_state", "O"))
+        self.assertEqual((ai["type"], ai["state"]["current_player"]), ("game_state", "X"))
+        self.assertEqual(ai["state"]["boards"][1][1][0][0], "X")
+        # The AI was sent to the top-left board
+        self.assertIn("O", [cell for row in ai["state"]["boards"][0][0] for cell in row])
+
+    def test_delta_protocol(self):
+        client = TestClient(app)
+        game_id = client.get("/start_game_with_ai/", params={"ai_player": "random"}).json()["state"]["game_id"]
+        with client.websocket_connect(f"/ws/{game_id}?protocol=delta") as websocket:
+            first = json.loads(websocket.receive_text())
+            websocket.send_text(json.dumps({"type": "make_move", "move": {
+                "game_id": game_id, "board_position": [1, 1], "cell_position": [0, 0]}}))
+            human = json.loads(websocket.receive_text())
+            ai = json.loads(websocket.receive_text())
+        self.assertEqual((first["type"], first["v"], first["board"]), ("snapshot", 0, "." * 81))
+        self.assertEqual((human["type"], human["v"], human["cell"], human["active"]), ("move", 1, 36, 0))
+        self.assertEqual((ai["v"], ai["cell"] // 9), (2, 0))
@@ -0,0 +1,119 @@
+import asyncio
+import unittest
+from api.broadcast import LAGGING_CLOSE_CODE, BroadcastHub
+
+
+class FakeWebSocket:
+    """Records sent messages; sends block while ``gate`` is cleared."""
+
+    def __init__(self, blocked=False):
+        self.sent = []
+        self.close_code = None
+        self.gate = asyncio.Event()
+        if not blocked:
+            self.gate.set()
+
+    async def send_text(self, text):
+        await self.gate.wait()
+        self.sent.append(text)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+async def settle():
+    await asyncio.sleep(0.01)
+
+
+class TestBroadcastHub(unittest.TestCase):
+    def test_slow_client_does_not_delay_the_others(self):
+        async def scenario():
+            hub = BroadcastHub(max_queue=4, max_lag=0.1)
+            fast, slow = FakeWebSocket(), FakeWebSocket(blocked=True)
+            hub.subscribe("game", fast)
+            hub.subscribe("game", slow)
+            hub.publish("game", "state-1", replaceable=True)
+            await settle()
+            self.assertEqual(fast.sent, ["state-1"])
+            self.assertEqual(slow.sent, [])
+
+            # The stuck send exceeds the lag threshold
+            await asyncio.sleep(0.2)
+            self.assertEqual(slow.close_code, LAGGING_CLOSE_CODE)
+            self.assertEqual(hub.count("game"), 1)
+            self.assertEqual(hub.dropped, 1)
+
+        asyncio.run(scenario())
+
+    def test_pending_states_are_coalesced(self):
+        async def scenario():
+            hub = BroadcastHub(max_queue=3, max_lag=5)
+            websocket = FakeWebSocket(blocked=True)
+            subscriber = hub.subscribe("game", websocket)
+            for version in range(10):
+                hub.publish("game", f"state-{version}", replaceable=True)
+                await settle()
+            hub.publish("game", "error")
+            hub.publish("game", "state-10", replaceable=True)
+            websocket.gate.set()
+            await settle()
+            # state-0 was being sent, states 1 to 8 were superseded before leaving the queue
+            self.assertEqual(websocket.sent, ["state-0", "state-9", "error", "state-10"])
+            self.assertEqual(subscriber.coalesced, 8)
+            self.assertIsNone(websocket.close_code)
+
+        asyncio.run(scenario())
+
+    def test_paused_subscriber_sends_the_first_message_ahead(self):
+        """Test that updates queued while a snapshot is fetched are sent after it."""
+        async def scenario():
+            hub = BroadcastHub(max_queue=4, max_lag=5)
+            websocket = FakeWebSocket()
+            subscriber = hub.subscribe("game", websocket, paused=True)
+            hub.publish("game", "move-13")
+            await settle()
+            self.assertEqual(websocket.sent, [])
+            subscriber.resume("snapshot-12")
+            hub.publish("game", "move-14")
+            await settle()
+            self.assertEqual(websocket.sent, ["snapshot-12", "move-13", "move-14"])
+
+        asyncio.run(scenario())
+
+    def test_queue_overflow_disconnects_the_client(self):
+        async def scenario():
+            hub = BroadcastHub(max_queue=2, max_lag=5)
+            websocket = FakeWebSocket(blocked=True)
+            hub.subscribe("game", websocket)
+            for i in range(4):
+                hub.publish("game", f"message-{i}")
+            await settle()
+            self.assertEqual(websocket.close_code, LAGGING_CLOSE_CODE)
+            self.assertNotIn("game", hub)
+
+        asyncio.run(scenario())
+
+    def test_state_is_serialized_once_per_version(self):
+        async def scenario():
+            hub = BroadcastHub()
+            calls = []
+
+            def encode():
+                calls.append(1)
+                return f"state-{len(calls)}"
+
+            subscriber = hub.subscribe("game", FakeWebSocket())
+            self.assertEqual(hub.state_message("game", 1, encode), "state-1")
+            self.assertEqual(hub.state_message("game", 1, encode), "state-1")
+            self.assertEqual(hub.state_message("game", 2, encode), "state-2")
+            self.assertEqual(len(calls), 2)
+
+            hub.unsubscribe("game", subscriber)
+            self.assertNotIn("game", hub)
+            self.assertEqual(hub.state_message("game", 2, encode), "state-3")
+
+        asyncio.run(scenario())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,155 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from unittest import mock
+from api.app import handle_cluster_request
+from api.cluster import Broker, ClusterNode, owner_of
+from core.exceptions import WorkerUnavailableError
+
+
+class Worker:
+    """A cluster node recording the messages it receives and answering requests with ``handler``."""
+
+    def __init__(self, worker_id, workers, path, handler=None):
+        self.messages = []
+        self.node = ClusterNode(worker_id, workers, path, handler or self.echo, self.receive, timeout=2)
+
+    async def echo(self, method, params):
+        if method == 'fail':
+            raise ValueError("failed")
+        return {'worker': self.node.worker_id, 'method': method, 'params': params}
+
+    async def receive(self, channel, data):
+        self.messages.append((channel, data))
+
+
+async def settle():
+    """Give the broker time to route the messages already written."""
+    await asyncio.sleep(0.05)
+
+
+class TestCluster(unittest.TestCase):
+    def run_cluster(self, scenario, workers=2, handler=None):
+        async def main():
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'broker.sock')
+                broker = Broker(path)
+                await broker.start()
+                nodes = [Worker(worker_id, workers, path, handler) for worker_id in range(workers)]
+                for worker in nodes:
+                    await worker.node.connect()
+                await settle()
+                try:
+                    await scenario(*nodes)
+                finally:
+                    for worker in nodes:
+                        await worker.node.close()
+                    await broker.close()
+
+        asyncio.run(main())
+
+    def test_owner_is_stable_and_spread(self):
+        """Test that game ids are mapped to the same worker every time and spread over all workers."""
+        ids = [f"game-{i}" for i in range(400)]
+        owners = [owner_of(game_id, 4) for game_id in ids]
+        self.assertEqual(owners, [owner_of(game_id, 4) for game_id in ids])
+        self.assertEqual(set(owners), {0, 1, 2, 3})
+
+    def test_new_game_ids_are_owned_by_the_worker(self):
+        node = ClusterNode(2, 4, "unused", None, None)
+        for _ in range(20):
+            self.assertEqual(owner_of(node.new_game_id(), 4), 2)
+
+    def test_request_is_answered_by_the_target_worker(self):
+        async def scenario(first, second):
+            result = await first.node.request(1, 'get_board', {'game_id': 'abc'})
+            self.assertEqual(result, {'worker': 1, 'method': 'get_board', 'params': {'game_id': 'abc'}})
+            with self.assertRaises(WorkerUnavailableError):
+                await second.node.request(0, 'fail', {})
+
+        self.run_cluster(scenario)
+
+    def test_request_to_a_missing_worker_fails(self):
+        async def scenario(first, second):
+            with self.assertRaises(WorkerUnavailableError):
+                await first.node.request(5, 'get_board', {'game_id': 'abc'})
+
+        self.run_cluster(scenario)
+
+    def test_publications_reach_other_subscribers(self):
+        async def scenario(first, second, third):
+            second.node.subscribe('game:a')
+            third.node.subscribe('game:b')
+            first.node.subscribe('game:a')
+            await settle()
+            self.assertEqual(await first.node.subscriber_count('game:a'), 1)
+
+            first.node.publish('game:a', 'state')
+            await settle()
+            self.assertEqual(second.messages, [('game:a', 'state')])
+            self.assertEqual(first.messages, [])
+            self.assertEqual(third.messages, [])
+
+            second.node.unsubscribe('game:a')
+            await settle()
+            self.assertEqual(await first.node.subscriber_count('game:a'), 0)
+
+        self.run_cluster(scenario, workers=3)
+
+    def test_slow_message_handler_does_not_block_requests(self):
+        async def scenario(first, second):
+            released = asyncio.Event()
+
+            async def slow_receive(channel, data):
+                await released.wait()
+                second.messages.append((channel, data))
+
+            second.node.handle_message = slow_receive
+            second.node.subscribe('game:a')
+            await settle()
+            first.node.publish('game:a', 'one')
+            first.node.publish('game:a', 'two')
+            await settle()
+            result = await asyncio.wait_for(first.node.request(1, 'get_board', {}), 1)
+            self.assertEqual(result['worker'], 1)
+            self.assertEqual(second.messages, [])
+
+            released.set()
+            await settle()
+            self.assertEqual(second.messages, [('game:a', 'one'), ('game:a', 'two')], "Messages keep their order")
+
+        self.run_cluster(scenario)
+
+    def test_release_cancels_the_ai_of_an_unwatched_game(self):
+        """Test that the owner stops searching once the last worker watching a game releases it."""
+        import api.app as app_module
+
+        async def scenario(first, second):
+            game_id = first.node.new_game_id()
+            task = asyncio.create_task(asyncio.sleep(60))
+            with mock.patch.object(app_module, 'cluster', first.node), \
+                    mock.patch.dict(app_module.ai_tasks, {game_id: task}):
+                second.node.subscribe(f'game:{game_id}')
+                await settle()
+                await second.node.request(0, 'release', {'game_id': game_id})
+                self.assertFalse(task.cancelled(), "Another worker still watches the game")
+
+                second.node.unsubscribe(f'game:{game_id}')
+                await second.node.request(0, 'release', {'game_id': game_id})
+                await settle()
+                self.assertTrue(task.cancelled())
+
+        self.run_cluster(scenario, handler=handle_cluster_request)
+
+    def test_forwarded_http_errors_keep_their_status(self):
+        """Test that the app answers forwarded requests with the status of the local handler."""
+        async def scenario(first, second):
+            response = await first.node.request(1, 'get_board', {'game_id': 'missing', 'format': 'full'})
+            self.assertEqual(response, {'status': 404, 'detail': "Game not found"})
+
+        self.run_cluster(scenario, handler=handle_cluster_request)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from api.game_store import InMemoryGameStore, SQLiteGameStore
+from core.ai_player import RandomAIPlayer
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.rule import StandardUltimateTicTacToeRule
+
+
+def create_game(game_id, ai_player=None):
+    player = RandomAIPlayer("AI", 'O') if ai_player else None
+    return GameController(game_id, Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), player)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestInMemoryGameStore(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        self.store = InMemoryGameStore(create_game, max_games=3, ttl=60, clock=self.clock)
+
+    def test_ids_are_unique(self):
+        ids = {self.store.new_game().game_id for _ in range(100)}
+        self.assertEqual(len(ids), 100)
+
+    def test_least_recently_used_game_is_evicted(self):
+        first, second, third = (self.store.new_game() for _ in range(3))
+        self.assertIs(self.store.get(first.game_id), first)
+        self.store.new_game()
+        self.assertIsNone(self.store.get(second.game_id))
+        self.assertIs(self.store.get(first.game_id), first)
+        self.assertIs(self.store.get(third.game_id), third)
+        self.assertEqual(len(self.store), 3)
+
+    def test_idle_games_expire(self):
+        idle, active = self.store.new_game(), self.store.new_game()
+        self.clock.now = 50
+        self.store.get(active.game_id)
+        self.clock.now = 100
+        self.assertEqual(self.store.evict_idle(), 1)
+        self.assertNotIn(idle.game_id, self.store)
+        self.clock.now = 200
+        self.assertIsNone(self.store.get(active.game_id))
+
+
+    def test_games_in_use_are_never_evicted(self):
+        busy = set()
+        store = InMemoryGameStore(create_game, max_games=2, ttl=60, clock=self.clock, in_use=busy.__contains__)
+        first, second = store.new_game(), store.new_game()
+        busy.add(first.game_id)
+        store.new_game()
+        self.assertIs(store.get(first.game_id), first)
+        self.assertNotIn(second.game_id, store)
+
+        self.clock.now = 100
+        self.assertEqual(store.evict_idle(), 1)
+        self.assertIs(store.get(first.game_id), first)
+        busy.clear()
+        self.clock.now = 200
+        self.assertIsNone(store.get(first.game_id))
+
+
+class TestSQLiteGameStore(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'games.sqlite')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_games_are_rebuilt_by_replaying_moves(self):
+        store = SQLiteGameStore(create_game, self.path)
+        game = store.new_game('random')
+        for move in (((1, 1), (0, 0)), ((0, 0), (2, 2)), ((2, 2), (1, 1))):
+            game.play_move(*move)
+            store.save(game)
+        store.close()
+
+        reopened = SQLiteGameStore(create_game, self.path)
+        with self.assertNoLogs('core.game_controller', 'DEBUG'):
+            rebuilt = reopened.get(game.game_id)
+        self.assertIsNot(rebuilt, game)
+        self.assertEqual(rebuilt.board.to_serializable(), game.board.to_serializable())
+        self.assertEqual((rebuilt.next_board, rebuilt.current_player.symbol), (game.next_board, 'O'))
+        self.assertIsInstance(rebuilt.ai_player, RandomAIPlayer)
+        self.assertEqual(rebuilt.move_history, game.move_history)
+        self.assertIsNone(reopened.get("missing"))
+        reopened.close()
+
+    def test_cached_game_in_use_is_not_rebuilt(self):
+        """Test that a game held by a request keeps its controller, so its saves are not overwritten."""
+        busy = set()
+        store = SQLiteGameStore(create_game, self.path, cache_size=1, in_use=busy.__contains__)
+        game = store.new_game()
+        busy.add(game.game_id)
+        other = store.new_game()
+        self.assertIs(store.get(game.game_id), game)
+        self.assertIsNot(store.get(other.game_id), other, "Games not in use are still evicted and rebuilt")
+        store.close()
+
+    def test_idle_games_are_deleted_with_a_ttl(self):
+        clock = FakeClock()
+        store = SQLiteGameStore(create_game, self.path, ttl=60, clock=clock)
+        idle = store.new_game()
+        clock.now = 100
+        active = store.new_game()
+        self.assertEqual(store.evict_idle(), 1)
+        self.assertEqual(len(store), 1)
+        store.cache.delete(idle.game_id)
+        self.assertIsNone(store.get(idle.game_id))
+        self.assertIs(store.get(active.game_id), active)
+        store.close()
+
+
+if __name__ == '__main__':
+    unittest.main()
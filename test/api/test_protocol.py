@@ -0,0 +1,51 @@
+import json
+import unittest
+from api.protocol import encode, move_update, snapshot
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.rule import StandardUltimateTicTacToeRule
+
+
+def new_game():
+    return GameController("game", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule())
+
+
+def apply_update(state, update):
+    """Reference decoder: apply a move update to a snapshot."""
+    board = list(state["board"])
+    board[update["cell"]] = 'X' if state["v"] % 2 == 0 else 'O'
+    won = list(state["won"])
+    won[update["cell"] // 9] = update["sub"]
+    return dict(state, v=update["v"], board=''.join(board), won=''.join(won), active=update["active"],
+                status=update["status"], player='X' if update["v"] % 2 == 0 else 'O')
+
+
+class TestProtocol(unittest.TestCase):
+    def test_snapshot_of_a_new_game(self):
+        state = snapshot(new_game())
+        self.assertEqual(state, {"type": "snapshot", "v": 0, "game_id": "game", "board": "." * 81,
+                                 "won": "." * 9, "player": "X", "active": -1, "status": None})
+
+    def test_updates_rebuild_the_snapshot(self):
+        game = new_game()
+        state = snapshot(game)
+        # X wins the centre sub-board on the fifth move, then O sends X back to it
+        moves = [((1, 1), (0, 0)), ((0, 0), (1, 1)), ((1, 1), (0, 1)), ((0, 1), (1, 1)), ((1, 1), (0, 2)),
+                 ((0, 2), (1, 1))]
+        for board_position, cell_position in moves:
+            game.play_move(board_position, cell_position)
+            state = apply_update(state, json.loads(encode(move_update(game))))
+            self.assertEqual(state, snapshot(game))
+        self.assertEqual(state["won"][4], "X")
+        self.assertEqual(state["active"], -1)
+
+    def test_update_is_much_smaller_than_the_full_state(self):
+        game = new_game()
+        game.play_move((1, 1), (0, 0))
+        full = json.dumps({"type": "game_state", "state": game.get_state().to_dict()})
+        self.assertLess(len(encode(move_update(game))) * 10, len(full))
+
+
+if __name__ == '__main__':
+    unittest.main()
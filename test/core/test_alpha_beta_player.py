@@ -0,0 +1,61 @@
+import time
+import unittest
+from core.alpha_beta_player import AlphaBetaAIPlayer
+from core.bitboard import ANY_BOARD, O, X, BitBoard
+
+
+class TestAlphaBetaAIPlayer(unittest.TestCase):
+    def setUp(self):
+        self.player = AlphaBetaAIPlayer("AI", 'X', max_depth=4, time_budget=5.0)
+
+    def test_takes_winning_move(self):
+        """Test that the search completes a line of won sub-boards when it can."""
+        bitboard = BitBoard()
+        for sub_board in (0, 1):
+            bitboard.set_sub_board(sub_board, 0b000000111, 0b000011000)
+        bitboard.set_sub_board(2, 0b000000011, 0b000110000)
+        bitboard.active = 2
+        self.assertEqual(self.player.search(bitboard, X), 2 * 9 + 2)
+        self.assertGreater(self.player.last_score, 0)
+
+    def test_respects_active_board(self):
+        """Test that the chosen move is in the board the player was sent to."""
+        bitboard = BitBoard()
+        bitboard.make_move(4 * 9 + 7, O)
+        self.assertEqual(self.player.search(bitboard, X) // 9, 7)
+
+    def test_time_budget(self):
+        """Test that a deep search stops close to the time budget with a legal move."""
+        player = AlphaBetaAIPlayer("AI", 'X', max_depth=81, time_budget=0.2)
+        bitboard = BitBoard()
+        start = time.perf_counter()
+        move = player.search(bitboard, X)
+        self.assertLess(time.perf_counter() - start, 1.0)
+        self.assertIn(move, bitboard.legal_moves())
+        self.assertEqual(bitboard.active, ANY_BOARD, "The search should leave the position untouched")
+        self.assertEqual(bitboard.pieces, [0, 0])
+
+    def test_cancel_before_the_search_is_kept(self):
+        """Test that a cancel arriving before the search starts stops it until resumed."""
+        player = AlphaBetaAIPlayer("AI", 'X', max_depth=81, time_budget=5.0)
+        bitboard = BitBoard()
+        player.cancel()
+        start = time.perf_counter()
+        self.assertIn(player.search(bitboard, X), bitboard.legal_moves())
+        self.assertLess(time.perf_counter() - start, 0.5)
+        self.assertEqual(player.last_depth, 0)
+
+        player.resume()
+        player.max_depth = 2
+        player.search(bitboard, X)
+        self.assertEqual(player.last_depth, 2)
+
+    def test_batch_evaluation(self):
+        """Test that the search with batched leaf evaluation still finds the winning move."""
+        player = AlphaBetaAIPlayer("AI", 'X', max_depth=3, time_budget=5.0, batch_evaluation=True)
+        bitboard = BitBoard()
+        for sub_board in (0, 1):
+            bitboard.set_sub_board(sub_board, 0b000000111, 0b000011000)
+        bitboard.set_sub_board(2, 0b000000011, 0b000110000)
+        bitboard.active = 2
+        self.assertEqual(player.search(bitboard, X), 2 * 9 + 2)
@@ -0,0 +1,59 @@
+import unittest
+from unittest import mock
+import numpy as np
+from core.alpha_zero_player import AlphaZeroAIPlayer
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.rule import StandardUltimateTicTacToeRule
+
+
+class UniformInference:
+    def evaluate(self, inputs):
+        return np.full((len(inputs), 81), 1 / 81), np.zeros(len(inputs))
+
+
+def new_player(**options):
+    with mock.patch('core.alpha_zero_player.get_inference_service', return_value=UniformInference()):
+        return AlphaZeroAIPlayer("AI", 'O', "unused.h5", mcts_search=32, batch_size=8, **options)
+
+
+class TestAlphaZeroAIPlayer(unittest.TestCase):
+    def play(self, player, moves=6):
+        game = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), player)
+        for _ in range(moves):
+            move = game.get_available_moves()[0] if game.current_player.symbol == 'X' else player.get_move(game)
+            game.play_move(*move)
+
+    def test_tree_is_kept_between_moves_by_default(self):
+        player = new_player()
+        self.play(player)
+        self.assertGreater(len(player.mcts.P), 0)
+
+    def test_tree_is_freed_after_each_move_without_keep_tree(self):
+        player = new_player(keep_tree=False)
+        self.play(player)
+        self.assertEqual((len(player.mcts.P), len(player.mcts.Ns), len(player.mcts.terminal)), (0, 0, 0))
+
+
+    def test_cancelled_search_plays_from_the_priors(self):
+        evaluations = []
+
+        def evaluate(positions):
+            evaluations.append(len(positions))
+            return UniformInference().evaluate(positions)
+
+        player = new_player()
+        player.mcts.evaluate = evaluate
+        game = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), player)
+        player.cancel()
+        move = player.get_move(game)
+        self.assertIn([list(move[0]), list(move[1])], game.get_available_moves())
+        self.assertEqual(evaluations, [1], "Only the root is evaluated once cancelled")
+        player.resume()
+        player.get_move(game)
+        self.assertGreater(len(evaluations), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,47 @@
+import unittest
+from core.bitboard import ANY_BOARD, O, X, BitBoard, cell_index, index_to_positions
+from core.board_9D import Board_9D
+
+
+class TestBitBoard(unittest.TestCase):
+    def test_cell_index_round_trip(self):
+        """Test that cell indices map back to the same board and cell positions."""
+        for index in range(81):
+            board_position, cell_position = index_to_positions(index)
+            self.assertEqual(cell_index(board_position, cell_position), index)
+
+    def test_make_and_unmake_move(self):
+        """Test that unmake_move restores the exact position."""
+        bitboard = BitBoard()
+        for index in (0, 1):
+            bitboard.make_move(index, X)
+        before = (bitboard.pieces[:], bitboard.won[:], bitboard.full, bitboard.active)
+        undo = bitboard.make_move(2, X)
+        self.assertEqual(bitboard.won[X], 0b1, "Completing the top row should win sub-board 0")
+        self.assertEqual(bitboard.active, 2)
+        bitboard.unmake_move(undo)
+        self.assertEqual((bitboard.pieces, bitboard.won, bitboard.full, bitboard.active), before)
+
+    def test_sent_to_won_board_plays_anywhere(self):
+        """Test that a move pointing at a won sub-board frees the next player."""
+        bitboard = BitBoard()
+        for index in (0, 1, 2):
+            bitboard.make_move(index, X)
+        bitboard.make_move(9, O)
+        self.assertEqual(bitboard.active, ANY_BOARD)
+        self.assertNotIn(3, bitboard.legal_moves(), "Won sub-boards should not offer moves")
+        self.assertIn(10, bitboard.legal_moves())
+
+    def test_facade_shares_bitboard(self):
+        """Test that Board_9D writes through to its BitBoard."""
+        board_9d = Board_9D()
+        board_9d.place_piece([1, 2], [0, 1], "O")
+        self.assertEqual(board_9d.bitboard.piece_at(cell_index((1, 2), (0, 1))), O)
+        self.assertEqual(board_9d.board[1][2].board[0][1], "O")
+
+    def test_copy_is_independent(self):
+        """Test that copies of a Board_9D do not share state."""
+        board_9d = Board_9D()
+        board_copy = board_9d.copy()
+        board_copy.place_piece([0, 0], [0, 0], "X")
+        self.assertIsNone(board_9d.board[0][0].board[0][0])
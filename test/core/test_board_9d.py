@@ -37,4 +37,36 @@ class TestBoard9D(unittest.TestCase):
         actual = board_9d.to_serializable()
         cell_count = sum(sum(len(board_row) for board_row in board) for row in actual for board in row)
 
-        self.assertEqual(cell_count, 81, "The 9D board should have exactly 81 cells")
\ No newline at end of file
+        self.assertEqual(cell_count, 81, "The 9D board should have exactly 81 cells")
+
+    def test_undo_redo_move(self):
+        """Test that undo restores pieces, won boards and the next board, and redo replays the move."""
+        board_9d = Board_9D()
+        for cell in ([1, 1], [2, 2]):
+            board_9d.push_move([0, 0], cell, "X")
+        board_9d.push_move([0, 0], [0, 0], "X")
+        self.assertEqual(board_9d.bitboard.won[0], 0b1)
+        self.assertIsNone(board_9d.next_board, "Sent to a won board, the next player may play anywhere")
+
+        board_9d.undo_move()
+        self.assertIsNone(board_9d.board[0][0].board[0][0])
+        self.assertEqual(board_9d.bitboard.won[0], 0)
+        self.assertEqual(board_9d.next_board, (2, 2))
+
+        board_9d.redo_move()
+        self.assertEqual(board_9d.board[0][0].board[0][0], "X")
+        self.assertEqual(board_9d.bitboard.won[0], 0b1)
+        self.assertIsNone(board_9d.next_board)
+
+    def test_cell_assignment_writes_through(self):
+        """Test that ``board.board[r][c] = piece`` changes the sub-board of the 9D board."""
+        board_9d = Board_9D()
+        sub_board = board_9d.board[1][2]
+        for col in range(3):
+            sub_board.board[0][col] = "O"
+        self.assertEqual(board_9d.to_serializable()[1][2][0], ["O", "O", "O"])
+        self.assertEqual(board_9d.bitboard.won[1], 1 << 5)
+
+        sub_board.board[0][1] = None
+        self.assertEqual(sub_board.board, [["O", None, "O"], [None, None, None], [None, None, None]])
+        self.assertEqual(board_9d.bitboard.won[1], 0)
@@ -0,0 +1,57 @@
+import random
+import unittest
+import numpy as np
+from core.bitboard import O, X, BitBoard, index_to_positions
+from core.encoding import CELL_TO_GRID, GRID_TO_CELL, VALID_MOVE_VALUE, encode_position, encode_positions
+
+
+def reference_encoding(bitboard, player):
+    """Loop-based encoding: won sub-boards filled, legal moves marked with VALID_MOVE_VALUE."""
+    array = np.zeros((9, 9))
+    legal = set(bitboard.legal_moves())
+    for index in range(81):
+        (board_row, board_col), (cell_row, cell_col) = index_to_positions(index)
+        sub_board = index // 9
+        owner = bitboard.piece_at(index)
+        for candidate in (X, O):
+            if bitboard.won[candidate] >> sub_board & 1:
+                owner = candidate
+        value = 0.0 if owner is None else (1.0 if owner == player else -1.0)
+        if index in legal:
+            value = VALID_MOVE_VALUE
+        array[board_row * 3 + cell_row][board_col * 3 + cell_col] = value
+    return array
+
+
+class TestEncoding(unittest.TestCase):
+    def test_index_maps_are_inverse(self):
+        np.testing.assert_array_equal(GRID_TO_CELL[CELL_TO_GRID], np.arange(81))
+        self.assertEqual(GRID_TO_CELL[9 * 3 + 3], 4 * 9, "Grid row 3, column 3 is the first cell of the center board")
+
+    def test_matches_reference_on_random_games(self):
+        """Test the batched encoding against a per-cell loop on random positions."""
+        rng = random.Random(3)
+        positions = []
+        for _ in range(20):
+            bitboard = BitBoard()
+            player = X
+            for _ in range(rng.randrange(60)):
+                moves = bitboard.legal_moves()
+                if not moves or bitboard.winner is not None:
+                    break
+                bitboard.make_move(rng.choice(moves), player)
+                player = 1 - player
+            positions.append((bitboard, player))
+
+        inputs, legal = encode_positions(positions)
+        self.assertEqual(inputs.shape, (20, 9, 9))
+        for (bitboard, player), array, mask in zip(positions, inputs, legal):
+            np.testing.assert_allclose(array, reference_encoding(bitboard, player), rtol=1e-6)
+            self.assertEqual(sorted(np.flatnonzero(mask)), sorted(bitboard.legal_moves()))
+
+    def test_single_position(self):
+        bitboard = BitBoard()
+        bitboard.make_move(40, X)
+        array, legal = encode_position(bitboard, O)
+        self.assertEqual(array[4][4], -1.0)
+        self.assertEqual(legal.sum(), 8, "Only the center board is playable")
@@ -0,0 +1,92 @@
+import random
+import unittest
+from core.bitboard import X, BitBoard, index_to_positions
+from core.board_9D import Board_9D
+from core.alpha_beta_player import AlphaBetaAIPlayer
+from core.endgame import DRAW, LOSS, WIN, EndgameSolver, playable_cells
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.min_max_player import MinimaxAIPlayer
+from core.rule import StandardUltimateTicTacToeRule
+from core.transposition import TranspositionTable
+
+
+def brute_force(bitboard, player):
+    """Plain negamax over the whole game tree."""
+    if bitboard.winner is not None:
+        return LOSS
+    moves = bitboard.legal_moves()
+    if not moves:
+        return DRAW
+    best = LOSS
+    for move in moves:
+        undo = bitboard.make_move(move, player)
+        best = max(best, -brute_force(bitboard, 1 - player))
+        bitboard.unmake_move(undo)
+    return best
+
+
+def late_position(seed, cells):
+    """Play random moves until at most ``cells`` playable cells are left, or None if the game ends first."""
+    rng = random.Random(seed)
+    bitboard, player, history = BitBoard(), X, []
+    while playable_cells(bitboard) > cells:
+        moves = bitboard.legal_moves()
+        if bitboard.winner is not None or not moves:
+            return None
+        move = rng.choice(moves)
+        bitboard.make_move(move, player)
+        history.append(move)
+        player = 1 - player
+    if bitboard.winner is not None or not bitboard.legal_moves():
+        return None
+    return bitboard, player, history
+
+
+class TestEndgameSolver(unittest.TestCase):
+    def test_results_match_exhaustive_search(self):
+        """Test that the solver's result and move agree with a search of the whole tree."""
+        solver = EndgameSolver(max_nodes=10 ** 6)
+        positions = [position for position in (late_position(seed, 8) for seed in range(60)) if position]
+        self.assertGreater(len(positions), 10)
+        results = set()
+        for bitboard, player, _ in positions:
+            expected = brute_force(bitboard, player)
+            result, move = solver.solve(bitboard, player)
+            self.assertEqual(result, expected)
+            bitboard.make_move(move, player)
+            self.assertEqual(-brute_force(bitboard, 1 - player), expected, "The move must achieve the result")
+            results.add(result)
+        self.assertGreater(len(results), 1)
+
+    def test_node_cap_gives_up(self):
+        solver = EndgameSolver(max_nodes=50)
+        self.assertIsNone(solver.solve(BitBoard(), X))
+        self.assertLessEqual(solver.nodes, 51)
+
+    def test_minimax_player_reports_proven_result(self):
+        bitboard, player, history = next(position for position in (late_position(seed, 12) for seed in range(100))
+                                         if position)
+        controller = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule())
+        for move in history:
+            controller.play_move(*index_to_positions(move))
+        table = TranspositionTable(1 << 12)
+        ai_player = MinimaxAIPlayer("solver", 'XO'[player], max_depth=1, endgame_cells=16, endgame_table=table)
+        move = ai_player.get_move(controller)
+        self.assertIs(ai_player.endgame_solver.transposition_table, table)
+        self.assertIn(ai_player.last_result, ('win', 'draw', 'loss'))
+        self.assertIn([list(move[0]), list(move[1])], controller.get_available_moves())
+        expected = {WIN: 'win', DRAW: 'draw', LOSS: 'loss'}[brute_force(bitboard, player)]
+        self.assertEqual(ai_player.last_result, expected)
+
+        ai_player = MinimaxAIPlayer("heuristic", 'XO'[player], max_depth=1)
+        ai_player.get_move(controller)
+        self.assertIsNone(ai_player.last_result)
+        self.assertIsNone(ai_player.endgame_solver, "The solver is opt-in")
+
+    def test_alpha_beta_player_builds_no_solver(self):
+        self.assertIsNone(AlphaBetaAIPlayer("AI", 'X').endgame_solver)
+
+
+if __name__ == '__main__':
+    unittest.main()
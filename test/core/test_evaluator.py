@@ -0,0 +1,39 @@
+import unittest
+import numpy as np
+from core.bitboard import O, X, BitBoard
+from core.evaluator import WIN_SCORE, bitboard_to_array, evaluate_batch, evaluate_children
+
+
+class TestEvaluator(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.batch = rng.choice(np.array([-1, 0, 1], dtype=np.int8), size=(32, 81), p=[0.3, 0.4, 0.3])
+
+    def test_batch_matches_single_positions(self):
+        """Test that scoring a batch gives the same result as scoring each position."""
+        batch_scores = evaluate_batch(self.batch)
+        single_scores = [evaluate_batch(position)[0] for position in self.batch]
+        self.assertEqual(batch_scores.shape, (32,))
+        np.testing.assert_array_equal(batch_scores, single_scores)
+
+    def test_score_is_antisymmetric(self):
+        """Test that swapping the players negates the score."""
+        np.testing.assert_array_equal(evaluate_batch(-self.batch), -evaluate_batch(self.batch))
+
+    def test_threat_and_center(self):
+        """Test that a two-in-a-row threat and the center cell are worth something."""
+        bitboard = BitBoard()
+        bitboard.make_move(4 * 9 + 0, X)
+        bitboard.make_move(4 * 9 + 1, X)
+        self.assertGreater(evaluate_batch(bitboard_to_array(bitboard, X))[0], 0)
+        scores = evaluate_children(BitBoard(), [0, 1, 4], X)
+        self.assertGreater(scores[2], scores[0])
+        self.assertGreater(scores[0], scores[1], "A corner should be worth more than an edge")
+
+    def test_macro_win(self):
+        """Test that a won macro line scores WIN_SCORE for the winner."""
+        bitboard = BitBoard()
+        for sub_board in (2, 4, 6):
+            bitboard.set_sub_board(sub_board, 0, 0b000000111)
+        self.assertEqual(evaluate_batch(bitboard_to_array(bitboard, O))[0], WIN_SCORE)
+        self.assertEqual(evaluate_batch(bitboard_to_array(bitboard, X))[0], -WIN_SCORE)
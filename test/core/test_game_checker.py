@@ -28,3 +28,10 @@ class TestGameChecker(unittest.TestCase):
         # Test not a draw scenario with empty spaces
         board.board = [['X', 'O', 'X'], ['X', None, 'O'], ['O', 'X', 'O']]
         self.assertFalse(GameChecker.is_draw(board), "The board should not be a draw as there are moves left")
+
+    def test_check_masks(self):
+        # Test the table lookup on raw 9-bit masks
+        self.assertEqual(GameChecker.check_masks(0b100010001, 0), 'X', "X should win on the main diagonal")
+        self.assertEqual(GameChecker.check_masks(0b000000011, 0b001010100), 'O', "O should win on the secondary diagonal")
+        self.assertEqual(GameChecker.check_masks(0b010011101, 0b101100010), 'draw', "A full board without a line is a draw")
+        self.assertIsNone(GameChecker.check_masks(0b000000011, 0b000011000))
@@ -27,3 +27,31 @@ class TestGameChecker9D(unittest.TestCase):
 
         self.assertIsNone(GameChecker9D.check_winner_9d(self.board_9d), "There should be no 9D winner with mixed individual board results")
 
+    def test_winner_after_moves(self):
+        # Win the diagonal sub-boards move by move and check the incremental macro status
+        for b in range(3):
+            for c in range(3):
+                self.board_9d.place_piece([b, b], [c, c], 'O')
+        self.assertEqual(GameChecker9D.check_winner_9d(self.board_9d), 'O', "O should win with the diagonal of won sub-boards")
+
+    def test_draw_when_every_sub_board_is_closed(self):
+        # X and O share the won sub-boards without a line and the others are drawn
+        drawn = [['X', 'O', 'X'], ['X', 'O', 'O'], ['O', 'X', 'X']]
+        x_won = [['X', 'X', 'X'], ['O', 'O', None], [None, None, None]]
+        o_won = [['O', 'O', 'O'], ['X', 'X', None], [None, None, None]]
+        layout = [[x_won, o_won, x_won], [x_won, o_won, o_won], [drawn, x_won, drawn]]
+        for r in range(3):
+            for c in range(3):
+                self.board_9d.board[r][c].board = layout[r][c]
+
+        self.assertEqual(GameChecker9D.check_winner_9d(self.board_9d), 'draw')
+        self.assertEqual(self.board_9d.bitboard.legal_moves(), [])
+
+    def test_open_sub_board_is_no_draw(self):
+        drawn = [['X', 'O', 'X'], ['X', 'O', 'O'], ['O', 'X', 'X']]
+        for r in range(3):
+            for c in range(3):
+                if (r, c) != (2, 2):
+                    self.board_9d.board[r][c].board = drawn
+
+        self.assertIsNone(GameChecker9D.check_winner_9d(self.board_9d))
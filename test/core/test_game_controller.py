@@ -1,3 +1,4 @@
+import json
 import unittest
 from unittest.mock import MagicMock
 from core.board_9D import Board_9D
@@ -42,4 +43,57 @@ class TestGameController(unittest.TestCase):
         self.rule.next_board.return_value = None
         self.game_checker.check_winner_9d.return_value = True
         game_over = self.game_controller.play_move((1, 1), (0, 0))
-        self.assertTrue(game_over)
\ No newline at end of file
+        self.assertTrue(game_over)
+
+class TestGameControllerCachedState(unittest.TestCase):
+    def setUp(self):
+        self.game_controller = GameController(1, Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule())
+
+    def test_available_moves_skip_won_boards(self):
+        # X wins the top-left board on its diagonal, then O is sent to it
+        for board_position, cell_position in [((0, 0), (1, 1)), ((1, 1), (0, 0)), ((0, 0), (0, 0)),
+                                              ((0, 0), (0, 1)), ((0, 1), (2, 2)), ((2, 2), (0, 0)),
+                                              ((0, 0), (2, 2)), ((2, 2), (0, 1)), ((0, 1), (0, 0))]:
+            self.game_controller.play_move(board_position, cell_position)
+        self.assertEqual(self.game_controller.won_board['X'], [(0, 0)])
+        self.assertIsNone(self.game_controller.next_board)
+        moves = self.game_controller.get_available_moves()
+        self.assertEqual(len(moves), 81 - 9 - 5)
+        self.assertNotIn([0, 0], [move[0] for move in moves])
+
+    def test_game_over_matches_full_check(self):
+        # Play moves from the cached move list and compare with a fresh macro check
+        while not self.game_controller.check_game_over() and self.game_controller.get_available_moves():
+            board_position, cell_position = self.game_controller.get_available_moves()[0]
+            self.game_controller.play_move(board_position, cell_position)
+        self.assertEqual(self.game_controller.check_game_over(), GameChecker9D.check_winner_9d(self.game_controller.board))
+        self.assertEqual(self.game_controller.get_state().game_over, self.game_controller.check_game_over())
+
+    def test_state_is_cached_until_the_next_move(self):
+        state, state_json = self.game_controller.get_state(), self.game_controller.get_state_json()
+        self.assertIs(self.game_controller.get_state(), state)
+        self.assertIs(self.game_controller.get_state_json(), state_json)
+        self.assertEqual(json.loads(state_json), state.to_dict())
+
+        self.game_controller.play_move((0, 0), (1, 1))
+        new_state = self.game_controller.get_state()
+        self.assertIsNot(new_state, state)
+        self.assertEqual(json.loads(self.game_controller.get_state_json()), new_state.to_dict())
+        # Earlier snapshots do not follow the game
+        self.assertIsNone(state.boards[0][0][1][1])
+        self.assertEqual(new_state.boards[0][0][1][1], 'X')
+
+    def test_position_is_a_copy_with_the_active_board(self):
+        self.game_controller.play_move((0, 0), (1, 2))
+        position = self.game_controller.position()
+        self.assertEqual(position.active, 5)
+        self.assertEqual(position.pieces, self.game_controller.board.bitboard.pieces)
+        position.make_move(5 * 9, 1)
+        self.assertNotEqual(position.pieces, self.game_controller.board.bitboard.pieces)
+
+    def test_available_moves_cannot_be_corrupted_by_callers(self):
+        moves = self.game_controller.get_available_moves()
+        moves[0][1][0] = 2
+        moves.clear()
+        self.assertEqual(len(self.game_controller.get_available_moves()), 81)
+        self.assertEqual(self.game_controller.get_available_moves()[0], [[0, 0], [0, 0]])
@@ -0,0 +1,122 @@
+import threading
+import unittest
+import numpy as np
+from core.inference import (MODEL_LOADERS, EvaluationCache, InferenceService, get_inference_service,
+                            shutdown_inference_services)
+from core.symmetry import GRID_PERMUTATIONS, INVERSE_ACTION_PERMUTATIONS
+
+
+def sum_predict(inputs):
+    """Fake network: the policy repeats the input sum, the value is the first input cell."""
+    sums = inputs.reshape(len(inputs), -1).sum(axis=1)
+    return np.repeat(sums[:, None], 81, axis=1), inputs[:, 0, 0].reshape(-1, 1)
+
+
+class TestInferenceService(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def predict(inputs):
+            self.calls.append(len(inputs))
+            return sum_predict(inputs)
+
+        self.service = InferenceService(predict, max_batch_size=64, max_wait=0.05)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_requests_are_batched_and_routed(self):
+        """Test that concurrent requests share model calls and get their own results."""
+        results = {}
+
+        def play(game):
+            inputs = np.full((2, 9, 9), game, dtype=np.float32)
+            results[game] = self.service.evaluate(inputs)
+
+        threads = [threading.Thread(target=play, args=(game,)) for game in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(self.calls), 32)
+        self.assertLess(len(self.calls), 16, "Requests from different games should share batches")
+        for game, (policies, values) in results.items():
+            self.assertEqual(policies.shape, (2, 81))
+            np.testing.assert_array_equal(values, [game, game])
+            np.testing.assert_array_equal(policies[:, 0], [game * 81, game * 81])
+
+    def test_errors_reach_the_caller(self):
+        service = InferenceService(lambda inputs: 1 / 0)
+        with self.assertRaises(ZeroDivisionError):
+            service.evaluate(np.zeros((1, 9, 9)))
+        service.close()
+
+
+class TestEvaluationCache(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+
+        def predict(inputs):
+            # Policy: the first cell of the grid is the likeliest move, wherever it lands
+            self.calls.append(len(inputs))
+            flat = inputs.reshape(len(inputs), -1)
+            policies = np.zeros((len(inputs), 81), dtype=np.float32)
+            policies[:, 0] = 1.0
+            return policies, flat.sum(axis=1)
+
+        self.service = InferenceService(predict, max_wait=0.0, cache_size=4)
+
+    def tearDown(self):
+        self.service.close()
+
+    def test_symmetric_positions_hit_the_cache_with_permuted_policies(self):
+        """Test that a rotated position is answered from the cache with the policy rotated back."""
+        grid = np.zeros(81, dtype=np.float32)
+        grid[[0, 1, 10]] = [1, -1, 0.1]
+        self.service.evaluate(grid.reshape(1, 9, 9))
+        for t in range(1, 8):
+            policies, values = self.service.evaluate(grid[GRID_PERMUTATIONS[t]].reshape(1, 9, 9))
+            # The likeliest move is action 0 of the original position, wherever the transform moved it
+            self.assertEqual(policies[0][INVERSE_ACTION_PERMUTATIONS[t][0]], 1.0)
+            self.assertEqual(policies[0].sum(), 1.0)
+            self.assertAlmostEqual(values[0], 0.1, places=5)
+        self.assertEqual(self.calls, [1])
+        self.assertEqual((self.service.cache.hits, self.service.cache.misses), (7, 1))
+        self.assertAlmostEqual(self.service.cache.hit_rate, 7 / 8)
+
+    def test_capacity_evicts_least_recently_used(self):
+        grids = np.zeros((6, 9, 9), dtype=np.float32)
+        for index in range(6):
+            grids[index, 4, index] = 1
+        self.service.evaluate(grids[:4])
+        self.service.evaluate(grids[:1])
+        self.service.evaluate(grids[4:5])
+        self.assertEqual(len(self.service.cache), 4)
+        self.service.evaluate(grids[:1])
+        self.service.evaluate(grids[1:2])
+        self.assertEqual(self.calls, [4, 1, 1], "Only the least recently used position is evicted")
+
+    def test_cache_is_optional(self):
+        service = InferenceService(sum_predict)
+        self.assertIsNone(service.cache)
+        service.close()
+        self.assertEqual(EvaluationCache(8).hit_rate, 0.0)
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.loads = []
+        MODEL_LOADERS['.fake'] = lambda path: self.loads.append(path) or sum_predict
+
+    def tearDown(self):
+        shutdown_inference_services()
+        del MODEL_LOADERS['.fake']
+
+    def test_model_is_loaded_once_per_process(self):
+        first = get_inference_service("model.fake")
+        second = get_inference_service("model.fake")
+        self.assertIs(first, second)
+        self.assertEqual(self.loads, ["model.fake"])
+        self.assertEqual(first.batches, 1, "The model should be warmed up when loaded")
+        self.assertIsNotNone(first.cache, "Games of the process share one evaluation cache")
@@ -0,0 +1,81 @@
+import unittest
+import numpy as np
+from core.bitboard import O, X, BitBoard
+from core.mcts import PUCTSearch
+
+
+def uniform_evaluate(positions):
+    return np.full((len(positions), 81), 1 / 81), np.zeros(len(positions))
+
+
+class TestPUCTSearch(unittest.TestCase):
+    def setUp(self):
+        self.batch_sizes = []
+
+        def evaluate(positions):
+            self.batch_sizes.append(len(positions))
+            return uniform_evaluate(positions)
+
+        self.search = PUCTSearch(evaluate, simulations=200, batch_size=16)
+
+    def test_visits_and_virtual_loss(self):
+        """Test that every simulation is counted once and no virtual loss is left behind."""
+        bitboard = BitBoard()
+        probs = self.search.get_action_probs(bitboard, X)
+        root = bitboard.key(X)
+        self.assertAlmostEqual(probs.sum(), 1.0)
+        self.assertEqual(self.search.Nsa[root].sum(), 200)
+        self.assertEqual(self.search.Ns[root], 200)
+        self.assertLessEqual(max(self.batch_sizes), 16)
+        self.assertGreater(max(self.batch_sizes), 1, "Leaves should be evaluated in batches")
+
+    def test_finds_winning_move(self):
+        """Test that the search plays the move that completes a macro line."""
+        bitboard = BitBoard()
+        for sub_board in (0, 1):
+            bitboard.set_sub_board(sub_board, 0b000000111, 0b000011000)
+        bitboard.set_sub_board(2, 0b000000011, 0b000110000)
+        bitboard.active = 2
+        probs = self.search.get_action_probs(bitboard, X, temperature=0)
+        self.assertEqual(int(np.argmax(probs)), 2 * 9 + 2)
+
+    def test_tree_is_reused(self):
+        """Test that the subtree of the played move keeps its statistics."""
+        bitboard = BitBoard()
+        probs = self.search.get_action_probs(bitboard, X, temperature=0)
+        bitboard.make_move(int(np.argmax(probs)), X)
+        child = bitboard.key(O)
+        visits = self.search.Ns[child]
+        self.assertGreater(visits, 0)
+        self.search.get_action_probs(bitboard, O)
+        self.assertEqual(self.search.Ns[child], visits + 200)
+
+    def test_tree_stays_bounded_over_a_game(self):
+        """Test that positions no longer reachable from the root are dropped after every move."""
+        search = PUCTSearch(uniform_evaluate, simulations=50, batch_size=8)
+        bitboard, player = BitBoard(), X
+        first_root = bitboard.key(X)
+        sizes = []
+        for _ in range(40):
+            if bitboard.winner is not None or not bitboard.legal_moves():
+                break
+            probs = search.get_action_probs(bitboard, player, temperature=0)
+            sizes.append(len(search.P))
+            bitboard.make_move(int(np.argmax(probs)), player)
+            player = 1 - player
+        self.assertGreater(len(sizes), 20)
+        self.assertLessEqual(max(sizes), 2 * 50 + 1)
+        self.assertNotIn(first_root, search.Ns)
+        self.assertTrue(all(len(table) <= 2 * 50 + 1 for table in (search.Ns, search.Nsa, search.W, search.Q)))
+
+    def test_noise_does_not_change_the_stored_priors(self):
+        """Test that searching the same root again mixes fresh noise into the network priors."""
+        search = PUCTSearch(uniform_evaluate, simulations=8, batch_size=4, dirichlet_alpha=0.3)
+        bitboard = BitBoard()
+        root = bitboard.key(X)
+        search.get_action_probs(bitboard, X)
+        first_noise = search.noisy_root[1]
+        search.get_action_probs(bitboard, X)
+        np.testing.assert_allclose(search.P[root], np.full(81, 1 / 81))
+        self.assertFalse(np.allclose(search.noisy_root[1], first_noise))
+        self.assertAlmostEqual(search.noisy_root[1].sum(), 1.0)
@@ -0,0 +1,30 @@
+import unittest
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.min_max_player import MinimaxAIPlayer
+from core.rule import StandardUltimateTicTacToeRule
+
+
+def new_game(player):
+    game = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), player)
+    game.current_player = game.players['O']
+    return game
+
+
+class TestMinimaxAIPlayer(unittest.TestCase):
+    def test_cancelled_search_returns_a_legal_move_until_resumed(self):
+        player = MinimaxAIPlayer("AI", 'O', max_depth=2)
+        game = new_game(player)
+        player.cancel()
+        move = player.get_move(game)
+        self.assertIn([list(move[0]), list(move[1])], game.get_available_moves())
+        self.assertTrue(player.cancelled.is_set(), "Only resume clears a cancel")
+
+        player.resume()
+        self.assertFalse(player.cancelled.is_set())
+        self.assertIsNotNone(player.get_move(game))
+
+
+if __name__ == '__main__':
+    unittest.main()
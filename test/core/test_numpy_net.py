@@ -0,0 +1,99 @@
+import os
+import tempfile
+import unittest
+import numpy as np
+from core.inference import get_inference_service, shutdown_inference_services
+from core.numpy_net import NumpyPolicyValueNet, conv2d, save_network
+
+ARCHITECTURE = {
+    'input': 'planes',
+    'trunk': [{'type': 'conv2d', 'activation': 'relu'}, {'type': 'conv2d', 'activation': 'relu'},
+              {'type': 'flatten', 'order': 'chw'}, {'type': 'dense', 'activation': 'relu'}],
+    'policy': [{'type': 'dense', 'activation': 'softmax'}],
+    'value': [{'type': 'dense', 'activation': 'tanh'}],
+}
+
+
+def random_weights(rng):
+    return {
+        'trunk.0.weight': rng.normal(0, 0.5, (8, 2, 3, 3)), 'trunk.0.bias': rng.normal(0, 0.1, 8),
+        'trunk.1.weight': rng.normal(0, 0.2, (4, 8, 3, 3)), 'trunk.1.bias': rng.normal(0, 0.1, 4),
+        'trunk.3.weight': rng.normal(0, 0.05, (324, 32)), 'trunk.3.bias': rng.normal(0, 0.1, 32),
+        'policy.0.weight': rng.normal(0, 0.2, (32, 81)), 'policy.0.bias': rng.normal(0, 0.1, 81),
+        'value.0.weight': rng.normal(0, 0.2, (32, 1)), 'value.0.bias': rng.normal(0, 0.1, 1),
+    }
+
+
+def reference_conv(x, weight, bias):
+    """Direct 'same' convolution with explicit loops."""
+    out_channels, _, kernel_h, kernel_w = weight.shape
+    padded = np.pad(x, ((0, 0), (0, 0), (kernel_h // 2,) * 2, (kernel_w // 2,) * 2))
+    out = np.zeros((len(x), out_channels) + x.shape[2:])
+    for row in range(x.shape[2]):
+        for col in range(x.shape[3]):
+            window = padded[:, :, row:row + kernel_h, col:col + kernel_w]
+            out[:, :, row, col] = np.einsum('nchw,ochw->no', window, weight) + bias
+    return out
+
+
+def reference_forward(weights, inputs):
+    x = np.stack([inputs > 0.5, inputs < -0.5], axis=1).astype(np.float64)
+    x = np.maximum(reference_conv(x, weights['trunk.0.weight'], weights['trunk.0.bias']), 0)
+    x = np.maximum(reference_conv(x, weights['trunk.1.weight'], weights['trunk.1.bias']), 0)
+    x = np.maximum(x.reshape(len(x), -1) @ weights['trunk.3.weight'] + weights['trunk.3.bias'], 0)
+    logits = x @ weights['policy.0.weight'] + weights['policy.0.bias']
+    policies = np.exp(logits - logits.max(axis=1, keepdims=True))
+    values = np.tanh(x @ weights['value.0.weight'] + weights['value.0.bias'])
+    return policies / policies.sum(axis=1, keepdims=True), values.ravel()
+
+
+class TestNumpyNet(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(13)
+        self.weights = random_weights(rng)
+        self.inputs = rng.choice([-1.0, 0.0, 0.1, 1.0], size=(6, 9, 9)).astype(np.float32)
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def export(self, dtype):
+        path = os.path.join(self.directory.name, f'model_{dtype}.npz')
+        save_network(path, ARCHITECTURE, self.weights, dtype)
+        return path
+
+    def test_conv2d_matches_direct_convolution(self):
+        """Test that the im2col convolution equals the loop convolution."""
+        rng = np.random.default_rng(0)
+        x = rng.normal(size=(3, 2, 9, 9))
+        weight, bias = rng.normal(size=(5, 2, 3, 3)), rng.normal(size=5)
+        np.testing.assert_allclose(conv2d(x, weight, bias), reference_conv(x, weight, bias), atol=1e-10)
+
+    def test_outputs_match_reference_for_each_dtype(self):
+        """Test that float32, float16 and int8 exports stay within tolerance of the reference."""
+        expected_policies, expected_values = reference_forward(self.weights, self.inputs)
+        for dtype, tolerance in (('float32', 1e-5), ('float16', 5e-3), ('int8', 5e-2)):
+            with self.subTest(dtype=dtype):
+                policies, values = NumpyPolicyValueNet.load(self.export(dtype)).predict(self.inputs)
+                self.assertEqual(policies.shape, (6, 81))
+                np.testing.assert_allclose(policies, expected_policies, atol=tolerance)
+                np.testing.assert_allclose(values, expected_values, atol=tolerance)
+
+    def test_int8_file_is_smaller(self):
+        """Test that quantized weights shrink the file."""
+        self.assertLess(os.path.getsize(self.export('int8')), os.path.getsize(self.export('float32')) / 2)
+
+    def test_inference_service_loads_npz(self):
+        """Test that the inference service picks the NumPy loader for .npz files."""
+        path = self.export('float32')
+        try:
+            policies, values = get_inference_service(path).evaluate(self.inputs)
+        finally:
+            shutdown_inference_services()
+        expected_policies, expected_values = reference_forward(self.weights, self.inputs)
+        np.testing.assert_allclose(policies, expected_policies, atol=1e-5)
+        np.testing.assert_allclose(values, expected_values, atol=1e-5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import tempfile
+import time
+import unittest
+from core.alpha_beta_player import AlphaBetaAIPlayer
+from core.bitboard import O, X, BitBoard
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.min_max_player import MinimaxAIPlayer
+from core.opening_book import (OpeningBook, _CELL_IMAGES, build_opening_book, canonical_position,
+                               opening_positions, write_opening_book)
+from core.rule import StandardUltimateTicTacToeRule
+
+
+def transformed(bitboard, symmetry):
+    """Apply one of the 8 symmetries to a position."""
+    images = _CELL_IMAGES[symmetry]
+    result = BitBoard()
+    for player in (X, O):
+        for cell in range(81):
+            if bitboard.pieces[player] >> cell & 1:
+                result.make_move(images[cell], player)
+    return result
+
+
+class TestOpeningBook(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'book.bin')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_positions_are_symmetry_reduced(self):
+        self.assertEqual([sum(1 for _ in opening_positions(ply)) for ply in range(3)], [1, 16, 118])
+        bitboard = BitBoard()
+        bitboard.make_move(0, X)
+        keys = {canonical_position(transformed(bitboard, symmetry), O)[0] for symmetry in range(8)}
+        self.assertEqual(len(keys), 1)
+
+    def test_symmetric_positions_get_symmetric_moves(self):
+        """Test that a book built by a player answers every first move and its images consistently."""
+        count = build_opening_book(self.path, max_ply=1, player_name='minimax', player_options={'max_depth': 1},
+                                   log=lambda message: None)
+        self.assertEqual(count, 16)
+        book = OpeningBook(self.path)
+        self.assertIsNotNone(book.lookup(BitBoard(), X))
+        for first_move in range(81):
+            bitboard = BitBoard()
+            bitboard.make_move(first_move, X)
+            reply = book.lookup(bitboard, O)
+            self.assertIn(reply, bitboard.legal_moves())
+            child = bitboard.copy()
+            child.make_move(reply, O)
+            expected = canonical_position(child, X)[0]
+            for symmetry in range(8):
+                image = transformed(bitboard, symmetry)
+                # Positions with symmetries of their own may get another, equivalent reply
+                image.make_move(book.lookup(image, O), O)
+                self.assertEqual(canonical_position(image, X)[0], expected)
+        # Deeper positions and the wrong side to move are not in the book
+        bitboard.make_move(bitboard.legal_moves()[0], O)
+        self.assertIsNone(book.lookup(bitboard, X))
+        self.assertIsNone(book.lookup(BitBoard(), O))
+
+    def test_players_play_book_moves_without_searching(self):
+        key, _ = canonical_position(BitBoard(), X)
+        write_opening_book(self.path, {key: 4}, max_ply=0)
+        for player in (MinimaxAIPlayer("book", 'X', max_depth=9, opening_book=self.path),
+                       AlphaBetaAIPlayer("book", 'X', time_budget=5.0, opening_book=self.path)):
+            controller = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule(), player)
+            started = time.perf_counter()
+            self.assertEqual(player.get_move(controller), ((0, 0), (1, 1)))
+            self.assertLess(time.perf_counter() - started, 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import random
+import unittest
+from core.alpha_beta_player import WIN_SCORE, AlphaBetaAIPlayer
+from core.bitboard import X, BitBoard
+from core.parallel_search import ParallelAlphaBetaAIPlayer, get_pool, shutdown_pools
+
+
+class TestParallelAlphaBetaAIPlayer(unittest.TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutdown_pools()
+
+    def setUp(self):
+        self.player = ParallelAlphaBetaAIPlayer("AI", 'X', max_depth=3, time_budget=10.0, workers=2)
+
+    def test_takes_winning_move(self):
+        """Test that the split search still finds the move completing a macro line."""
+        bitboard = BitBoard()
+        for sub_board in (0, 1):
+            bitboard.set_sub_board(sub_board, 0b000000111, 0b000011000)
+        bitboard.set_sub_board(2, 0b000000011, 0b000110000)
+        bitboard.active = 2
+        self.assertEqual(self.player.search(bitboard, X), 2 * 9 + 2)
+
+    def test_pool_is_reused(self):
+        """Test that consecutive searches share one pool and return its bound slot."""
+        bitboard = BitBoard()
+        bitboard.make_move(40, 1)
+        first = self.player.search(bitboard, X)
+        pool = get_pool(2)
+        free_slots = len(pool._free_slots)
+        second = self.player.search(bitboard, X)
+        self.assertIs(get_pool(2), pool)
+        self.assertEqual(len(pool._free_slots), free_slots)
+        self.assertIn(first, bitboard.legal_moves())
+        self.assertIn(second, bitboard.legal_moves())
+
+    def test_root_score_matches_serial_search(self):
+        """Test that the chosen move is exactly as good as the serial search's best move."""
+        rng = random.Random(3)
+        serial = AlphaBetaAIPlayer("serial", 'X', max_depth=3, time_budget=10.0)
+        for _ in range(8):
+            bitboard, player = BitBoard(), X
+            for _ in range(rng.randrange(15, 35)):
+                if bitboard.result() is not None:
+                    break
+                bitboard.make_move(rng.choice(bitboard.legal_moves()), player)
+                player = 1 - player
+            if bitboard.result() is not None:
+                continue
+            move = self.player.search(bitboard, player)
+            serial.search(bitboard, player)
+            self.assertEqual(self.player.last_score, serial.last_score)
+
+            child = bitboard.copy()
+            child.make_move(move, player)
+            serial._deadline = float('inf')
+            score = -serial.negamax(child, 2, -WIN_SCORE - 1, WIN_SCORE + 1, 1 - player, 1)
+            self.assertEqual(score, serial.last_score)
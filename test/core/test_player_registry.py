@@ -0,0 +1,40 @@
+import sys
+import unittest
+from unittest import mock
+from core import player_registry
+from core.ai_player import RandomAIPlayer
+from core.exceptions import UnknownPlayerError
+from core.player_registry import available_players, create_player, register_player
+
+
+class TestPlayerRegistry(unittest.TestCase):
+    def setUp(self):
+        # Added first, so it runs after the cleanups of the test itself
+        self.addCleanup(self.assert_registry_unchanged, dict(player_registry._factories))
+
+    def assert_registry_unchanged(self, factories):
+        self.assertEqual(player_registry._factories, factories, "A test left its registrations behind")
+        self.assertLessEqual(set(player_registry._resolved), set(factories))
+
+    def test_create_builtin_player(self):
+        player = create_player('random', "AI", 'O')
+        self.assertIsInstance(player, RandomAIPlayer)
+        self.assertEqual(player.symbol, 'O')
+
+    def test_factory_is_imported_lazily(self):
+        """Test that a string factory is only imported when first requested."""
+        # Restore the imported modules and the registry once the test is over
+        for patcher in (mock.patch.dict(sys.modules), mock.patch.dict(player_registry._factories),
+                        mock.patch.dict(player_registry._resolved)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        sys.modules.pop('fractions', None)
+        register_player('lazy', 'fractions:Fraction')
+        self.assertIn('lazy', available_players())
+        self.assertNotIn('fractions', sys.modules)
+        self.assertEqual(create_player('lazy', 3, 4), 0.75)
+        self.assertIn('fractions', sys.modules)
+
+    def test_unknown_player(self):
+        with self.assertRaises(UnknownPlayerError):
+            create_player('does-not-exist', "AI", 'O')
@@ -0,0 +1,60 @@
+import random
+import unittest
+import numpy as np
+from core.bitboard import ANY_BOARD, X, BitBoard
+from core.encoding import CELL_TO_GRID, encode_position
+from core.symmetry import (ACTION_PERMUTATIONS, GRID_PERMUTATIONS, INVERSE_ACTION_PERMUTATIONS,
+                           SUB_BOARD_PERMUTATIONS, canonical_keys)
+
+
+def random_position(seed, plies=20):
+    rng = random.Random(seed)
+    bitboard = BitBoard()
+    player = X
+    for _ in range(plies):
+        moves = bitboard.legal_moves()
+        if not moves or bitboard.winner is not None:
+            break
+        bitboard.make_move(rng.choice(moves), player)
+        player = 1 - player
+    return bitboard, player
+
+
+class TestSymmetry(unittest.TestCase):
+    def test_permutations_move_sub_boards_and_cells_together(self):
+        """Test that every symmetry maps a cell of a sub-board to the same cell pattern on the macro board."""
+        for t in range(8):
+            sub_boards = SUB_BOARD_PERMUTATIONS[t]
+            np.testing.assert_array_equal(ACTION_PERMUTATIONS[t], (sub_boards[:, None] * 9 + sub_boards).ravel())
+            np.testing.assert_array_equal(ACTION_PERMUTATIONS[t][INVERSE_ACTION_PERMUTATIONS[t]], np.arange(81))
+
+    def test_grid_and_action_permutations_agree(self):
+        """Test that transforming an input grid and its legal mask keeps them consistent."""
+        inputs, legal = encode_position(*random_position(1))
+        for t in range(8):
+            grid = inputs.reshape(81)[GRID_PERMUTATIONS[t]]
+            transformed_legal = legal[ACTION_PERMUTATIONS[t]]
+            np.testing.assert_array_equal(np.isclose(grid[CELL_TO_GRID], 0.1), transformed_legal)
+
+    def test_canonical_keys_are_shared_by_symmetric_positions(self):
+        """Test that the 8 transformed inputs get one key and each transform leads back to it."""
+        inputs, _ = encode_position(*random_position(2))
+        variants = inputs.reshape(81)[GRID_PERMUTATIONS].reshape(8, 9, 9)
+        keys, transforms = canonical_keys(variants)
+        self.assertEqual(len(set(keys)), 1)
+        for variant, transform in zip(variants, transforms):
+            canonical = np.round(variant.reshape(81)[GRID_PERMUTATIONS[transform]] * 10).astype(np.int8)
+            self.assertEqual(canonical.tobytes(), keys[0])
+
+    def test_active_board_is_part_of_the_key(self):
+        """Test that the same pieces with a different board to play get different keys."""
+        bitboard, player = random_position(3, plies=4)
+        first, _ = encode_position(bitboard, player)
+        bitboard.active = ANY_BOARD
+        second, _ = encode_position(bitboard, player)
+        keys, _ = canonical_keys([first, second])
+        self.assertNotEqual(keys[0], keys[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
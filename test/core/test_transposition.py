@@ -0,0 +1,55 @@
+import unittest
+from core.bitboard import O, X, BitBoard
+from core.transposition import EXACT, LOWER_BOUND, TranspositionTable
+
+
+class TestTranspositionTable(unittest.TestCase):
+    def setUp(self):
+        self.table = TranspositionTable(max_entries=8)
+
+    def test_store_and_probe(self):
+        self.table.store(3, 2, 15, EXACT, 40)
+        self.assertEqual(self.table.probe(3), (2, 15, EXACT, 40))
+        self.assertIsNone(self.table.probe(4))
+        self.assertEqual((self.table.hits, self.table.misses), (1, 1))
+
+    def test_slots_are_allocated_by_the_first_store(self):
+        self.assertIsNone(self.table.probe(3))
+        self.assertIsNone(self.table.entries)
+        self.assertEqual(self.table.stats()['filled'], 0)
+        self.table.store(3, 2, 15, EXACT, 40)
+        self.assertEqual(len(self.table.entries), 8)
+        self.table.clear()
+        self.assertIsNone(self.table.entries)
+
+    def test_depth_preferred_replacement(self):
+        """Test that a shallower entry does not evict a deeper one from the same search."""
+        self.table.store(3, 5, 15, EXACT, 40)
+        self.table.store(11, 2, -7, LOWER_BOUND, 41)
+        self.assertEqual(self.table.probe(3), (5, 15, EXACT, 40))
+        self.assertIsNone(self.table.probe(11))
+        self.assertEqual(self.table.collisions, 1)
+
+    def test_aged_entries_are_replaced(self):
+        """Test that entries from an earlier search give way to new ones."""
+        self.table.store(3, 5, 15, EXACT, 40)
+        self.table.new_search()
+        self.table.store(11, 2, -7, LOWER_BOUND, 41)
+        self.assertEqual(self.table.probe(11), (2, -7, LOWER_BOUND, 41))
+        self.assertEqual(self.table.replacements, 1)
+
+
+class TestZobristKey(unittest.TestCase):
+    def test_key_is_incremental(self):
+        """Test that the same position reached by two move orders has the same key."""
+        first, second = BitBoard(), BitBoard()
+        for index, player in ((40, X), (36, O), (0, X)):
+            first.make_move(index, player)
+        for index, player in ((0, X), (36, O), (40, X)):
+            second.make_move(index, player)
+        second.active = first.active
+        self.assertEqual(first.key(O), second.key(O))
+        self.assertNotEqual(first.key(O), first.key(X))
+        undo = first.make_move(5, O)
+        first.unmake_move(undo)
+        self.assertEqual(first.key(O), second.key(O))
@@ -0,0 +1,68 @@
+import unittest
+import numpy as np
+from core.bitboard import DRAW, O, X, BitBoard, index_to_positions
+from core.board_9D import Board_9D
+from core.game_checker_9d import GameChecker9D
+from core.game_controller import GameController
+from core.rule import StandardUltimateTicTacToeRule
+from core.vector_engine import NO_WINNER, VectorizedGames
+
+
+class TestVectorizedGames(unittest.TestCase):
+    def test_games_follow_the_bitboard_rules(self):
+        """Test legal masks, pieces and results against BitBoard games replaying the same moves."""
+        games = VectorizedGames(64)
+        bitboards = [BitBoard() for _ in range(64)]
+        rng = np.random.default_rng(17)
+        while not games.is_terminal().all():
+            legal = games.legal_masks()
+            for game, bitboard in enumerate(bitboards):
+                expected = np.zeros(81, dtype=bool)
+                if bitboard.result() is None:
+                    expected[bitboard.legal_moves()] = True
+                np.testing.assert_array_equal(legal[game], expected)
+            moves = games.random_moves(rng)
+            running = np.flatnonzero(~games.is_terminal())
+            for game in running:
+                bitboards[game].make_move(int(moves[game]), int(games.player[game]))
+            games.apply_moves(moves[running], running)
+
+        for game, bitboard in enumerate(bitboards):
+            self.assertEqual(games.winner[game], bitboard.result())
+            self.assertEqual(games.to_bitboard(game).pieces, bitboard.pieces)
+
+    def test_random_playouts_match_the_game_controller(self):
+        """Test that every playout replays legally through GameController with the same outcome."""
+        games = VectorizedGames(8)
+        history = []
+        rng = np.random.default_rng(3)
+        while not games.is_terminal().all():
+            running = np.flatnonzero(~games.is_terminal())
+            moves = games.random_moves(rng)[running]
+            history.append(dict(zip(running, moves)))
+            games.apply_moves(moves, running)
+
+        for game in range(len(games)):
+            controller = GameController("test", Board_9D(), GameChecker9D(), StandardUltimateTicTacToeRule())
+            for moves in history:
+                if game in moves:
+                    board_position, cell_position = index_to_positions(int(moves[game]))
+                    self.assertIn([list(board_position), list(cell_position)], controller.get_available_moves())
+                    controller.play_move(board_position, cell_position)
+            if games.winner[game] == DRAW:
+                self.assertEqual(controller.get_available_moves(), [])
+            else:
+                self.assertEqual(controller.check_game_over(), 'XO'[games.winner[game]])
+
+    def test_from_bitboards_round_trip(self):
+        bitboard = BitBoard()
+        for move, player in ((40, X), (36, O), (4, X)):
+            bitboard.make_move(move, player)
+        games = VectorizedGames.from_bitboards([bitboard], [O])
+        self.assertEqual((games.active[0], games.player[0], games.winner[0]), (4, O, NO_WINNER))
+        self.assertEqual(np.flatnonzero(games.legal_masks()[0]).tolist(), bitboard.legal_moves())
+        self.assertIn(games.random_playout(np.random.default_rng(0))[0], (X, O, DRAW))
+
+
+if __name__ == '__main__':
+    unittest.main()
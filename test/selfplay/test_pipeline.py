@@ -0,0 +1,81 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+import numpy as np
+from core.bitboard import O, X
+from core.encoding import CELL_TO_GRID
+from selfplay import GameState, load_shards, run_self_play
+from selfplay.pipeline import existing_shards
+
+
+def dying_worker(*args):
+    """Worker killed before it can report, as by the OOM killer."""
+    os._exit(3)
+
+
+class TestGameState(unittest.TestCase):
+    def test_take_action_returns_a_new_state(self):
+        state = GameState()
+        child = state.take_action(40)
+        self.assertEqual(state.bitboard.occupied(), 0)
+        self.assertEqual((child.player, child.last_move), (O, 40))
+        self.assertEqual(child.get_legal_actions(), list(range(36, 40)) + list(range(41, 45)))
+        self.assertEqual(child.to_tensor()[4, 4], -1.0)
+
+    def test_terminal_reward_is_for_the_player_to_move(self):
+        state = GameState(player=O)
+        for sub_board in (0, 1):
+            state.bitboard.set_sub_board(sub_board, 0b111, 0)
+        state.bitboard.set_sub_board(2, 0b011, 0b100000000)
+        self.assertFalse(state.is_terminal())
+        self.assertEqual(state.reward(), 0.0)
+        # X completes the top row of sub-board 2 and with it the top row of sub-boards
+        state = GameState(state.bitboard, X).take_action(2 * 9 + 2)
+        self.assertTrue(state.is_terminal())
+        self.assertEqual((state.winner(), state.player, state.reward()), (X, O, -1.0))
+        self.assertEqual(state.get_legal_actions(), [])
+
+
+class TestSelfPlay(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def run_games(self, games):
+        return run_self_play(self.directory.name, games, workers=2, simulations=8, games_per_shard=1,
+                             batch_size=4, seed=15, log=lambda message: None)
+
+    def test_shards_hold_consistent_samples(self):
+        stats = self.run_games(3)
+        self.assertEqual(stats['games'], 3)
+        self.assertGreater(stats['samples_per_second'], stats['games_per_second'])
+        self.assertEqual(len(existing_shards(self.directory.name)), 3)
+
+        states, policies, outcomes = load_shards(self.directory.name)
+        self.assertEqual(len(states), stats['samples'])
+        self.assertEqual(states.shape[1:], (9, 9))
+        np.testing.assert_allclose(policies.sum(axis=1), 1.0, rtol=1e-5)
+        self.assertTrue(np.isin(outcomes, (-1.0, 0.0, 1.0)).all())
+        # Policies only cover the cells the state encodes as legal
+        legal = np.isclose(states.reshape(-1, 81), 0.1)[:, CELL_TO_GRID]
+        self.assertFalse((policies[~legal] > 0).any())
+
+    def test_resume_only_plays_missing_games(self):
+        self.run_games(2)
+        stats = self.run_games(3)
+        self.assertEqual(stats['games'], 1)
+        self.assertEqual(len(existing_shards(self.directory.name)), 3)
+        self.assertEqual(self.run_games(3)['games'], 0)
+
+    def test_dead_worker_is_reported(self):
+        with mock.patch('selfplay.pipeline._worker', dying_worker), \
+                mock.patch('selfplay.pipeline.PROGRESS_POLL_SECONDS', 0.05):
+            with self.assertRaisesRegex(RuntimeError, "exit code 3"):
+                self.run_games(2)
+
+
+if __name__ == '__main__':
+    unittest.main()
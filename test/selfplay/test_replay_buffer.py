@@ -0,0 +1,70 @@
+import tempfile
+import unittest
+import numpy as np
+from core.encoding import CELL_TO_GRID
+from selfplay import GameState, ReplayBuffer
+
+
+def samples(count, seed=0):
+    """Positions from random games with policies spread over their legal moves."""
+    rng = np.random.default_rng(seed)
+    states, policies = [], []
+    state = GameState()
+    while len(states) < count:
+        if state.is_terminal():
+            state = GameState()
+        legal = state.get_legal_actions()
+        policy = np.zeros(81, dtype=np.float32)
+        policy[legal] = rng.random(len(legal))
+        states.append(state.to_tensor())
+        policies.append(policy / policy.sum())
+        state = state.take_action(int(rng.choice(legal)))
+    return np.array(states), np.array(policies), rng.choice([-1.0, 0.0, 1.0], size=count).astype(np.float32)
+
+
+class TestReplayBuffer(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = self.directory.name + '/buffer'
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_augmented_policies_follow_the_states(self):
+        """Test that symmetry augmentation keeps every policy on the legal cells of its state."""
+        buffer = ReplayBuffer(self.path, capacity=100)
+        states, policies, values = samples(60)
+        buffer.add(states, policies, values, generation=0)
+        batch_states, batch_policies, batch_values = buffer.sample(256, np.random.default_rng(1))
+        self.assertEqual((batch_states.shape, batch_policies.shape, batch_values.shape),
+                         ((256, 9, 9), (256, 81), (256,)))
+        legal = np.isclose(batch_states.reshape(-1, 81), 0.1)[:, CELL_TO_GRID]
+        self.assertFalse((batch_policies[~legal] > 0).any())
+        np.testing.assert_allclose(batch_policies.sum(axis=1), 1.0, rtol=1e-5)
+        # Augmented states are symmetric copies of stored ones, not new positions
+        stored = {tuple(np.sort(state.ravel())) for state in states}
+        self.assertTrue(all(tuple(np.sort(state.ravel())) in stored for state in batch_states))
+
+    def test_window_and_capacity_evict_old_samples(self):
+        buffer = ReplayBuffer(self.path, capacity=10, window=2)
+        states, policies, _ = samples(10)
+        for generation in range(3):
+            buffer.add(states[:4], policies[:4], np.full(4, generation, dtype=np.float32), generation)
+        # Generation 0 is out of the window and half of it was overwritten by the ring
+        self.assertEqual(len(buffer), 8)
+        _, _, values = buffer.sample(200, np.random.default_rng(2), augment=False)
+        self.assertEqual(set(values), {1.0, 2.0})
+
+    def test_buffer_is_reopened_from_disk(self):
+        buffer = ReplayBuffer(self.path, capacity=20)
+        states, policies, values = samples(15)
+        buffer.add(states, policies, values, generation=3)
+        del buffer
+        reopened = ReplayBuffer(self.path)
+        self.assertEqual((len(reopened), reopened.capacity, reopened.latest_generation), (15, 20, 3))
+        np.testing.assert_array_equal(reopened.states[:15], states)
+        self.assertIsInstance(reopened.states, np.memmap)
+
+
+if __name__ == '__main__':
+    unittest.main()